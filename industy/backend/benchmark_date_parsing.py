@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for JIRA timestamp parsing.
+
+Compares the old strptime loop with parse_jira_datetime / parse_jira_date using the
+values each synced issue carries (created, updated and duedate).
+"""
+import timeit
+from datetime import datetime
+from services.jira_service import parse_jira_date, parse_jira_datetime
+
+ISSUE_FIELDS = {
+    "created": "2025-01-01T10:00:00.000+0000",
+    "updated": "2025-01-05T15:30:00.000+0530",
+    "duedate": "2025-01-15"
+}
+
+LEGACY_DATETIME_FORMATS = [
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S",
+]
+
+
+def legacy_parse_jira_datetime(date_str):
+    """The strptime loop parse_jira_datetime used before the ISO fast path"""
+    for fmt in LEGACY_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return datetime.utcnow()
+
+
+def legacy_parse_jira_date(date_str):
+    """The strptime parse_jira_date used before the ISO fast path"""
+    parsed_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    return datetime.combine(parsed_date, datetime.min.time())
+
+
+def parse_issue_legacy():
+    legacy_parse_jira_datetime(ISSUE_FIELDS["created"])
+    legacy_parse_jira_datetime(ISSUE_FIELDS["updated"])
+    legacy_parse_jira_date(ISSUE_FIELDS["duedate"])
+
+
+def parse_issue_fast():
+    parse_jira_datetime(ISSUE_FIELDS["created"])
+    parse_jira_datetime(ISSUE_FIELDS["updated"])
+    parse_jira_date(ISSUE_FIELDS["duedate"])
+
+
+def benchmark_date_parsing(iterations: int = 100000):
+    print("⏱️ Benchmarking JIRA date parsing per issue (created + updated + duedate)...")
+
+    results = {}
+    for name, func in [("legacy strptime loop", parse_issue_legacy), ("ISO fast path", parse_issue_fast)]:
+        best = min(timeit.repeat(func, number=iterations, repeat=5))
+        per_issue_us = best / iterations * 1_000_000
+        results[name] = per_issue_us
+        print(f"  {name:<22} {per_issue_us:8.2f} µs/issue  ({iterations / best:,.0f} issues/s)")
+
+    speedup = results["legacy strptime loop"] / results["ISO fast path"]
+    print(f"\n✅ Fast path is {speedup:.1f}x faster per issue")
+
+
+if __name__ == "__main__":
+    benchmark_date_parsing()
@@ -0,0 +1,109 @@
+"""
+Benchmark sync_jira_data against the offline Jira stand-in (jira_stub_server.py).
+
+Starts the stub on localhost, connects a throwaway benchmark user to it and runs full syncs
+for 1k, 10k and 100k synthetic issues, reporting issues/s and p50/p95 sync time of the
+successful runs. Needs the MongoDB configured in .env; everything the benchmark user writes
+is removed afterwards.
+
+The Jira rate limit and the per-user sync timeout are raised for the run (BENCHMARK_RATE_LIMIT,
+BENCHMARK_SYNC_TIMEOUT) so the numbers measure the sync rather than the limiter or a timeout.
+Override the defaults with BENCHMARK_SYNC_SIZES (e.g. "1000,10000"), BENCHMARK_SYNC_RUNS,
+BENCHMARK_SYNC_PORT and JIRA_STUB_LATENCY_MS / JIRA_STUB_429_RATE for fault injection.
+"""
+import asyncio
+import os
+import time
+from config import settings
+from db import connect_to_mongo, get_database, close_mongo_connection
+from models.jira import JiraCredentialsCreate
+from services.jira_service import jira_service
+from services.jira_http import jira_client_registry
+from services.sync_run_service import percentile
+from jira_stub_server import JiraStub, start_jira_stub_server
+
+BENCHMARK_USER_ID = "benchmark_sync_user"
+
+
+async def reset_benchmark_user(db):
+    """Remove everything a previous sync wrote so the next run is an independent full sync"""
+    await db.jira_tasks.delete_many({"user_id": BENCHMARK_USER_ID})
+    await db.jira_projects.delete_many({"user_id": BENCHMARK_USER_ID})
+    await db.jira_status_transitions.delete_many({"user_id": BENCHMARK_USER_ID})
+    await db.sync_runs.delete_many({"user_id": BENCHMARK_USER_ID})
+    await db.jira_snapshots.delete_one({"_id": BENCHMARK_USER_ID})
+    await db.sync_locks.delete_one({"_id": BENCHMARK_USER_ID})
+    await db.sync_schedules.delete_one({"_id": BENCHMARK_USER_ID})
+    await jira_service.clear_sync_state(BENCHMARK_USER_ID)
+
+
+async def benchmark_jira_sync():
+    sizes = [int(size) for size in os.getenv("BENCHMARK_SYNC_SIZES", "1000,10000,100000").split(",")]
+    runs = int(os.getenv("BENCHMARK_SYNC_RUNS", "5"))
+    port = int(os.getenv("BENCHMARK_SYNC_PORT", "8081"))
+    latency_ms = float(os.getenv("JIRA_STUB_LATENCY_MS", "0"))
+    rate_429 = float(os.getenv("JIRA_STUB_429_RATE", "0"))
+    # Read when the site's rate limiter is created and on every sync, so set before the first one
+    settings.JIRA_RATE_LIMIT_PER_SECOND = float(os.getenv("BENCHMARK_RATE_LIMIT", "10000"))
+    settings.JIRA_RATE_LIMIT_BURST = int(settings.JIRA_RATE_LIMIT_PER_SECOND)
+    settings.SCHEDULER_USER_SYNC_TIMEOUT = float(os.getenv("BENCHMARK_SYNC_TIMEOUT", "3600"))
+
+    await connect_to_mongo()
+    db = get_database()
+    app, server, thread = start_jira_stub_server(JiraStub(issues=0), port)
+    credentials = None
+
+    print(f"⏱️ Benchmarking sync_jira_data against the Jira stub on port {port} ({runs} runs per size)")
+    print(f"   latency={latency_ms}ms 429 rate={rate_429} rate limit={settings.JIRA_RATE_LIMIT_PER_SECOND:.0f}/s timeout={settings.SCHEDULER_USER_SYNC_TIMEOUT:.0f}s\n")
+
+    try:
+        credentials = await jira_service.store_jira_credentials(
+            BENCHMARK_USER_ID,
+            JiraCredentialsCreate(domain=f"http://127.0.0.1:{port}", email="benchmark@example.com", api_token="stub-token")
+        )
+        if not credentials:
+            print("❌ Failed to store benchmark credentials")
+            return
+
+        print(f"  {'issues':>8} {'stored':>8} {'ok':>5} {'issues/s':>10} {'p50':>8} {'p95':>8} {'requests':>9}")
+        for size in sizes:
+            app.state.stub = JiraStub(issues=size, latency_ms=latency_ms, rate_429=rate_429)
+            # Durations and stored issue counts of the runs that succeeded
+            durations = []
+            stored_counts = []
+            for _ in range(runs):
+                await reset_benchmark_user(db)
+                started = time.perf_counter()
+                success = await jira_service.sync_jira_data(BENCHMARK_USER_ID)
+                duration = time.perf_counter() - started
+                stored = await db.jira_tasks.count_documents({"user_id": BENCHMARK_USER_ID})
+                if not success:
+                    print(f"  ⚠️ sync_jira_data reported failure for {size} issues ({stored} stored)")
+                    continue
+                durations.append(duration)
+                stored_counts.append(stored)
+
+            requests_per_run = app.state.stub.request_count / runs
+            if not durations:
+                print(f"  {size:>8} {'-':>8} {0:>2}/{runs:<2} {'-':>10} {'-':>8} {'-':>8} {requests_per_run:>9.0f}")
+                continue
+            p50 = percentile(durations, 0.5)
+            p95 = percentile(durations, 0.95)
+            issues_per_second = sum(stored_counts) / sum(durations)
+            print(f"  {size:>8} {min(stored_counts):>8} {len(durations):>2}/{runs:<2} {issues_per_second:>10,.0f} {p50:>7.2f}s {p95:>7.2f}s {requests_per_run:>9.0f}")
+
+    finally:
+        await reset_benchmark_user(db)
+        if credentials:
+            await jira_service.invalidate_query_plan(credentials.id)
+        await db.jira_credentials.delete_many({"user_id": BENCHMARK_USER_ID})
+        await jira_client_registry.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        await close_mongo_connection()
+
+    print("\n✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_jira_sync())
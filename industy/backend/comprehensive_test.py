@@ -103,7 +103,7 @@ async def comprehensive_test():
         # These methods should exist in the JiraService
         methods_to_check = [
             'fetch_issues_by_jql_new_endpoint',
-            'fetch_jira_tasks', 
+            'sync_jira_tasks_full', 
             'store_jira_tasks',
             'sync_jira_data'
         ]
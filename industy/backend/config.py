@@ -13,6 +13,15 @@ class Settings:
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "multidesk")
     
+    # MongoDB Connection Pool (MONGODB_MIN_POOL_SIZE connections are opened at startup)
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
+    MONGODB_APP_NAME: str = os.getenv("MONGODB_APP_NAME", "multi-desk-backend")
+    # e.g. secondaryPreferred on a replica set; status transition analytics may then see a sync a moment late
+    MONGODB_ANALYTICS_READ_PREFERENCE: str = os.getenv("MONGODB_ANALYTICS_READ_PREFERENCE", "primary")
+    
     # Email Configuration
     MAIL_HOST: str = os.getenv("MAIL_HOST", "smtp.gmail.com")
     MAIL_PORT: int = int(os.getenv("MAIL_PORT", "587"))
@@ -28,6 +37,85 @@ class Settings:
     JIRA_EMAIL: str = os.getenv("JIRA_EMAIL", "")
     JIRA_API_TOKEN: str = os.getenv("JIRA_API_TOKEN", "")
     
+    # Jira Delta Sync Configuration
+    JIRA_DELTA_SYNC_ENABLED: bool = os.getenv("JIRA_DELTA_SYNC_ENABLED", "true").lower() == "true"
+    JIRA_DELTA_SYNC_OVERLAP_MINUTES: int = int(os.getenv("JIRA_DELTA_SYNC_OVERLAP_MINUTES", "5"))
+    JIRA_RECONCILE_INTERVAL_MINUTES: int = int(os.getenv("JIRA_RECONCILE_INTERVAL_MINUTES", "360"))
+    JIRA_FULL_SYNC_INTERVAL_HOURS: int = int(os.getenv("JIRA_FULL_SYNC_INTERVAL_HOURS", "24"))
+    JIRA_QUERY_PLAN_TTL_HOURS: int = int(os.getenv("JIRA_QUERY_PLAN_TTL_HOURS", "24"))
+    JIRA_CHANGELOG_SYNC_ENABLED: bool = os.getenv("JIRA_CHANGELOG_SYNC_ENABLED", "true").lower() == "true"
+    JIRA_CHANGELOG_FETCH_CONCURRENCY: int = int(os.getenv("JIRA_CHANGELOG_FETCH_CONCURRENCY", "5"))
+    
+    # Jira Snapshot Generations (seconds superseded data stays readable after a flip)
+    JIRA_SNAPSHOT_GC_DELAY_SECONDS: float = float(os.getenv("JIRA_SNAPSHOT_GC_DELAY_SECONDS", "30"))
+    
+    # Jira HTTP Client Pool Configuration
+    JIRA_HTTP_MAX_CONNECTIONS: int = int(os.getenv("JIRA_HTTP_MAX_CONNECTIONS", "50"))
+    JIRA_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("JIRA_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    JIRA_HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("JIRA_HTTP_KEEPALIVE_EXPIRY", "60"))
+    JIRA_HTTP_TIMEOUT: float = float(os.getenv("JIRA_HTTP_TIMEOUT", "30"))
+    JIRA_HTTP_CONNECT_TIMEOUT: float = float(os.getenv("JIRA_HTTP_CONNECT_TIMEOUT", "10"))
+    # Needs the h2 package (httpx[http2] in requirements.txt); without it the client stays on HTTP/1.1
+    JIRA_HTTP2_ENABLED: bool = os.getenv("JIRA_HTTP2_ENABLED", "false").lower() == "true"
+    
+    # Jira Rate Limiting (per site)
+    JIRA_RATE_LIMIT_PER_SECOND: float = float(os.getenv("JIRA_RATE_LIMIT_PER_SECOND", "10"))
+    JIRA_RATE_LIMIT_BURST: int = int(os.getenv("JIRA_RATE_LIMIT_BURST", "20"))
+    JIRA_RATE_LIMIT_MIN_PER_SECOND: float = float(os.getenv("JIRA_RATE_LIMIT_MIN_PER_SECOND", "0.5"))
+    JIRA_MAX_RETRIES: int = int(os.getenv("JIRA_MAX_RETRIES", "3"))
+    JIRA_RETRY_BACKOFF_BASE: float = float(os.getenv("JIRA_RETRY_BACKOFF_BASE", "1"))
+    JIRA_RETRY_BACKOFF_MAX: float = float(os.getenv("JIRA_RETRY_BACKOFF_MAX", "60"))
+    
+    # Jira Connection Validation Cache (seconds)
+    JIRA_VALIDATION_CACHE_TTL: int = int(os.getenv("JIRA_VALIDATION_CACHE_TTL", "300"))
+    JIRA_VALIDATION_NEGATIVE_CACHE_TTL: int = int(os.getenv("JIRA_VALIDATION_NEGATIVE_CACHE_TTL", "30"))
+    
+    # Jira Issue Proxy Cache (seconds)
+    JIRA_ISSUE_CACHE_TTL: int = int(os.getenv("JIRA_ISSUE_CACHE_TTL", "60"))
+    JIRA_ISSUE_CACHE_STALE_TTL: int = int(os.getenv("JIRA_ISSUE_CACHE_STALE_TTL", "300"))
+    JIRA_ISSUE_CACHE_LOCAL_MAX_AGE: int = int(os.getenv("JIRA_ISSUE_CACHE_LOCAL_MAX_AGE", "600"))
+    JIRA_ISSUE_CACHE_MAX_ENTRIES: int = int(os.getenv("JIRA_ISSUE_CACHE_MAX_ENTRIES", "1000"))
+    
+    # Jira Webhooks (HMAC secret configured on the Jira webhook)
+    JIRA_WEBHOOK_SECRET: str = os.getenv("JIRA_WEBHOOK_SECRET", "")
+    
+    # Scheduler Configuration
+    SCHEDULER_SYNC_INTERVAL: int = int(os.getenv("SCHEDULER_SYNC_INTERVAL", "300"))
+    SCHEDULER_WEBHOOK_SYNC_INTERVAL: int = int(os.getenv("SCHEDULER_WEBHOOK_SYNC_INTERVAL", "3600"))
+    SCHEDULER_MAX_CONCURRENT_SYNCS: int = int(os.getenv("SCHEDULER_MAX_CONCURRENT_SYNCS", "10"))
+    SCHEDULER_MAX_CONCURRENT_SYNCS_PER_DOMAIN: int = int(os.getenv("SCHEDULER_MAX_CONCURRENT_SYNCS_PER_DOMAIN", "3"))
+    SCHEDULER_USER_SYNC_TIMEOUT: float = float(os.getenv("SCHEDULER_USER_SYNC_TIMEOUT", "120"))
+    SCHEDULER_TICK_SECONDS: float = float(os.getenv("SCHEDULER_TICK_SECONDS", "15"))
+    
+    # Adaptive Per-user Sync Intervals (seconds unless noted)
+    SYNC_MIN_INTERVAL: int = int(os.getenv("SYNC_MIN_INTERVAL", "60"))
+    SYNC_MAX_INTERVAL: int = int(os.getenv("SYNC_MAX_INTERVAL", "21600"))
+    SYNC_ACTIVE_WINDOW_MINUTES: int = int(os.getenv("SYNC_ACTIVE_WINDOW_MINUTES", "15"))
+    SYNC_IDLE_AFTER_DAYS: int = int(os.getenv("SYNC_IDLE_AFTER_DAYS", "7"))
+    SYNC_BUSY_CHANGE_FRACTION: float = float(os.getenv("SYNC_BUSY_CHANGE_FRACTION", "0.05"))
+    
+    # Per-user Sync Locks (single-flight across processes)
+    SYNC_LOCK_ENABLED: bool = os.getenv("SYNC_LOCK_ENABLED", "true").lower() == "true"
+    SYNC_LOCK_TTL_SECONDS: int = int(os.getenv("SYNC_LOCK_TTL_SECONDS", "60"))
+    SYNC_LOCK_POLL_INTERVAL: float = float(os.getenv("SYNC_LOCK_POLL_INTERVAL", "1"))
+    
+    # Sync Job Queue (consumed by sync_worker.py when enabled)
+    SYNC_QUEUE_ENABLED: bool = os.getenv("SYNC_QUEUE_ENABLED", "false").lower() == "true"
+    SYNC_JOB_LEASE_SECONDS: int = int(os.getenv("SYNC_JOB_LEASE_SECONDS", "60"))
+    SYNC_JOB_MAX_ATTEMPTS: int = int(os.getenv("SYNC_JOB_MAX_ATTEMPTS", "5"))
+    SYNC_JOB_RETRY_BACKOFF_BASE: float = float(os.getenv("SYNC_JOB_RETRY_BACKOFF_BASE", "30"))
+    SYNC_JOB_RETRY_BACKOFF_MAX: float = float(os.getenv("SYNC_JOB_RETRY_BACKOFF_MAX", "1800"))
+    SYNC_JOB_RETENTION_DAYS: int = int(os.getenv("SYNC_JOB_RETENTION_DAYS", "7"))
+    SYNC_WORKER_POLL_INTERVAL: float = float(os.getenv("SYNC_WORKER_POLL_INTERVAL", "2"))
+    
+    # Sync Run History (sync_runs collection)
+    SYNC_RUN_RETENTION_DAYS: int = int(os.getenv("SYNC_RUN_RETENTION_DAYS", "30"))
+    SYNC_RUN_SUMMARY_MAX_RUNS: int = int(os.getenv("SYNC_RUN_SUMMARY_MAX_RUNS", "10000"))
+    
+    # List Pagination (seconds a computed total is reused while paging)
+    PAGINATION_TOTAL_CACHE_TTL: int = int(os.getenv("PAGINATION_TOTAL_CACHE_TTL", "60"))
+    PAGINATION_TOTAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PAGINATION_TOTAL_CACHE_MAX_ENTRIES", "1000"))
+    
     # Updated MongoDB Configuration for new structure
     MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     MONGO_DB: str = os.getenv("MONGO_DB", "multiDeskDB")
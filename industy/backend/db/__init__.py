@@ -1,9 +1,15 @@
-from .mongodb import connect_to_mongo, close_mongo_connection, get_database
+from .mongodb import connect_to_mongo, close_mongo_connection, get_database, get_analytics_database, warm_up_pool, get_pool_stats
 from .init_db import init_database
+from .migrations import run_migrations, get_schema_version
 
 __all__ = [
     "connect_to_mongo",
     "close_mongo_connection",
     "get_database",
-    "init_database"
+    "get_analytics_database",
+    "warm_up_pool",
+    "get_pool_stats",
+    "init_database",
+    "run_migrations",
+    "get_schema_version"
 ]
\ No newline at end of file
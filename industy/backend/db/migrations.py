@@ -0,0 +1,259 @@
+import logging
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Awaitable
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+from config import settings
+from .mongodb import get_database
+
+logger = logging.getLogger(__name__)
+
+# One document per applied migration: {_id: version, description, applied_at, duration_seconds}
+SCHEMA_MIGRATIONS_COLLECTION = "schema_migrations"
+
+# Server error code for dropping an index that doesn't exist
+INDEX_NOT_FOUND = 27
+
+
+def index(keys, **options) -> IndexModel:
+    """Index definition built in the background on servers that still honour the flag (< 4.2)"""
+    return IndexModel(keys, background=True, **options)
+
+
+class Migration:
+    """One schema version: an optional data fix, the indexes it adds and the index names it drops, per collection"""
+
+    def __init__(
+        self,
+        version: int,
+        description: str,
+        indexes: Dict[str, List[IndexModel]],
+        drop_indexes: Optional[Dict[str, List[str]]] = None,
+        before: Optional[Callable[..., Awaitable[None]]] = None
+    ):
+        self.version = version
+        self.description = description
+        self.indexes = indexes
+        self.drop_indexes = drop_indexes or {}
+        # Awaited with the database before the indexes are built, e.g. to clear data a unique index would reject
+        self.before = before
+
+
+async def remove_duplicate_task_documents(db) -> None:
+    """Keep one jira_tasks document per (user_id, generation, jira_id), the most recently updated"""
+    pipeline = [
+        {"$sort": {"updated": DESCENDING, "_id": DESCENDING}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "generation": "$generation", "jira_id": "$jira_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    removed = 0
+    async for group in db.jira_tasks.aggregate(pipeline, allowDiskUse=True):
+        result = await db.jira_tasks.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    if removed:
+        logger.warning(f"Removed {removed} duplicate jira_tasks documents before adding the unique upsert index")
+
+
+# Append new versions at the end; never edit one that has shipped
+MIGRATIONS = [
+    Migration(1, "Reports and Jira sync collections", {
+        "reports": [
+            index([("created_by", ASCENDING)]),
+            index([("type", ASCENDING)]),
+            index([("created_at", DESCENDING)]),
+            index([("is_public", ASCENDING)])
+        ],
+        "report_data": [
+            index([("report_id", ASCENDING)]),
+            index([("label", ASCENDING)])
+        ],
+        "report_summaries": [
+            index([("report_id", ASCENDING)])
+        ],
+        "jira_tasks": [
+            # Webhook deletes and reconciliation by (user_id, jira_id); superseded in version 5
+            index([("user_id", ASCENDING), ("jira_id", ASCENDING)]),
+            # Readers and upserts filter on the user's active snapshot generation; not unique, see version 5
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("jira_id", ASCENDING)])
+        ],
+        "jira_projects": [
+            index([("user_id", ASCENDING), ("generation", ASCENDING)])
+        ],
+        "jira_sync_state": [
+            index([("user_id", ASCENDING)], unique=True)
+        ],
+        "jira_query_plans": [
+            index([("credentials_id", ASCENDING)], unique=True)
+        ],
+        "jira_status_transitions": [
+            index([("user_id", ASCENDING), ("jira_id", ASCENDING), ("history_id", ASCENDING)], unique=True),
+            index([("user_id", ASCENDING), ("changed_at", DESCENDING)])
+        ],
+        "sync_jobs": [
+            index([("status", ASCENDING), ("run_at", ASCENDING)]),
+            index([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+            # At most one queued job per user
+            index(
+                [("user_id", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"status": "queued"},
+                name="user_id_queued_unique"
+            ),
+            index([("finished_at", ASCENDING)], expireAfterSeconds=settings.SYNC_JOB_RETENTION_DAYS * 24 * 3600)
+        ],
+        "sync_schedules": [
+            index([("next_sync_at", ASCENDING)])
+        ],
+        "sync_runs": [
+            index([("finished_at", ASCENDING)], expireAfterSeconds=settings.SYNC_RUN_RETENTION_DAYS * 24 * 3600),
+            index([("user_id", ASCENDING), ("finished_at", DESCENDING)])
+        ]
+    }),
+    Migration(2, "Compound indexes for dashboard, task list, risk analysis and auth queries", {
+        "jira_tasks": [
+            # DashboardService counts and analytics group-bys
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("status", ASCENDING)]),
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("priority", ASCENDING), ("status", ASCENDING)]),
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("duedate", ASCENDING)]),
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("created", ASCENDING)]),
+            # TasksService list sorted by updated, and the local issue cache per project and type
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("updated", DESCENDING)]),
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("project_key", ASCENDING), ("issue_type", ASCENDING), ("updated", DESCENDING)]),
+            # Per-task risk re-analysis after a webhook
+            index([("key", ASCENDING)])
+        ],
+        "leaves": [
+            # run_risk_analysis looks for a leave of the assignee covering the due date
+            index([("employee_email", ASCENDING), ("leave_start", ASCENDING), ("leave_end", ASCENDING)]),
+            index([("file_id", ASCENDING)])
+        ],
+        "risk_alerts": [
+            index([("created_at", DESCENDING)]),
+            index([("task_key", ASCENDING)])
+        ],
+        "files": [
+            index([("user_id", ASCENDING), ("uploaded_at", DESCENDING)])
+        ],
+        "users": [
+            index([("email", ASCENDING)]),
+            index([("created_at", DESCENDING)])
+        ],
+        "jira_credentials": [
+            index([("user_id", ASCENDING)]),
+            index([("is_active", ASCENDING)])
+        ],
+        "otps": [
+            index([("email", ASCENDING), ("purpose", ASCENDING)]),
+            # Expired codes can never verify, let MongoDB remove them
+            index([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        ]
+    }),
+    Migration(3, "Keyset pagination indexes ending in _id for task, file, user and report lists", {
+        "jira_tasks": [
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("updated", DESCENDING), ("_id", DESCENDING)])
+        ],
+        "files": [
+            index([("user_id", ASCENDING), ("uploaded_at", DESCENDING), ("_id", DESCENDING)])
+        ],
+        "users": [
+            index([("created_at", DESCENDING), ("_id", DESCENDING)])
+        ],
+        "reports": [
+            # One per branch of the "own or public" $or, merged in sort order
+            index([("created_by", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            index([("is_public", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+        ]
+    }),
+    Migration(4, "Task search: per-user text index on summary and key prefix index", {
+        "jira_tasks": [
+            # Equality prefix keeps each search inside one user's active generation
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("summary", TEXT)], name="summary_text"),
+            index([("user_id", ASCENDING), ("generation", ASCENDING), ("key", ASCENDING), ("_id", ASCENDING)])
+        ]
+    }),
+    Migration(5, "Unique task upsert key (user_id, jira_id, generation)", {
+        "jira_tasks": [
+            # Concurrent webhook and sync upserts can't insert the same task twice into a generation;
+            # its (user_id, jira_id) prefix also serves webhook deletes and reconciliation
+            index([("user_id", ASCENDING), ("jira_id", ASCENDING), ("generation", ASCENDING)], unique=True, name="user_id_jira_id_generation_unique")
+        ]
+    }, drop_indexes={
+        "jira_tasks": ["user_id_1_jira_id_1", "user_id_1_generation_1_jira_id_1"]
+    }, before=remove_duplicate_task_documents)
+]
+
+LATEST_SCHEMA_VERSION = MIGRATIONS[-1].version
+
+# TTL indexes whose expiry follows settings: reapplied on every start, as a shipped migration never changes
+TTL_INDEXES = [
+    ("sync_jobs", {"finished_at": 1}, settings.SYNC_JOB_RETENTION_DAYS * 24 * 3600),
+    ("sync_runs", {"finished_at": 1}, settings.SYNC_RUN_RETENTION_DAYS * 24 * 3600)
+]
+
+
+async def get_schema_version() -> int:
+    """Highest migration version applied to the database, 0 for a fresh one"""
+    db = get_database()
+    latest = await db[SCHEMA_MIGRATIONS_COLLECTION].find_one({}, sort=[("_id", DESCENDING)])
+    return latest["_id"] if latest else 0
+
+
+async def run_migrations() -> int:
+    """Apply every pending migration in order and return the resulting schema version.
+
+    Index creation and drops are idempotent, so several processes starting at once is harmless; a
+    version is only recorded once all of its steps succeeded, and a failed one is retried on next start.
+    """
+    db = get_database()
+    current_version = await get_schema_version()
+
+    for migration in MIGRATIONS:
+        if migration.version <= current_version:
+            continue
+
+        logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+        started = time.perf_counter()
+        if migration.before is not None:
+            await migration.before(db)
+        for collection_name, indexes in migration.indexes.items():
+            await db[collection_name].create_indexes(indexes)
+        # Only once their replacements exist
+        for collection_name, index_names in migration.drop_indexes.items():
+            for index_name in index_names:
+                try:
+                    await db[collection_name].drop_index(index_name)
+                except OperationFailure as e:
+                    if e.code != INDEX_NOT_FOUND:
+                        raise
+
+        await db[SCHEMA_MIGRATIONS_COLLECTION].update_one(
+            {"_id": migration.version},
+            {"$set": {
+                "description": migration.description,
+                "applied_at": datetime.utcnow(),
+                "duration_seconds": round(time.perf_counter() - started, 3)
+            }},
+            upsert=True
+        )
+        current_version = migration.version
+
+    return current_version
+
+
+async def apply_ttl_settings():
+    """Align the expireAfterSeconds of the TTL indexes with the configured retention"""
+    db = get_database()
+    for collection_name, key_pattern, expire_after_seconds in TTL_INDEXES:
+        try:
+            await db.command(
+                "collMod",
+                collection_name,
+                index={"keyPattern": key_pattern, "expireAfterSeconds": expire_after_seconds}
+            )
+        except Exception as e:
+            logger.error(f"Failed to apply TTL setting to {collection_name}: {e}")
@@ -1,29 +1,167 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from collections import deque
+from typing import Dict, Any
 from config import settings
+import asyncio
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+# Warm-up rounds of concurrent pings before giving up on reaching MONGODB_MIN_POOL_SIZE
+WARM_UP_ROUNDS = 5
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters fed by pymongo's pool events, to spot pool saturation.
+
+    Events arrive on Motor's executor threads, so updates are made under a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # Checkout start time of the operation running on each thread
+        self.local = threading.local()
+        self.open_connections = 0
+        self.created_connections = 0
+        self.closed_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_timeouts = 0
+        self.pool_clears = 0
+        # Seconds spent waiting for a connection, for the most recent checkouts
+        self.checkout_waits = deque(maxlen=1000)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self.lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self.lock:
+            self.created_connections += 1
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.closed_connections += 1
+            self.open_connections -= 1
+
+    def connection_check_out_started(self, event):
+        self.local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self.checkout_failures += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+
+    def connection_checked_out(self, event):
+        waited = time.perf_counter() - getattr(self.local, "started", time.perf_counter())
+        with self.lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.checkout_waits.append(waited)
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.checked_out -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool usage; saturation near 1 or checkout timeouts mean MONGODB_MAX_POOL_SIZE is too small"""
+        with self.lock:
+            waits = sorted(self.checkout_waits)
+            stats = {
+                "max_pool_size": settings.MONGODB_MAX_POOL_SIZE,
+                "min_pool_size": settings.MONGODB_MIN_POOL_SIZE,
+                "open_connections": self.open_connections,
+                "created_connections": self.created_connections,
+                "closed_connections": self.closed_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_timeouts": self.checkout_timeouts,
+                "pool_clears": self.pool_clears
+            }
+        stats["saturation"] = round(stats["checked_out"] / settings.MONGODB_MAX_POOL_SIZE, 3)
+        stats["peak_saturation"] = round(stats["max_checked_out"] / settings.MONGODB_MAX_POOL_SIZE, 3)
+        stats["checkout_wait_ms_p50"] = round(waits[len(waits) // 2] * 1000, 3) if waits else 0.0
+        stats["checkout_wait_ms_p95"] = round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 3) if waits else 0.0
+        return stats
+
 class MongoDB:
     client: AsyncIOMotorClient = None
     database = None
+    # Same database with MONGODB_ANALYTICS_READ_PREFERENCE, for analytics over collections without snapshot generations
+    analytics_database = None
 
 mongodb = MongoDB()
+pool_metrics = MongoPoolMetrics()
 
 async def connect_to_mongo():
     """Create database connection"""
     try:
-        mongodb.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        client_options = {
+            "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+            "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "appname": settings.MONGODB_APP_NAME,
+            "event_listeners": [pool_metrics]
+        }
+        # Compressors whose library isn't installed are skipped by pymongo with a warning
+        if settings.MONGODB_COMPRESSORS:
+            client_options["compressors"] = settings.MONGODB_COMPRESSORS
+
+        mongodb.client = AsyncIOMotorClient(settings.MONGODB_URL, **client_options)
         mongodb.database = mongodb.client[settings.DATABASE_NAME]
-        
+        mongodb.analytics_database = mongodb.client.get_database(
+            settings.DATABASE_NAME,
+            read_preference=make_read_preference(read_pref_mode_from_name(settings.MONGODB_ANALYTICS_READ_PREFERENCE), None)
+        )
+
         # Test connection
         await mongodb.client.admin.command('ping')
         logger.info("Successfully connected to MongoDB")
-        
+
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
 
+async def warm_up_pool():
+    """Open MONGODB_MIN_POOL_SIZE connections before serving, so the first burst after a deploy doesn't pay for them"""
+    target = settings.MONGODB_MIN_POOL_SIZE
+    if not mongodb.client or target <= 0:
+        return
+
+    started = time.perf_counter()
+    try:
+        # Concurrent pings each need a connection of their own while they overlap
+        for _ in range(WARM_UP_ROUNDS):
+            if pool_metrics.open_connections >= target:
+                break
+            await asyncio.gather(*(mongodb.client.admin.command('ping') for _ in range(target)))
+        logger.info(f"MongoDB pool warmed up: {pool_metrics.open_connections}/{target} connections open in {time.perf_counter() - started:.2f}s")
+
+    except Exception as e:
+        logger.error(f"Failed to warm up MongoDB pool: {e}")
+
 async def close_mongo_connection():
     """Close database connection"""
     if mongodb.client:
@@ -32,4 +170,18 @@ async def close_mongo_connection():
 
 def get_database():
     """Get database instance"""
-    return mongodb.database
\ No newline at end of file
+    return mongodb.database
+
+def get_analytics_database():
+    """Get database instance for analytics reads, which may be served by secondaries.
+
+    Not for generation-filtered reads (jira_tasks, jira_projects): the active generation pointer
+    is read from the primary, and a lagging secondary may not have that generation yet.
+    """
+    if mongodb.analytics_database is not None:
+        return mongodb.analytics_database
+    return mongodb.database
+
+def get_pool_stats() -> Dict[str, Any]:
+    """MongoDB connection pool usage"""
+    return pool_metrics.snapshot()
@@ -0,0 +1,309 @@
+"""
+Offline stand-in for the Jira Cloud REST endpoints JiraService calls.
+
+Serves /rest/api/3/myself, /project, /search (startAt/total), /search/jql (nextPageToken) and
+/issue/{id}/changelog over synthetic projects and issues (expand=changelog embeds the histories), with optional latency, 429 and 410 injection. It can also
+record responses from a real site to a JSON file and replay them later without credentials.
+
+Run standalone:
+    JIRA_STUB_ISSUES=10000 JIRA_STUB_PORT=8081 python jira_stub_server.py
+then connect Jira with domain http://127.0.0.1:8081 and any email / API token.
+
+Environment variables:
+    JIRA_STUB_PORT            port to listen on (8081)
+    JIRA_STUB_ISSUES          number of synthetic issues (1000)
+    JIRA_STUB_PROJECTS        number of synthetic projects, the first one is SCRUM (1)
+    JIRA_STUB_LATENCY_MS      delay added to every response (0)
+    JIRA_STUB_429_RATE        fraction of search requests answered with 429 (0)
+    JIRA_STUB_RETRY_AFTER     Retry-After seconds sent with injected 429s (1)
+    JIRA_STUB_GONE_SEARCH_JQL answer /search/jql with 410 to force the legacy endpoint (false)
+    JIRA_STUB_RECORD_UPSTREAM real Jira site to proxy to and record from
+    JIRA_STUB_RECORD_FILE     file recorded responses are written to / replayed from
+    JIRA_STUB_REPLAY          serve only recorded responses from JIRA_STUB_RECORD_FILE (false)
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import ClientDisconnect
+
+ISSUE_TYPES = ["Story", "Task", "Bug", "Epic"]
+STATUSES = ["To Do", "In Progress", "Done"]
+PRIORITIES = ["Highest", "High", "Medium", "Low"]
+MAX_PAGE_SIZE = 5000
+
+
+class JiraStub:
+    """Synthetic Jira site: issue i belongs to project i % projects and was updated i minutes ago"""
+
+    def __init__(
+        self,
+        issues: int = 1000,
+        projects: int = 1,
+        latency_ms: float = 0,
+        rate_429: float = 0,
+        retry_after: float = 1,
+        gone_search_jql: bool = False,
+        record_upstream: str = "",
+        record_file: str = "",
+        replay: bool = False,
+        seed: int = 42
+    ):
+        self.issue_count = issues
+        self.project_keys = ["SCRUM"] + [f"PRJ{n}" for n in range(2, projects + 1)]
+        self.latency = latency_ms / 1000
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.gone_search_jql = gone_search_jql
+        self.record_upstream = record_upstream.rstrip("/")
+        self.record_file = record_file
+        self.replay = replay
+        self.random = random.Random(seed)
+        self.started_at = datetime.utcnow().replace(microsecond=0)
+        self.recordings: Dict[str, Dict[str, Any]] = {}
+        self.request_count = 0
+
+        if record_file and os.path.exists(record_file):
+            with open(record_file) as f:
+                self.recordings = json.load(f)
+
+    def build_issue(self, index: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Build synthetic issue number `index`, limited to the requested fields"""
+        project_key = self.project_keys[index % len(self.project_keys)]
+        updated = self.started_at - timedelta(minutes=index)
+        created = updated - timedelta(days=30)
+        assignee_number = index % 25
+        all_fields = {
+            "summary": f"Synthetic issue {index}",
+            "status": {"name": STATUSES[index % len(STATUSES)]},
+            "issuetype": {"name": ISSUE_TYPES[index % len(ISSUE_TYPES)]},
+            "priority": {"name": PRIORITIES[index % len(PRIORITIES)]},
+            "duedate": (created + timedelta(days=45)).date().isoformat(),
+            "assignee": {"displayName": f"User {assignee_number}", "emailAddress": f"user{assignee_number}@example.com"},
+            "created": created.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+            "updated": updated.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+            "project": {"key": project_key, "name": f"Project {project_key}"},
+            "customfield_10015": None
+        }
+        if fields is not None:
+            all_fields = {name: value for name, value in all_fields.items() if name in fields}
+        return {
+            "id": str(10000 + index),
+            "key": f"{project_key}-{index // len(self.project_keys) + 1}",
+            "self": f"http://jira-stub/rest/api/3/issue/{10000 + index}",
+            "fields": all_fields
+        }
+
+    def build_changelog(self, index: int) -> List[Dict[str, Any]]:
+        """Status histories of synthetic issue `index`: one per status it moved through, the last at its update"""
+        updated = self.started_at - timedelta(minutes=index)
+        steps = index % len(STATUSES)
+        return [
+            {
+                "id": str((10000 + index) * 10 + step),
+                "created": (updated - timedelta(days=steps - 1 - step)).strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                "items": [{"field": "status", "fromString": STATUSES[step], "toString": STATUSES[step + 1]}]
+            }
+            for step in range(steps)
+        ]
+
+    def matching_indexes(self, jql: str) -> Optional[List[int]]:
+        """Issue indexes matching the JQL subset JiraService sends, or None for an unknown project"""
+        indexes = range(self.issue_count)
+
+        project_match = re.search(r"project\s*=\s*\"?([A-Za-z0-9_]+)\"?", jql)
+        if project_match:
+            project_key = project_match.group(1)
+            if project_key not in self.project_keys:
+                return None
+            position = self.project_keys.index(project_key)
+            indexes = range(position, self.issue_count, len(self.project_keys))
+
+        type_match = re.search(r"issuetype\s*(?:=\s*(\w+)|in\s*\(([^)]*)\))", jql)
+        if type_match:
+            names = {name.strip().strip('"') for name in (type_match.group(1) or type_match.group(2)).split(",")}
+            indexes = [i for i in indexes if ISSUE_TYPES[i % len(ISSUE_TYPES)] in names]
+
+        window_match = re.search(r"updated\s*>=\s*\"-(\d+)m\"", jql)
+        if window_match:
+            # Issue i was updated i minutes before the stub started; count time since then too
+            elapsed_minutes = (datetime.utcnow() - self.started_at).total_seconds() / 60
+            window = int(int(window_match.group(1)) - elapsed_minutes)
+            indexes = [i for i in indexes if i <= window]
+
+        # ORDER BY updated DESC is the natural index order
+        return list(indexes)
+
+    def search(self, body: Dict[str, Any], legacy: bool) -> Response:
+        """Answer one page of a /search or /search/jql request"""
+        indexes = self.matching_indexes(body.get("jql", ""))
+        if indexes is None:
+            return JSONResponse(status_code=400, content={"errorMessages": ["The value does not exist for the field 'project'."]})
+
+        page_size = min(int(body.get("maxResults", 50)), MAX_PAGE_SIZE)
+        if legacy:
+            start = int(body.get("startAt", 0))
+        else:
+            start = int(body.get("nextPageToken") or 0)
+        fields = body.get("fields")
+        page = [self.build_issue(i, fields) for i in indexes[start:start + page_size]]
+        if "changelog" in (body.get("expand") or ""):
+            for issue in page:
+                histories = self.build_changelog(int(issue["id"]) - 10000)
+                issue["changelog"] = {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories}
+
+        if legacy:
+            return JSONResponse(content={"startAt": start, "maxResults": page_size, "total": len(indexes), "issues": page})
+
+        data: Dict[str, Any] = {"issues": page}
+        if start + page_size < len(indexes):
+            data["nextPageToken"] = str(start + page_size)
+        else:
+            data["isLast"] = True
+        return JSONResponse(content=data)
+
+    def changelog(self, issue_id: str, start: int, page_size: int) -> Response:
+        """Answer one page of /issue/{id}/changelog"""
+        index = int(issue_id) - 10000 if issue_id.isdigit() else -1
+        if not 0 <= index < self.issue_count:
+            return JSONResponse(status_code=404, content={"errorMessages": ["Issue does not exist or you do not have permission to see it."]})
+        histories = self.build_changelog(index)
+        values = histories[start:start + page_size]
+        return JSONResponse(content={
+            "startAt": start,
+            "maxResults": page_size,
+            "total": len(histories),
+            "isLast": start + len(values) >= len(histories),
+            "values": values
+        })
+
+    def projects(self) -> Response:
+        """Answer /project"""
+        return JSONResponse(content=[
+            {"id": str(100 + n), "key": key, "name": f"Project {key}", "description": "", "lead": {"displayName": "User 0"}}
+            for n, key in enumerate(self.project_keys)
+        ])
+
+    def recording_key(self, method: str, path: str, body: bytes) -> str:
+        """Key a request by method, path and canonical JSON body"""
+        try:
+            canonical = json.dumps(json.loads(body), sort_keys=True) if body else ""
+        except ValueError:
+            canonical = body.decode(errors="replace")
+        return f"{method} {path} {canonical}"
+
+    async def record(self, request: Request, path: str, body: bytes) -> Response:
+        """Forward a request to the upstream site and keep its response for replay"""
+        headers = {name: value for name, value in request.headers.items() if name.lower() in ("authorization", "accept", "content-type")}
+        async with httpx.AsyncClient(timeout=60) as client:
+            upstream = await client.request(request.method, f"{self.record_upstream}/rest/api/3/{path}", content=body, headers=headers)
+
+        self.recordings[self.recording_key(request.method, path, body)] = {
+            "status": upstream.status_code,
+            "body": upstream.text,
+            "retry_after": upstream.headers.get("Retry-After")
+        }
+        if self.record_file:
+            with open(self.record_file, "w") as f:
+                json.dump(self.recordings, f)
+        return Response(content=upstream.content, status_code=upstream.status_code, media_type="application/json")
+
+    def replay_response(self, method: str, path: str, body: bytes) -> Response:
+        """Serve a recorded response, or 404 if the request was never recorded"""
+        recorded = self.recordings.get(self.recording_key(method, path, body))
+        if recorded is None:
+            return JSONResponse(status_code=404, content={"errorMessages": [f"No recording for {method} /rest/api/3/{path}"]})
+        headers = {"Retry-After": recorded["retry_after"]} if recorded.get("retry_after") else None
+        return Response(content=recorded["body"], status_code=recorded["status"], media_type="application/json", headers=headers)
+
+    async def handle(self, request: Request, path: str) -> Response:
+        """Route a Jira REST request, applying the configured faults first"""
+        self.request_count += 1
+        body = await request.body()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.replay:
+            return self.replay_response(request.method, path, body)
+        if self.record_upstream:
+            return await self.record(request, path, body)
+
+        if path == "myself":
+            return JSONResponse(content={"accountId": "stub-account", "displayName": "Stub User", "emailAddress": "stub@example.com"})
+        if path == "project":
+            return self.projects()
+        changelog_match = re.fullmatch(r"issue/([^/]+)/changelog", path)
+        if changelog_match:
+            params = request.query_params
+            return self.changelog(changelog_match.group(1), int(params.get("startAt", 0)), int(params.get("maxResults", 100)))
+        if path not in ("search", "search/jql"):
+            return JSONResponse(status_code=404, content={"errorMessages": [f"Unknown endpoint /rest/api/3/{path}"]})
+
+        if path == "search/jql" and self.gone_search_jql:
+            return JSONResponse(status_code=410, content={"errorMessages": ["This endpoint has been removed."]})
+        if self.rate_429 and self.random.random() < self.rate_429:
+            return JSONResponse(status_code=429, content={"errorMessages": ["Rate limit exceeded."]}, headers={"Retry-After": str(self.retry_after)})
+
+        search_body = json.loads(body) if body else dict(request.query_params)
+        return self.search(search_body, legacy=(path == "search"))
+
+
+def create_jira_stub_app(stub: JiraStub) -> FastAPI:
+    """Create the FastAPI app serving a JiraStub under /rest/api/3 (swap app.state.stub to reconfigure)"""
+    app = FastAPI(title="Jira Stub")
+
+    @app.api_route("/rest/api/3/{path:path}", methods=["GET", "POST"])
+    async def jira_api(path: str, request: Request):
+        try:
+            return await request.app.state.stub.handle(request, path)
+        except ClientDisconnect:
+            # The caller gave up on the request, e.g. a cancelled sync
+            return Response(status_code=499)
+
+    app.state.stub = stub
+    return app
+
+
+def start_jira_stub_server(stub: JiraStub, port: int):
+    """Serve a JiraStub on localhost from its own thread and event loop, for benchmarks and test scripts.
+
+    Returns (app, server, thread); set server.should_exit and join the thread to stop it.
+    """
+    import uvicorn
+    app = create_jira_stub_app(stub)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return app, server, thread
+
+
+def stub_from_env() -> JiraStub:
+    """Build a JiraStub from the JIRA_STUB_* environment variables"""
+    return JiraStub(
+        issues=int(os.getenv("JIRA_STUB_ISSUES", "1000")),
+        projects=int(os.getenv("JIRA_STUB_PROJECTS", "1")),
+        latency_ms=float(os.getenv("JIRA_STUB_LATENCY_MS", "0")),
+        rate_429=float(os.getenv("JIRA_STUB_429_RATE", "0")),
+        retry_after=float(os.getenv("JIRA_STUB_RETRY_AFTER", "1")),
+        gone_search_jql=os.getenv("JIRA_STUB_GONE_SEARCH_JQL", "false").lower() == "true",
+        record_upstream=os.getenv("JIRA_STUB_RECORD_UPSTREAM", ""),
+        record_file=os.getenv("JIRA_STUB_RECORD_FILE", ""),
+        replay=os.getenv("JIRA_STUB_REPLAY", "false").lower() == "true"
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+    stub = stub_from_env()
+    print(f"🧪 Jira stub serving {stub.issue_count} issues across {len(stub.project_keys)} project(s)")
+    uvicorn.run(create_jira_stub_app(stub), host="127.0.0.1", port=int(os.getenv("JIRA_STUB_PORT", "8081")))
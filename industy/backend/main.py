@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -13,16 +14,20 @@ from routers.users import router as users_router
 from routers.files import router as files_router
 from routers.projects import router as projects_router
 from routers.reports import router as reports_router
+from routers.webhooks import router as webhooks_router
 
 # Import database connection
-from db import connect_to_mongo, close_mongo_connection
+from db import connect_to_mongo, close_mongo_connection, warm_up_pool, get_pool_stats
 from db.init_db import init_database
+from db.migrations import get_schema_version, LATEST_SCHEMA_VERSION
 from db.mongodb import get_database
-from services.jira_service import jira_service, JiraTask
+from services.jira_service import jira_service, JiraTask, SyncTimings
 from datetime import datetime
 
 # Import services
 from services import scheduler_service
+from services.jira_http import jira_client_registry
+from utils.dependencies import get_current_admin_user
 
 # Configure logging
 logging.basicConfig(
@@ -31,23 +36,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def log_migration_result(task: asyncio.Task):
+    """Surface a failed background migration, which nothing else awaits in the API process"""
+    if task.cancelled():
+        logger.warning("Schema migrations were cancelled before they finished")
+    elif task.exception() is not None:
+        logger.critical(f"Schema migrations failed, serving without the latest indexes: {task.exception()}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("Starting Multi Desk Backend...")
     await connect_to_mongo()
-    await init_database()
+    await warm_up_pool()
+    # Index builds can take minutes on large collections, so they run without blocking startup
+    migration_task = asyncio.create_task(init_database())
+    migration_task.add_done_callback(log_migration_result)
+    await jira_client_registry.start()
     logger.info("Multi Desk Backend started successfully")
     
-    # Start scheduler in background
-    scheduler_task = asyncio.create_task(scheduler_service.start_scheduler())
+    # Start scheduler in background; its first tick waits for the migrations
+    scheduler_task = asyncio.create_task(scheduler_service.start_scheduler(migration_task))
     
     yield
     
     # Shutdown
     logger.info("Shutting down Multi Desk Backend...")
-    scheduler_service.stop_scheduler()
+    await scheduler_service.stop_scheduler()
+    scheduler_task.cancel()
+    if not migration_task.done():
+        migration_task.cancel()
+    await jira_client_registry.close()
     await close_mongo_connection()
     logger.info("Multi Desk Backend shut down successfully")
 
@@ -56,7 +76,8 @@ app = FastAPI(
     title="Multi Desk API",
     description="Backend API for Multi Desk Dashboard Tool",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -84,6 +105,7 @@ app.include_router(users_router)
 app.include_router(files_router)
 app.include_router(projects_router)
 app.include_router(reports_router)
+app.include_router(webhooks_router)
 
 # Root endpoint
 @app.get("/")
@@ -99,12 +121,26 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    try:
+        schema_version = await get_schema_version()
+    except Exception as e:
+        logger.error(f"Failed to read schema version: {e}")
+        schema_version = None
+    
     return {
         "status": "healthy",
-        "service": "multi-desk-backend"
+        "service": "multi-desk-backend",
+        "schema_version": schema_version,
+        "latest_schema_version": LATEST_SCHEMA_VERSION
     }
 
 
+@app.get("/api/mongo/pool")
+async def mongo_pool_stats(current_user = Depends(get_current_admin_user)):
+    """MongoDB connection pool usage and saturation"""
+    return get_pool_stats()
+
+
 @app.get("/api/mongo/connection-test")
 async def test_mongo_connection():
     """Test MongoDB connection endpoint"""
@@ -199,21 +235,18 @@ async def test_jira_fetch():
                 "message": f"Invalid JIRA connection for user {user_id}. Please check credentials."
             }
         
-        # Fetch tasks using the same method as sync
-        tasks = await jira_service.fetch_jira_tasks(credentials, user_id)
-        
-        # Store tasks if any found
-        storage_result = True
-        if tasks:
-            storage_result = await jira_service.store_jira_tasks(user_id, tasks)
+        # Fetch and store tasks page by page, the same way a full sync does
+        timings = SyncTimings()
+        task_count, jql_filter = await jira_service.sync_jira_tasks_full(credentials, user_id, timings)
         
         return {
             "status": "success",
             "credentials_found": credentials is not None,
             "connection_valid": is_valid,
-            "tasks_fetched": len(tasks),
-            "storage_result": storage_result,
-            "message": f"JIRA fetch test completed. Fetched {len(tasks)} tasks."
+            "tasks_fetched": task_count,
+            "storage_result": jql_filter is not None,
+            "pages": timings.counters.get("pages", 0),
+            "message": f"JIRA fetch test completed. Fetched {task_count} tasks."
         }
     
     except Exception as e:
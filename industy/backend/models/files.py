@@ -11,8 +11,10 @@ class FileFilter(BaseModel):
 class FileListResponse(BaseModel):
     files: List[FileUpload]
     total: int
+    total_is_estimate: bool = False
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 class FileUploadResponse(BaseModel):
     id: str
@@ -91,6 +91,8 @@ class AnalyticsData(BaseModel):
     tasks_by_status: List[TaskByStatus]
     task_velocity: List[TaskVelocityData]
     issue_type_distribution: List[IssueTypeData]
+    cycle_time_days: Optional[float] = None  # first In Progress -> Done, averaged over completed tasks
+    lead_time_days: Optional[float] = None  # created -> Done, averaged over completed tasks
 
 class FileUpload(BaseModel):
     id: str
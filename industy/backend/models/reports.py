@@ -41,8 +41,10 @@ class ReportResponse(BaseModel):
 class ReportListResponse(BaseModel):
     reports: List[ReportMetadata]
     total: int
+    total_is_estimate: bool = False
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 class ReportGenerationRequest(BaseModel):
     report_type: str
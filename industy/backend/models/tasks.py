@@ -15,8 +15,10 @@ class TaskFilter(BaseModel):
 class TaskResponse(BaseModel):
     tasks: List[JiraTask]
     total: int
+    total_is_estimate: bool = False
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 class TaskCreate(BaseModel):
     summary: str
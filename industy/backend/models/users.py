@@ -11,8 +11,10 @@ class UserFilter(BaseModel):
 class UserListResponse(BaseModel):
     users: List[UserResponse]
     total: int
+    total_is_estimate: bool = False
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 class UserCreate(BaseModel):
     email: str
@@ -6,5 +6,6 @@ from .users import router as users_router
 from .files import router as files_router
 from .projects import router as projects_router
 from .reports import router as reports_router
+from .webhooks import router as webhooks_router
 
-__all__ = ["auth_router", "jira_router", "dashboard_router", "tasks_router", "users_router", "files_router", "projects_router", "reports_router"]
\ No newline at end of file
+__all__ = ["auth_router", "jira_router", "dashboard_router", "tasks_router", "users_router", "files_router", "projects_router", "reports_router", "webhooks_router"]
\ No newline at end of file
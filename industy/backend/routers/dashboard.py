@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from models.dashboard import DashboardResponse
 from services.dashboard_service import dashboard_service
 from utils.dependencies import get_current_user
+from utils.serialization import ModelResponse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,8 +38,7 @@ async def get_eisenhower_matrix(current_user = Depends(get_current_user)):
     """Get Eisenhower Matrix data for the current user"""
     try:
         eisenhower = await dashboard_service.get_eisenhower_matrix(current_user.id)
-        # Convert Pydantic model to dictionary
-        return eisenhower.dict()
+        return ModelResponse(eisenhower)
     except Exception as e:
         logger.error(f"Failed to get Eisenhower Matrix for user {current_user.id}: {e}")
         raise
@@ -52,7 +52,9 @@ async def get_analytics_data(current_user = Depends(get_current_user)):
         return {
             "tasks_by_status": [item.dict() for item in analytics.tasks_by_status],
             "task_velocity": [item.dict() for item in analytics.task_velocity],
-            "issue_type_distribution": [item.dict() for item in analytics.issue_type_distribution]
+            "issue_type_distribution": [item.dict() for item in analytics.issue_type_distribution],
+            "cycle_time_days": analytics.cycle_time_days,
+            "lead_time_days": analytics.lead_time_days
         }
     except Exception as e:
         logger.error(f"Failed to get analytics data for user {current_user.id}: {e}")
@@ -3,6 +3,8 @@ from typing import Optional
 from models.files import FileListResponse, FileFilter, FileDetailResponse
 from services.files_service import files_service
 from utils.dependencies import get_current_user
+from utils.pagination import get_cursor
+from utils.serialization import ModelResponse
 import logging
 from services.leave_processor import process_leave_file
 from fastapi import BackgroundTasks
@@ -54,8 +56,10 @@ async def get_files(
     search: Optional[str] = Query(None, description="Search in filename"),
     status: Optional[str] = Query(None, description="Filter by status"),
     file_type: Optional[str] = Query(None, description="Filter by file type"),
-    page: int = Query(1, ge=1, description="Page number"),
-    size: int = Query(50, ge=1, le=100, description="Page size")
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
+    size: int = Query(50, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Depends(get_cursor),
+    exact_total: bool = Query(False, description="Recount the total instead of reusing a recent count")
 ):
     """Get files - NO AUTH for testing"""
     test_user_id = "test_user_123"
@@ -67,8 +71,8 @@ async def get_files(
             file_type=file_type
         )
         
-        result = await files_service.get_files(test_user_id, filter_params, page, size)
-        return FileListResponse(**result)
+        result = await files_service.get_files(test_user_id, filter_params, page, size, cursor, exact_total)
+        return ModelResponse(FileListResponse.model_construct(**result))
         
     except Exception as e:
         logger.error(f"Failed to get files: {e}")
@@ -1,8 +1,13 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Query
+from typing import Optional
+from fastapi.responses import JSONResponse, Response
+from config import settings
 from models.jira import JiraCredentialsCreate
-from services.jira_service import jira_service
-from utils.dependencies import get_current_user
+from services.jira_service import jira_service, JiraAPIError
+from services.issue_cache_service import issue_cache_service
+from services.sync_queue_service import sync_queue_service
+from services.sync_run_service import sync_run_service
+from utils.dependencies import get_current_user, get_current_admin_user
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,8 +33,16 @@ async def connect_jira(credentials: JiraCredentialsCreate, current_user = Depend
                 detail="Invalid Jira credentials"
             )
         
-        # Sync initial data
+        # Sync initial data, or hand it to the sync workers when the job queue is enabled
+        if settings.SYNC_QUEUE_ENABLED:
+            queued = await sync_queue_service.enqueue(current_user.id, stored_credentials.domain)
+            return {
+                "message": "Jira connected successfully",
+                "sync_status": "queued" if queued else "failed"
+            }
+        
         sync_success = await jira_service.sync_jira_data(current_user.id)
+        issue_cache_service.invalidate(user_id=current_user.id)
         if not sync_success:
             logger.warning(f"Initial sync failed for user {current_user.id}")
         
@@ -59,8 +72,8 @@ async def validate_jira_connection(current_user = Depends(get_current_user)):
                 detail="Jira credentials not found"
             )
         
-        # Validate connection
-        is_valid = await jira_service.validate_jira_connection(credentials)
+        # Validate connection against Jira directly, bypassing the validation cache
+        is_valid = await jira_service.validate_jira_connection(credentials, use_cache=False)
         
         return {
             "is_valid": is_valid,
@@ -82,7 +95,16 @@ async def sync_jira_data(current_user = Depends(get_current_user)):
     test_user_id = "test_user_123"
     
     try:
+        if settings.SYNC_QUEUE_ENABLED:
+            if not await sync_queue_service.enqueue(test_user_id):
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to queue Jira sync"
+                )
+            return {"message": "Jira sync queued"}
+        
         success = await jira_service.sync_jira_data(test_user_id)
+        issue_cache_service.invalidate(user_id=test_user_id)
         
         if success:
             return {"message": "Jira data synced successfully"}
@@ -101,6 +123,43 @@ async def sync_jira_data(current_user = Depends(get_current_user)):
             detail="Failed to sync Jira data"
         )
 
+@router.get("/sync/runs", response_model=dict)
+async def get_sync_runs(
+    limit: int = Query(20, ge=1, le=100, description="Number of runs to return"),
+    current_user = Depends(get_current_user)
+):
+    """Latest sync runs of the current user with per-phase timings and counters"""
+    try:
+        runs = await sync_run_service.get_recent_runs(current_user.id, limit)
+        return {"runs": runs}
+        
+    except Exception as e:
+        logger.error(f"Failed to get sync runs for user {current_user.id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get sync runs"
+        )
+
+@router.get("/sync/runs/summary", response_model=dict)
+async def get_sync_run_summary(
+    hours: int = Query(24, ge=1, le=24 * 90, description="Look-back window in hours"),
+    mode: Optional[str] = Query(None, pattern="^(full|delta)$", description="Only full or only delta syncs"),
+    current_user = Depends(get_current_admin_user)
+):
+    """p50 / p95 of each sync phase and counter across all users, plus sync job counts per status, for capacity planning (admin only)"""
+    try:
+        summary = await sync_run_service.get_summary(hours, mode)
+        # Queued / running / done / dead jobs; all zero when SYNC_QUEUE_ENABLED is off
+        summary["queue"] = await sync_queue_service.get_queue_stats()
+        return summary
+        
+    except Exception as e:
+        logger.error(f"Failed to summarise sync runs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to summarise sync runs"
+        )
+
 @router.get("/connection-status", response_model=dict)
 async def get_connection_status(current_user = Depends(get_current_user)):
     """Get Jira connection status for the current user"""
@@ -160,27 +219,44 @@ async def check_jira_connection(current_user = Depends(get_current_user)):
             detail="Failed to check Jira connection"
         )
 
+async def get_cached_issues(request: Request, current_user, project_key: str, issue_type: str) -> Response:
+    """Serve a cached issue list for a project, answering 304 when the client's ETag still matches"""
+    credentials = await jira_service.get_jira_credentials(current_user.id)
+    if not credentials or not credentials.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Jira credentials not found"
+        )
+    
+    # Connection is only validated when the cache has to go to Jira
+    try:
+        cached = await issue_cache_service.get_issues(credentials, project_key, issue_type)
+    except JiraAPIError as e:
+        logger.error(f"Failed to load {issue_type} issues for project {project_key} from Jira: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to fetch issues from Jira"
+        )
+    if cached is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Jira connection"
+        )
+    
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": f"private, max-age={settings.JIRA_ISSUE_CACHE_TTL}",
+        "X-Cache-Source": cached.source
+    }
+    if request.headers.get("If-None-Match") == cached.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=cached.issues, headers=headers)
+
 @router.get("/issues/all/{project_key}")
-async def get_all_issues(project_key: str, current_user = Depends(get_current_user)):
+async def get_all_issues(project_key: str, request: Request, current_user = Depends(get_current_user)):
     """Get all issues for a specific project"""
     try:
-        credentials = await jira_service.get_jira_credentials(current_user.id)
-        if not credentials or not credentials.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Jira credentials not found"
-            )
-        
-        # Validate connection before fetching issues
-        is_valid = await jira_service.validate_jira_connection(credentials)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid Jira connection"
-            )
-        
-        issues = await jira_service.fetch_issues_by_jql(credentials, f"project={project_key}")
-        return JSONResponse(content=issues)
+        return await get_cached_issues(request, current_user, project_key, "all")
         
     except HTTPException:
         raise
@@ -192,26 +268,10 @@ async def get_all_issues(project_key: str, current_user = Depends(get_current_us
         )
 
 @router.get("/issues/epics/{project_key}")
-async def get_epics(project_key: str, current_user = Depends(get_current_user)):
+async def get_epics(project_key: str, request: Request, current_user = Depends(get_current_user)):
     """Get epics for a specific project"""
     try:
-        credentials = await jira_service.get_jira_credentials(current_user.id)
-        if not credentials or not credentials.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Jira credentials not found"
-            )
-        
-        # Validate connection before fetching issues
-        is_valid = await jira_service.validate_jira_connection(credentials)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid Jira connection"
-            )
-        
-        issues = await jira_service.fetch_epics(credentials, project_key)
-        return JSONResponse(content=issues)
+        return await get_cached_issues(request, current_user, project_key, "epics")
         
     except HTTPException:
         raise
@@ -223,26 +283,10 @@ async def get_epics(project_key: str, current_user = Depends(get_current_user)):
         )
 
 @router.get("/issues/stories/{project_key}")
-async def get_stories(project_key: str, current_user = Depends(get_current_user)):
+async def get_stories(project_key: str, request: Request, current_user = Depends(get_current_user)):
     """Get stories for a specific project"""
     try:
-        credentials = await jira_service.get_jira_credentials(current_user.id)
-        if not credentials or not credentials.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Jira credentials not found"
-            )
-        
-        # Validate connection before fetching issues
-        is_valid = await jira_service.validate_jira_connection(credentials)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid Jira connection"
-            )
-        
-        issues = await jira_service.fetch_stories(credentials, project_key)
-        return JSONResponse(content=issues)
+        return await get_cached_issues(request, current_user, project_key, "stories")
         
     except HTTPException:
         raise
@@ -254,26 +298,10 @@ async def get_stories(project_key: str, current_user = Depends(get_current_user)
         )
 
 @router.get("/issues/tasks/{project_key}")
-async def get_tasks(project_key: str, current_user = Depends(get_current_user)):
+async def get_tasks(project_key: str, request: Request, current_user = Depends(get_current_user)):
     """Get tasks for a specific project"""
     try:
-        credentials = await jira_service.get_jira_credentials(current_user.id)
-        if not credentials or not credentials.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Jira credentials not found"
-            )
-        
-        # Validate connection before fetching issues
-        is_valid = await jira_service.validate_jira_connection(credentials)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid Jira connection"
-            )
-        
-        issues = await jira_service.fetch_tasks(credentials, project_key)
-        return JSONResponse(content=issues)
+        return await get_cached_issues(request, current_user, project_key, "tasks")
         
     except HTTPException:
         raise
@@ -285,26 +313,10 @@ async def get_tasks(project_key: str, current_user = Depends(get_current_user)):
         )
 
 @router.get("/issues/bugs/{project_key}")
-async def get_bugs(project_key: str, current_user = Depends(get_current_user)):
+async def get_bugs(project_key: str, request: Request, current_user = Depends(get_current_user)):
     """Get bugs for a specific project"""
     try:
-        credentials = await jira_service.get_jira_credentials(current_user.id)
-        if not credentials or not credentials.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Jira credentials not found"
-            )
-        
-        # Validate connection before fetching issues
-        is_valid = await jira_service.validate_jira_connection(credentials)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid Jira connection"
-            )
-        
-        issues = await jira_service.fetch_bugs(credentials, project_key)
-        return JSONResponse(content=issues)
+        return await get_cached_issues(request, current_user, project_key, "bugs")
         
     except HTTPException:
         raise
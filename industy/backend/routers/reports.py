@@ -10,6 +10,7 @@ from services.reports_service import reports_service
 from services.jira_service import jira_service
 from services.users_service import users_service
 from utils.dependencies import get_current_user
+from utils.pagination import get_cursor
 from models.users import UserFilter
 from models.projects import ProjectListResponse, ProjectFilter
 import logging
@@ -21,14 +22,16 @@ router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
 @router.get("/", response_model=ReportListResponse)
 async def get_reports(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     size: int = Query(50, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Depends(get_cursor),
+    exact_total: bool = Query(False, description="Recount the total instead of reusing a recent count"),
     report_type: Optional[str] = Query(None, description="Filter by report type"),
     current_user = Depends(get_current_user)
 ):
     """Get available reports for the current user"""
     try:
-        result = await reports_service.get_available_reports(current_user.id, page, size)
+        result = await reports_service.get_available_reports(current_user.id, page, size, cursor, exact_total)
         return result
     except Exception as e:
         logger.error(f"Failed to get reports for user {current_user.id}: {e}")
@@ -3,6 +3,8 @@ from typing import Optional
 from models.tasks import TaskResponse, TaskFilter, TaskCreate, TaskUpdate
 from services.tasks_service import tasks_service
 from utils.dependencies import get_current_user
+from utils.pagination import get_cursor
+from utils.serialization import ModelResponse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,8 +17,10 @@ async def get_tasks(
     priority: Optional[str] = Query(None, description="Filter by priority"),
     project: Optional[str] = Query(None, description="Filter by project key"),
     assignee: Optional[str] = Query(None, description="Filter by assignee"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     size: int = Query(50, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Depends(get_cursor),
+    exact_total: bool = Query(False, description="Recount the total instead of reusing a recent count"),
     current_user = Depends(get_current_user)
 ):
     """Get tasks for the current user with filtering and pagination"""
@@ -29,8 +33,8 @@ async def get_tasks(
             assignee=assignee
         )
         
-        result = await tasks_service.get_tasks(current_user.id, filter_params, page, size)
-        return TaskResponse(**result)
+        result = await tasks_service.get_tasks(current_user.id, filter_params, page, size, cursor, exact_total)
+        return ModelResponse(TaskResponse.model_construct(**result))
         
     except Exception as e:
         logger.error(f"Failed to get tasks for user {current_user.id}: {e}")
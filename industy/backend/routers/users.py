@@ -3,6 +3,7 @@ from typing import Optional
 from models.users import UserListResponse, UserFilter
 from services.users_service import users_service
 from utils.dependencies import get_current_user
+from utils.pagination import get_cursor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,8 +14,10 @@ async def get_users(
     search: Optional[str] = Query(None, description="Search in user name or email"),
     role: Optional[str] = Query(None, description="Filter by role"),
     status: Optional[str] = Query(None, description="Filter by status (active/inactive)"),
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, description="Page number (ignored when a cursor is given)"),
     size: int = Query(50, ge=1, le=100, description="Page size"),
+    cursor: Optional[str] = Depends(get_cursor),
+    exact_total: bool = Query(False, description="Recount the total instead of reusing a recent count"),
     current_user = Depends(get_current_user)
 ):
     """Get users with filtering and pagination"""
@@ -27,7 +30,7 @@ async def get_users(
             status=status
         )
         
-        result = await users_service.get_users(filter_params, page, size)
+        result = await users_service.get_users(filter_params, page, size, cursor, exact_total)
         return UserListResponse(**result)
         
     except Exception as e:
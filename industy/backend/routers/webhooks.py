@@ -0,0 +1,70 @@
+from fastapi import APIRouter, HTTPException, status, Request, BackgroundTasks
+from config import settings
+from services.jira_service import jira_service
+from services.issue_cache_service import issue_cache_service
+from services.risk_service import run_task_risk_analysis
+import hashlib
+import hmac
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/jira/webhooks", tags=["Jira Webhooks"])
+
+# Webhook events that map to a single jira_tasks document
+ISSUE_EVENTS = {"jira:issue_created", "jira:issue_updated", "jira:issue_deleted"}
+
+
+def verify_webhook_signature(body: bytes, signature: str) -> bool:
+    """Check the X-Hub-Signature HMAC-SHA256 Jira sends with webhooks registered with a secret"""
+    if not settings.JIRA_WEBHOOK_SECRET or not signature:
+        return False
+    expected = hmac.new(settings.JIRA_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature.strip())
+
+
+@router.post("", response_model=dict)
+async def receive_jira_webhook(request: Request, background_tasks: BackgroundTasks):
+    """Apply a Jira issue webhook to the stored tasks"""
+    body = await request.body()
+    if not verify_webhook_signature(body, request.headers.get("X-Hub-Signature", "")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook signature"
+        )
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid webhook payload"
+        )
+
+    event = payload.get("webhookEvent", "")
+    issue = payload.get("issue") or {}
+    if event not in ISSUE_EVENTS or not issue.get("id"):
+        return {"message": "Event ignored", "event": event}
+
+    try:
+        changed, affected_users = await jira_service.apply_issue_event(event, issue)
+    except Exception as e:
+        logger.error(f"Failed to apply Jira webhook {event} for {issue.get('key', issue.get('id'))}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to apply webhook"
+        )
+
+    # Drop cached /api/jira/issues/* responses for the issue's project
+    project_key = ((issue.get("fields") or {}).get("project") or {}).get("key")
+    if project_key:
+        issue_cache_service.invalidate(project_key=project_key)
+    else:
+        issue_cache_service.invalidate()
+
+    # Only the changed users' risk alerts for this issue depend on it, recompute them after responding
+    if issue.get("key") and affected_users:
+        background_tasks.add_task(run_task_risk_analysis, issue["key"], affected_users)
+
+    logger.info(f"Applied Jira webhook {event} for {issue.get('key', issue['id'])}: {changed} task(s) changed")
+    return {"message": "Webhook applied", "event": event, "tasks_changed": changed}
@@ -1,10 +1,13 @@
 from .auth_service import auth_service
 from .email_service import email_service
 from .jira_service import jira_service
+from .issue_cache_service import issue_cache_service
 from .dashboard_service import dashboard_service
 from .tasks_service import tasks_service
 from .users_service import users_service
 from .files_service import files_service
+from .sync_run_service import sync_run_service
+from .sync_policy_service import sync_policy_service
 from .scheduler_service import scheduler_service
 from .reports_service import reports_service
 
@@ -12,10 +15,13 @@ __all__ = [
     "auth_service",
     "email_service",
     "jira_service",
+    "issue_cache_service",
     "dashboard_service",
     "tasks_service",
     "users_service",
     "files_service",
+    "sync_run_service",
+    "sync_policy_service",
     "scheduler_service",
     "reports_service"
 ]
\ No newline at end of file
@@ -1,45 +1,183 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from db import get_database
+from db import get_database, get_analytics_database
+from services.snapshot_service import snapshot_service
+from utils.serialization import projection_for, construct_from_doc
 from models.jira import JiraTask, DashboardStats, EisenhowerQuadrant, TaskByStatus, TaskVelocityData, IssueTypeData, AnalyticsData
 
 logger = logging.getLogger(__name__)
 
+# Status names treated as started / finished when reading status transitions
+IN_PROGRESS_STATUSES = ["In Progress", "In Review", "In Development"]
+DONE_STATUSES = ["Done", "Closed", "Resolved"]
+
+# Window the dashboard trends compare against the window before it
+TREND_PERIOD_DAYS = 30
+
+# Months of history shown in the velocity chart
+VELOCITY_MONTHS = 6
+
+
+def percent_change(current: int, previous: int) -> float:
+    """Percentage change from the previous period, 100% when starting from zero"""
+    if previous == 0:
+        return 100.0 if current else 0.0
+    return round((current - previous) / previous * 100, 1)
+
+
 class DashboardService:
+    async def get_completion_times(self, user_id: str, since: datetime) -> List[Dict[str, Any]]:
+        """Per task completed since a date: when it first started and when it last reached Done"""
+        db = get_analytics_database()
+        pipeline = [
+            {"$match": {"user_id": user_id}},
+            {"$group": {
+                "_id": "$jira_id",
+                "completed_at": {"$max": {"$cond": [{"$in": ["$to_status", DONE_STATUSES]}, "$changed_at", None]}},
+                "started_at": {"$min": {"$cond": [{"$in": ["$to_status", IN_PROGRESS_STATUSES]}, "$changed_at", None]}}
+            }},
+            {"$match": {"completed_at": {"$gte": since}}}
+        ]
+        completions = []
+        async for doc in db.jira_status_transitions.aggregate(pipeline):
+            completions.append(doc)
+        return completions
+
+    async def count_transitions(self, user_id: str, statuses: List[str], start: datetime, end: datetime) -> int:
+        """Count distinct tasks that moved into one of the statuses within [start, end)"""
+        db = get_analytics_database()
+        task_ids = await db.jira_status_transitions.distinct("jira_id", {
+            "user_id": user_id,
+            "to_status": {"$in": statuses},
+            "changed_at": {"$gte": start, "$lt": end}
+        })
+        return len(task_ids)
+
+    async def get_task_velocity(self, user_id: str, now: datetime) -> List[TaskVelocityData]:
+        """Tasks created and completed per calendar month, oldest month first"""
+        db = get_database()
+        months: List[Tuple[int, int]] = []
+        year, month = now.year, now.month
+        for _ in range(VELOCITY_MONTHS):
+            months.insert(0, (year, month))
+            year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+        since = datetime(months[0][0], months[0][1], 1)
+        active_query = await snapshot_service.active_query(user_id)
+
+        created_counts: Dict[Tuple[int, int], int] = {}
+        created_pipeline = [
+            {"$match": {**active_query, "created": {"$gte": since}}},
+            {"$group": {"_id": {"year": {"$year": "$created"}, "month": {"$month": "$created"}}, "count": {"$sum": 1}}}
+        ]
+        async for doc in db.jira_tasks.aggregate(created_pipeline):
+            created_counts[(doc["_id"]["year"], doc["_id"]["month"])] = doc["count"]
+
+        completed_counts: Dict[Tuple[int, int], int] = {}
+        for completion in await self.get_completion_times(user_id, since):
+            completed_at = completion["completed_at"]
+            key = (completed_at.year, completed_at.month)
+            completed_counts[key] = completed_counts.get(key, 0) + 1
+
+        return [
+            TaskVelocityData(
+                month=datetime(year, month, 1).strftime("%b"),
+                tasks=created_counts.get((year, month), 0),
+                completed=completed_counts.get((year, month), 0)
+            )
+            for year, month in months
+        ]
+
+    async def get_flow_times(self, user_id: str, since: datetime) -> Tuple[Optional[float], Optional[float]]:
+        """Average cycle time (started -> done) and lead time (created -> done) in days"""
+        completions = await self.get_completion_times(user_id, since)
+        if not completions:
+            return None, None
+
+        db = get_database()
+        active_query = await snapshot_service.active_query(user_id)
+        created_at = {}
+        async for doc in db.jira_tasks.find(
+            {**active_query, "jira_id": {"$in": [completion["_id"] for completion in completions]}},
+            {"jira_id": 1, "created": 1}
+        ):
+            created_at[doc["jira_id"]] = doc["created"]
+
+        day = timedelta(days=1)
+        cycle_times = [
+            (completion["completed_at"] - completion["started_at"]) / day
+            for completion in completions
+            if completion.get("started_at") and completion["started_at"] <= completion["completed_at"]
+        ]
+        lead_times = [
+            (completion["completed_at"] - created_at[completion["_id"]]) / day
+            for completion in completions
+            if completion["_id"] in created_at
+        ]
+
+        cycle_time = round(sum(cycle_times) / len(cycle_times), 1) if cycle_times else None
+        lead_time = round(sum(lead_times) / len(lead_times), 1) if lead_times else None
+        return cycle_time, lead_time
+
     async def get_dashboard_stats(self, user_id: str) -> DashboardStats:
         """Get dashboard statistics for a user"""
         try:
             db = get_database()
             tasks_collection = db.jira_tasks
+            active_query = await snapshot_service.active_query(user_id)
             
             # Get total tasks
-            total_tasks = await tasks_collection.count_documents({"user_id": user_id})
+            total_tasks = await tasks_collection.count_documents(active_query)
             
             # Get tasks in progress
             in_progress_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
+                **active_query,
                 "status": {"$in": ["In Progress", "In Review", "In Development"]}
             })
             
             # Get completed tasks
             completed_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
+                **active_query,
                 "status": {"$in": ["Done", "Closed", "Resolved"]}
             })
             
             # Get overdue tasks (tasks with due date in the past and not completed)
             overdue_tasks = await tasks_collection.count_documents({
-                "user_id": user_id,
+                **active_query,
                 "duedate": {"$lt": datetime.utcnow()},
                 "status": {"$nin": ["Done", "Closed", "Resolved"]}
             })
             
-            # Calculate trends (simplified - in a real app, you'd compare with previous period)
-            total_tasks_trend = 4.5  # Simulated trend
-            in_progress_tasks_trend = 8.2
-            completed_tasks_trend = 12.3
-            overdue_tasks_trend = 16.3
+            # Calculate trends by comparing the last period with the one before it
+            now = datetime.utcnow()
+            period = timedelta(days=TREND_PERIOD_DAYS)
+            current_start, previous_start = now - period, now - 2 * period
+            
+            created_current = await tasks_collection.count_documents({**active_query, "created": {"$gte": current_start}})
+            created_previous = await tasks_collection.count_documents({**active_query, "created": {"$gte": previous_start, "$lt": current_start}})
+            total_tasks_trend = percent_change(created_current, created_previous)
+            
+            in_progress_tasks_trend = percent_change(
+                await self.count_transitions(user_id, IN_PROGRESS_STATUSES, current_start, now),
+                await self.count_transitions(user_id, IN_PROGRESS_STATUSES, previous_start, current_start)
+            )
+            completed_tasks_trend = percent_change(
+                await self.count_transitions(user_id, DONE_STATUSES, current_start, now),
+                await self.count_transitions(user_id, DONE_STATUSES, previous_start, current_start)
+            )
+            
+            # Open tasks that went overdue in each period
+            overdue_current = await tasks_collection.count_documents({
+                **active_query,
+                "duedate": {"$gte": current_start, "$lt": now},
+                "status": {"$nin": DONE_STATUSES}
+            })
+            overdue_previous = await tasks_collection.count_documents({
+                **active_query,
+                "duedate": {"$gte": previous_start, "$lt": current_start},
+                "status": {"$nin": DONE_STATUSES}
+            })
+            overdue_tasks_trend = percent_change(overdue_current, overdue_previous)
             
             return DashboardStats(
                 total_tasks=total_tasks,
@@ -71,120 +209,46 @@ class DashboardService:
         try:
             db = get_database()
             tasks_collection = db.jira_tasks
+            active_query = await snapshot_service.active_query(user_id)
+            task_projection = projection_for(JiraTask)
             
             # Get urgent and important tasks (high priority, not completed)
             urgent_important_query = {
-                "user_id": user_id,
+                **active_query,
                 "priority": {"$in": ["High", "Highest"]},
                 "status": {"$nin": ["Done", "Closed", "Resolved"]}
             }
             urgent_important_count = await tasks_collection.count_documents(urgent_important_query)
-            urgent_important_tasks_cursor = tasks_collection.find(urgent_important_query).limit(5)
-            urgent_important_tasks = []
-            async for doc in urgent_important_tasks_cursor:
-                urgent_important_tasks.append(JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc.get("assignee"),
-                    assignee_email=doc.get("assignee_email"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc.get("duedate"),
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                ))
+            urgent_important_tasks = [construct_from_doc(JiraTask, doc) async for doc in tasks_collection.find(urgent_important_query, task_projection).limit(5)]
             
             # Get urgent but not important tasks (medium priority, not completed)
             urgent_not_important_query = {
-                "user_id": user_id,
+                **active_query,
                 "priority": "Medium",
                 "status": {"$nin": ["Done", "Closed", "Resolved"]}
             }
             urgent_not_important_count = await tasks_collection.count_documents(urgent_not_important_query)
-            urgent_not_important_tasks_cursor = tasks_collection.find(urgent_not_important_query).limit(5)
-            urgent_not_important_tasks = []
-            async for doc in urgent_not_important_tasks_cursor:
-                urgent_not_important_tasks.append(JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc.get("assignee"),
-                    assignee_email=doc.get("assignee_email"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc.get("duedate"),
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                ))
+            urgent_not_important_tasks = [construct_from_doc(JiraTask, doc) async for doc in tasks_collection.find(urgent_not_important_query, task_projection).limit(5)]
             
             # Get not urgent but important tasks (low priority, not completed)
             not_urgent_important_query = {
-                "user_id": user_id,
+                **active_query,
                 "priority": {"$in": ["Low", "Lowest"]},
                 "status": {"$nin": ["Done", "Closed", "Resolved"]}
             }
             not_urgent_important_count = await tasks_collection.count_documents(not_urgent_important_query)
-            not_urgent_important_tasks_cursor = tasks_collection.find(not_urgent_important_query).limit(5)
-            not_urgent_important_tasks = []
-            async for doc in not_urgent_important_tasks_cursor:
-                not_urgent_important_tasks.append(JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc.get("assignee"),
-                    assignee_email=doc.get("assignee_email"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc.get("duedate"),
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                ))
+            not_urgent_important_tasks = [construct_from_doc(JiraTask, doc) async for doc in tasks_collection.find(not_urgent_important_query, task_projection).limit(5)]
             
             # Get not urgent and not important tasks (completed or low priority)
             not_urgent_not_important_query = {
-                "user_id": user_id,
+                **active_query,
                 "$or": [
                     {"status": {"$in": ["Done", "Closed", "Resolved"]}},
                     {"priority": {"$in": ["Lowest"]}}
                 ]
             }
             not_urgent_not_important_count = await tasks_collection.count_documents(not_urgent_not_important_query)
-            not_urgent_not_important_tasks_cursor = tasks_collection.find(not_urgent_not_important_query).limit(5)
-            not_urgent_not_important_tasks = []
-            async for doc in not_urgent_not_important_tasks_cursor:
-                not_urgent_not_important_tasks.append(JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc.get("assignee"),
-                    assignee_email=doc.get("assignee_email"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc.get("duedate"),
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                ))
+            not_urgent_not_important_tasks = [construct_from_doc(JiraTask, doc) async for doc in tasks_collection.find(not_urgent_not_important_query, task_projection).limit(5)]
             
             return EisenhowerQuadrant(
                 urgent_important=urgent_important_count,
@@ -215,10 +279,11 @@ class DashboardService:
         try:
             db = get_database()
             tasks_collection = db.jira_tasks
+            active_query = await snapshot_service.active_query(user_id)
             
             # Get tasks by status
             status_pipeline = [
-                {"$match": {"user_id": user_id}},
+                {"$match": active_query},
                 {"$group": {"_id": "$status", "count": {"$sum": 1}}},
                 {"$sort": {"count": -1}}
             ]
@@ -237,19 +302,14 @@ class DashboardService:
                     TaskByStatus(name="Verified", value=15)
                 ]
             
-            # Get task velocity data (simplified - in a real app, you'd group by month)
-            task_velocity = [
-                TaskVelocityData(month="Jan", tasks=40, completed=35),
-                TaskVelocityData(month="Feb", tasks=45, completed=40),
-                TaskVelocityData(month="Mar", tasks=38, completed=42),
-                TaskVelocityData(month="Apr", tasks=55, completed=48),
-                TaskVelocityData(month="May", tasks=52, completed=55),
-                TaskVelocityData(month="Jun", tasks=48, completed=50)
-            ]
+            # Get task velocity from created dates and Done transitions, grouped by month
+            now = datetime.utcnow()
+            task_velocity = await self.get_task_velocity(user_id, now)
+            cycle_time_days, lead_time_days = await self.get_flow_times(user_id, now - timedelta(days=VELOCITY_MONTHS * 30))
             
             # Get issue type distribution
             type_pipeline = [
-                {"$match": {"user_id": user_id}},
+                {"$match": active_query},
                 {"$group": {"_id": "$issue_type", "count": {"$sum": 1}}},
                 {"$sort": {"count": -1}}
             ]
@@ -271,7 +331,9 @@ class DashboardService:
             return AnalyticsData(
                 tasks_by_status=tasks_by_status,
                 task_velocity=task_velocity,
-                issue_type_distribution=issue_type_distribution
+                issue_type_distribution=issue_type_distribution,
+                cycle_time_days=cycle_time_days,
+                lead_time_days=lead_time_days
             )
             
         except Exception as e:
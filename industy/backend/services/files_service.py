@@ -5,6 +5,8 @@ from datetime import datetime
 from db import get_database
 from models.jira import FileUpload
 from models.files import FileFilter
+from utils.pagination import find_page, total_count_cache
+from utils.serialization import projection_for, construct_from_doc
 from bson import ObjectId
 
 
@@ -67,8 +69,8 @@ class FilesService:
             logger.error(f"Failed to upload file {filename} for user {user_id}: {e}")
             return None
 
-    async def get_files(self, user_id: str, filter_params: FileFilter, page: int = 1, size: int = 50) -> dict:
-        """Get files for a user with filtering and pagination"""
+    async def get_files(self, user_id: str, filter_params: FileFilter, page: int = 1, size: int = 50, cursor: Optional[str] = None, exact_total: bool = False) -> dict:
+        """Get files for a user with filtering and keyset pagination on (uploaded_at, _id)"""
         try:
             db = get_database()
             files_collection = db.files
@@ -85,36 +87,20 @@ class FilesService:
             if filter_params.file_type:
                 query["content_type"] = filter_params.file_type
             
-            # Calculate pagination
-            skip = (page - 1) * size
+            # Get total count, from the recent-count cache unless an exact one is asked for
+            total, total_is_exact = await total_count_cache.count(files_collection, query, exact_total)
             
-            # Get total count
-            total = await files_collection.count_documents(query)
-            
-            # Get files with pagination
-            cursor = files_collection.find(query).skip(skip).limit(size).sort("uploaded_at", -1)
-            files = []
-            async for doc in cursor:
-                file = FileUpload(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    filename=doc["filename"],
-                    size=doc["size"],
-                    content_type=doc["content_type"],
-                    status=doc["status"],
-                    records=doc["records"],
-                    uploader=doc["uploader"],
-                    uploaded_at=doc["uploaded_at"],
-                    processed_at=doc["processed_at"],
-                    error_message=doc["error_message"]
-                )
-                files.append(file)
+            # Get the page after the cursor
+            docs, next_cursor = await find_page(files_collection, query, "uploaded_at", size, cursor, page, projection_for(FileUpload))
+            files = [construct_from_doc(FileUpload, doc) for doc in docs]
             
             return {
                 "files": files,
                 "total": total,
+                "total_is_estimate": not total_is_exact,
                 "page": page,
-                "size": size
+                "size": size,
+                "next_cursor": next_cursor
             }
             
         except Exception as e:
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+from config import settings
+from db import get_database
+from models.jira import JiraCredentialsInDB
+from services.jira_service import jira_service, JiraAPIError
+from services.snapshot_service import snapshot_service
+
+logger = logging.getLogger(__name__)
+
+# Issue type names for each /api/jira/issues/{issue_type} endpoint; "all" is unfiltered
+ISSUE_TYPES = {
+    "all": None,
+    "epics": "Epic",
+    "stories": "Story",
+    "tasks": "Task",
+    "bugs": "Bug"
+}
+
+# Sync JQL filters that cover every issue in a project, so the local copy is complete
+PROJECT_WIDE_JQL_FILTERS = {"", "project in projectsWhereUserHasPermission()"}
+
+
+class CachedIssues:
+    """One cached issue list with its ETag and when it was fetched"""
+
+    def __init__(self, issues: List[Dict], source: str):
+        self.issues = issues
+        self.source = source
+        self.fetched_at = time.monotonic()
+        body = json.dumps(issues, sort_keys=True, default=str).encode()
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+    def age(self) -> float:
+        """Seconds since this entry was fetched"""
+        return time.monotonic() - self.fetched_at
+
+
+class IssueCacheService:
+    """Response cache for the /api/jira/issues/* proxy with stale-while-revalidate"""
+
+    def __init__(self):
+        # (user_id, project_key, issue_type) -> cached issues
+        self.entries: Dict[Tuple[str, str, str], CachedIssues] = {}
+        self.refreshing: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        # (user_id, project_key) -> in-flight multi-type fetch
+        self.partition_fetches: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    def invalidate(self, user_id: Optional[str] = None, project_key: Optional[str] = None) -> None:
+        """Drop cached entries for a user and/or project (everything when neither is given)"""
+        for key in list(self.entries):
+            if (user_id is None or key[0] == user_id) and (project_key is None or key[1] == project_key):
+                self.entries.pop(key, None)
+
+    def store(self, key: Tuple[str, str, str], entry: CachedIssues) -> None:
+        """Store an entry, evicting the oldest ones beyond the configured size"""
+        self.entries[key] = entry
+        overflow = len(self.entries) - settings.JIRA_ISSUE_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            oldest = sorted(self.entries, key=lambda k: self.entries[k].fetched_at)[:overflow]
+            for old_key in oldest:
+                self.entries.pop(old_key, None)
+
+    def local_copy_covers(self, state: Optional[Dict[str, Any]], project_key: str) -> bool:
+        """Check whether the last successful sync is recent and pulled every issue of the project"""
+        if not state or not state.get("watermark") or state.get("jql_filter") is None:
+            return False
+        if datetime.utcnow() - state["watermark"] > timedelta(seconds=settings.JIRA_ISSUE_CACHE_LOCAL_MAX_AGE):
+            return False
+        jql_filter = state["jql_filter"]
+        return jql_filter in PROJECT_WIDE_JQL_FILTERS or jql_filter.replace(" ", "") == f"project={project_key}"
+
+    async def read_local_issues(self, user_id: str, project_key: str, issue_type: str) -> Optional[List[Dict]]:
+        """Serve issues from the synced jira_tasks copy when it is fresh enough, otherwise None"""
+        state = await jira_service.get_sync_state(user_id)
+        if not self.local_copy_covers(state, project_key):
+            return None
+
+        query = {**await snapshot_service.active_query(user_id), "project_key": project_key}
+        if ISSUE_TYPES[issue_type]:
+            query["issue_type"] = ISSUE_TYPES[issue_type]
+
+        db = get_database()
+        issues = []
+        async for doc in db.jira_tasks.find(query).sort("updated", -1):
+            issues.append(jira_service.build_issue_from_task_document(doc))
+        return issues
+
+    async def fetch_project_partitions(self, credentials: JiraCredentialsInDB, project_key: str) -> Optional[Dict[str, List[Dict]]]:
+        """Fetch every issue type of a project in one search, sharing it between concurrent callers"""
+        key = (credentials.user_id, project_key)
+        fetch = self.partition_fetches.get(key)
+        if fetch is None:
+            fetch = asyncio.create_task(jira_service.fetch_project_issues_by_type(credentials, project_key))
+            self.partition_fetches[key] = fetch
+            fetch.add_done_callback(lambda _: self.partition_fetches.pop(key, None))
+        return await asyncio.shield(fetch)
+
+    async def refresh(self, credentials: JiraCredentialsInDB, project_key: str, issue_type: str) -> Optional[CachedIssues]:
+        """Reload one cache entry, preferring the local copy over a Jira round trip.
+
+        A Jira fetch for any single issue type refreshes the entries of all four types.
+        Raises JiraAPIError when a Jira fetch fails, so a failure is never cached as an empty list.
+        """
+        user_id = credentials.user_id
+        key = (user_id, project_key, issue_type)
+
+        issues = await self.read_local_issues(user_id, project_key, issue_type)
+        if issues is not None:
+            entry = CachedIssues(issues, "local")
+            self.store(key, entry)
+            return entry
+
+        if not await jira_service.validate_jira_connection(credentials):
+            return None
+
+        if issue_type == "all":
+            entry = CachedIssues(await jira_service.fetch_project_issues(credentials, project_key), "jira")
+            self.store(key, entry)
+            return entry
+
+        partitions = await self.fetch_project_partitions(credentials, project_key)
+        if partitions is None:
+            raise JiraAPIError(f"Failed to fetch issues for project {project_key}")
+
+        entry = None
+        for name, type_name in ISSUE_TYPES.items():
+            if type_name:
+                type_entry = CachedIssues(partitions.get(type_name, []), "jira")
+                self.store((user_id, project_key, name), type_entry)
+                if name == issue_type:
+                    entry = type_entry
+        return entry
+
+    def refresh_in_background(self, credentials: JiraCredentialsInDB, project_key: str, issue_type: str) -> None:
+        """Start at most one background refresh per cache key"""
+        key = (credentials.user_id, project_key, issue_type)
+        if key in self.refreshing:
+            return
+
+        async def run():
+            try:
+                await self.refresh(credentials, project_key, issue_type)
+            except Exception as e:
+                logger.error(f"Background refresh failed for {project_key}/{issue_type}: {e}")
+            finally:
+                self.refreshing.pop(key, None)
+
+        self.refreshing[key] = asyncio.create_task(run())
+
+    async def get_issues(self, credentials: JiraCredentialsInDB, project_key: str, issue_type: str) -> Optional[CachedIssues]:
+        """Get issues for a project and type: fresh from cache, stale while revalidating, or reloaded.
+
+        Returns None when nothing is cached and the Jira connection is invalid, and raises
+        JiraAPIError when the reload from Jira fails.
+        """
+        key = (credentials.user_id, project_key, issue_type)
+        entry = self.entries.get(key)
+
+        if entry is not None:
+            age = entry.age()
+            if age < settings.JIRA_ISSUE_CACHE_TTL:
+                return entry
+            if age < settings.JIRA_ISSUE_CACHE_TTL + settings.JIRA_ISSUE_CACHE_STALE_TTL:
+                self.refresh_in_background(credentials, project_key, issue_type)
+                return entry
+
+        return await self.refresh(credentials, project_key, issue_type)
+
+
+# Create global issue cache service instance
+issue_cache_service = IssueCacheService()
@@ -0,0 +1,254 @@
+import asyncio
+import httpx
+import logging
+import random
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from config import settings
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401 - only needed when HTTP/2 is enabled
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Status codes that mean "slow down and try again" rather than "this request is wrong"
+RETRYABLE_STATUS_CODES = {429, 503}
+
+# Request, retry and byte counters of the sync run in progress in the current task, if any
+sync_request_counters: ContextVar[Optional[Dict[str, int]]] = ContextVar("sync_request_counters", default=None)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_reset(value: Optional[str]) -> Optional[float]:
+    """Parse an X-RateLimit-Reset header (ISO-8601 timestamp) into seconds from now"""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if reset_at.tzinfo is None:
+            reset_at = reset_at.replace(tzinfo=timezone.utc)
+        return max((reset_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except ValueError:
+        return None
+
+
+class JiraRateLimiter:
+    """Adaptive token bucket for one Jira site.
+
+    The refill rate halves whenever Jira throttles us and creeps back up on success, and
+    Retry-After / X-RateLimit-* headers pause every caller sharing the site.
+    """
+
+    def __init__(self, rate: float, burst: int, min_rate: float):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def refill(self, now: float) -> None:
+        """Add tokens for the time elapsed since the last refill"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until the site is not paused and a token is available"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self.refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block_for(self, seconds: float) -> None:
+        """Pause every caller on this site for the given number of seconds"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def update_from_response(self, response: httpx.Response) -> None:
+        """Adapt the rate to what Jira tells us in the response"""
+        headers = response.headers
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            self.rate = max(self.min_rate, self.rate / 2)
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if retry_after is not None:
+                self.block_for(retry_after)
+            logger.warning(f"Jira throttled request (status {response.status_code}), rate lowered to {self.rate:.2f}/s")
+            return
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+            reset_in = parse_rate_limit_reset(headers.get("X-RateLimit-Reset"))
+            if reset_in is not None:
+                self.block_for(reset_in)
+
+        if headers.get("X-RateLimit-NearLimit", "").lower() == "true":
+            self.rate = max(self.min_rate, self.rate * 0.75)
+        elif self.rate < self.max_rate:
+            # Additive increase back towards the configured rate
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Delay before retrying a throttled request: Retry-After if given, else jittered backoff"""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return retry_after + random.uniform(0, 1)
+        return self.backoff_delay(attempt)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt"""
+        backoff = min(settings.JIRA_RETRY_BACKOFF_MAX, settings.JIRA_RETRY_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, backoff)
+
+
+class JiraClientRegistry:
+    """Long-lived pooled httpx clients, one per Jira site, shared by every JiraService call"""
+
+    def __init__(self):
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.rate_limiters: Dict[str, JiraRateLimiter] = {}
+
+    def normalize_domain(self, domain: str) -> str:
+        """Normalize a Jira domain so every credential on the same site shares one client"""
+        return domain.strip().rstrip("/").lower()
+
+    def create_client(self) -> httpx.AsyncClient:
+        """Create a pooled client using the configured limits, keep-alive and timeout budget"""
+        http2 = settings.JIRA_HTTP2_ENABLED
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("JIRA_HTTP2_ENABLED is set but the 'h2' package is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.JIRA_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.JIRA_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.JIRA_HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(
+                settings.JIRA_HTTP_TIMEOUT,
+                connect=settings.JIRA_HTTP_CONNECT_TIMEOUT
+            )
+        )
+
+    def get_client(self, domain: str) -> httpx.AsyncClient:
+        """Get the shared client for a Jira site, creating it on first use"""
+        key = self.normalize_domain(domain)
+        client = self.clients.get(key)
+        if client is None or client.is_closed:
+            client = self.create_client()
+            self.clients[key] = client
+            logger.info(f"Created pooled Jira HTTP client for {key}")
+        return client
+
+    def get_rate_limiter(self, domain: str) -> JiraRateLimiter:
+        """Get the shared rate limiter for a Jira site, creating it on first use"""
+        key = self.normalize_domain(domain)
+        limiter = self.rate_limiters.get(key)
+        if limiter is None:
+            limiter = JiraRateLimiter(
+                rate=settings.JIRA_RATE_LIMIT_PER_SECOND,
+                burst=settings.JIRA_RATE_LIMIT_BURST,
+                min_rate=settings.JIRA_RATE_LIMIT_MIN_PER_SECOND
+            )
+            self.rate_limiters[key] = limiter
+        return limiter
+
+    async def request(self, domain: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a rate-limited request to a Jira site, retrying throttled responses and transport errors with backoff.
+
+        Every Jira call made through here is a read (searches are POSTs with a query body), so a
+        request that failed in transit is safe to send again. The last transport error is re-raised.
+        """
+        client = self.get_client(domain)
+        limiter = self.get_rate_limiter(domain)
+
+        counters = sync_request_counters.get()
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= settings.JIRA_MAX_RETRIES:
+                    raise
+                delay = limiter.backoff_delay(attempt)
+                attempt += 1
+                if counters is not None:
+                    counters["retries"] = counters.get("retries", 0) + 1
+                logger.warning(f"Retrying {method} {url} in {delay:.1f}s (attempt {attempt}/{settings.JIRA_MAX_RETRIES}, {type(e).__name__}: {e})")
+                await asyncio.sleep(delay)
+                continue
+            limiter.update_from_response(response)
+            if counters is not None:
+                counters["requests"] = counters.get("requests", 0) + 1
+                counters["bytes"] = counters.get("bytes", 0) + len(response.content)
+
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= settings.JIRA_MAX_RETRIES:
+                return response
+
+            delay = limiter.retry_delay(response, attempt)
+            attempt += 1
+            if counters is not None:
+                counters["retries"] = counters.get("retries", 0) + 1
+            logger.warning(f"Retrying {method} {url} in {delay:.1f}s (attempt {attempt}/{settings.JIRA_MAX_RETRIES}, status {response.status_code})")
+            await asyncio.sleep(delay)
+
+    async def start(self) -> None:
+        """Create clients for every Jira site with active credentials"""
+        try:
+            db = get_database()
+            domains = await db.jira_credentials.distinct("domain", {"is_active": True})
+            for domain in domains:
+                if domain:
+                    self.get_client(domain)
+            logger.info(f"Jira HTTP client registry started with {len(self.clients)} site(s)")
+        except Exception as e:
+            # Clients are still created lazily on first use
+            logger.error(f"Failed to pre-create Jira HTTP clients: {e}")
+
+    async def close(self, domain: Optional[str] = None) -> None:
+        """Close the client for one site, or every client when no domain is given"""
+        if domain is not None:
+            keys = [self.normalize_domain(domain)]
+        else:
+            keys = list(self.clients.keys())
+
+        for key in keys:
+            client = self.clients.pop(key, None)
+            if client is not None:
+                await client.aclose()
+        logger.info(f"Closed {len(keys)} Jira HTTP client(s)")
+
+
+# Create global Jira client registry instance
+jira_client_registry = JiraClientRegistry()
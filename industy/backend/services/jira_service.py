@@ -1,12 +1,26 @@
-import httpx
+import asyncio
+import base64
+import hashlib
 import logging
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+import math
+import os
+import socket
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta, timezone
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Set
+from urllib.parse import urlparse
+import httpx
 from cryptography.fernet import Fernet
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from config import settings
 from db import get_database
 from models.jira import JiraCredentialsCreate, JiraCredentialsInDB, JiraTask, JiraProject, JiraUser
-from config import settings
-import base64
+from services.jira_http import jira_client_registry, sync_request_counters
+from services.snapshot_service import snapshot_service
+from services.sync_run_service import sync_run_service
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +38,127 @@ CORE_FIELDS = [
     "customfield_10015"  # Sprint field
 ]
 
+# JQL filters tried in order when syncing tasks - prioritizing your project where you have admin access
+TASK_JQL_FILTERS = [
+    "project = SCRUM",  # Your specific project - you have admin access to all tasks
+    "project in projectsWhereUserHasPermission()",  # Issues in projects user has access to
+    "assignee = currentUser() OR reporter = currentUser()",  # Issues assigned to or reported by user
+    ""  # All issues user can access (with fallback for bounded queries)
+]
+
+# Collection holding the per-user delta sync watermark
+SYNC_STATE_COLLECTION = "jira_sync_state"
+
+# Collection holding the per-credential resolved query plan (endpoint + JQL filter that last worked)
+QUERY_PLAN_COLLECTION = "jira_query_plans"
+
+# Collection holding one document per issue status change, ingested from changelogs
+STATUS_TRANSITIONS_COLLECTION = "jira_status_transitions"
+
+# Collection holding one lock document per user while a sync runs in any process
+SYNC_LOCK_COLLECTION = "sync_locks"
+
+# Field types every jira_tasks document must have, checked once per synced page
+TASK_DOCUMENT_SCHEMA = {
+    "user_id": str,
+    "jira_id": str,
+    "key": str,
+    "summary": str,
+    "status": str,
+    "priority": str,
+    "assignee": (str, type(None)),
+    "assignee_email": (str, type(None)),
+    "created": datetime,
+    "updated": datetime,
+    "duedate": (datetime, type(None)),
+    "project_key": str,
+    "project_name": str,
+    "issue_type": str
+}
+
+# JQL search endpoints, relative to /rest/api/3/
+SEARCH_JQL_ENDPOINT = "search/jql"
+LEGACY_SEARCH_ENDPOINT = "search"
+
+# Issue types served by the project issue endpoints, fetched together in one search
+PROJECT_ISSUE_TYPES = ["Epic", "Story", "Task", "Bug"]
+
+
+class JiraAPIError(Exception):
+    """Raised when a paginated Jira request fails part way through"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def is_query_error(self) -> bool:
+        """Whether Jira rejected this query itself (bad JQL, no permission), so another JQL may work.
+
+        Throttling, server errors, auth failures and transport errors would fail any query the same way.
+        """
+        return self.status_code is not None and 400 <= self.status_code < 500 and self.status_code not in (401, 429)
+
+
+class SyncTimings:
+    """Accumulates wall-clock seconds spent in each phase of one sync run, plus its counters"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        # pages / issues from the task sync, requests / retries / bytes from jira_http
+        self.counters: Dict[str, int] = {}
+        # What the run did, e.g. mode ("full" or "delta") and the JQL it used
+        self.details: Dict[str, Any] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time to a phase; phases that run several times (per page) are summed"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, phase: str):
+        """Time the enclosed block as part of a phase"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Add to a counter of the run"""
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def total(self) -> float:
+        """Seconds since the run started"""
+        return time.perf_counter() - self.started_at
+
+    def summary(self) -> str:
+        """Human readable per-phase breakdown for logging"""
+        parts = [f"{phase}={seconds:.2f}s" for phase, seconds in self.phases.items()]
+        parts.append(f"total={self.total():.2f}s")
+        return " ".join(parts)
+
+
+def build_task_jql(jql_filter: str, updated_within_minutes: Optional[int] = None) -> str:
+    """Build a task JQL query from a filter clause and an optional relative `updated` window"""
+    clauses = []
+    if jql_filter:
+        clauses.append(f"({jql_filter})" if updated_within_minutes is not None else jql_filter)
+    if updated_within_minutes is not None:
+        # Relative dates are evaluated by Jira itself, so the user's profile timezone doesn't matter
+        clauses.append(f'updated >= "-{updated_within_minutes}m"')
+    return " ".join([" AND ".join(clauses), "ORDER BY updated DESC"]).strip()
+
 class JiraService:
     def __init__(self):
         # Generate a key for encryption (in production, this should be stored securely)
         self.cipher_suite = Fernet(Fernet.generate_key())
+        # credential id -> (token fingerprint, is_valid, expires_at monotonic seconds)
+        self.validation_cache: Dict[str, Tuple[str, bool, float]] = {}
+        # user id -> sync currently running in this process, joined by concurrent callers
+        self.inflight_syncs: Dict[str, asyncio.Task] = {}
+        # Identifies this process as the owner of Mongo sync locks
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
 
     def encrypt_token(self, token: str) -> str:
         """Encrypt API token before storing in database"""
@@ -67,9 +198,14 @@ class JiraService:
                 upsert=True
             )
             
+            # New credentials may point at another site, so start over with a full sync
+            await self.clear_sync_state(user_id)
+            
             # Retrieve the stored credentials
             stored_doc = await credentials_collection.find_one({"user_id": user_id})
             if stored_doc:
+                self.invalidate_validation_cache(str(stored_doc["_id"]))
+                await self.invalidate_query_plan(str(stored_doc["_id"]))
                 return JiraCredentialsInDB(
                     id=str(stored_doc["_id"]),
                     user_id=stored_doc["user_id"],
@@ -112,8 +248,22 @@ class JiraService:
             logger.error(f"Failed to get Jira credentials for user {user_id}: {e}")
             return None
 
-    async def validate_jira_connection(self, credentials: JiraCredentialsInDB) -> bool:
-        """Validate Jira connection with provided credentials"""
+    def token_fingerprint(self, credentials: JiraCredentialsInDB) -> str:
+        """Fingerprint the stored token so a re-saved token never hits an old cache entry"""
+        return hashlib.sha256(f"{credentials.domain}|{credentials.email}|{credentials.api_token}".encode()).hexdigest()
+
+    def invalidate_validation_cache(self, credentials_id: str) -> None:
+        """Drop the cached validation result for a credential"""
+        self.validation_cache.pop(credentials_id, None)
+
+    async def validate_jira_connection(self, credentials: JiraCredentialsInDB, use_cache: bool = True) -> bool:
+        """Validate Jira connection with provided credentials, reusing a recent result when possible"""
+        fingerprint = self.token_fingerprint(credentials)
+        if use_cache:
+            cached = self.validation_cache.get(credentials.id)
+            if cached and cached[0] == fingerprint and cached[2] > time.monotonic():
+                return cached[1]
+        
         try:
             # Decrypt the API token
             decrypted_token = self.decrypt_token(credentials.api_token)
@@ -122,16 +272,24 @@ class JiraService:
             jira_url = f"{credentials.domain}/rest/api/3/myself"
             
             # Make test API call
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    jira_url,
-                    auth=(credentials.email, decrypted_token),
-                    timeout=10
-                )
+            response = await jira_client_registry.request(
+                credentials.domain,
+                "GET",
+                jira_url,
+                auth=(credentials.email, decrypted_token),
+                timeout=10
+            )
+            
+            is_valid = response.status_code == 200
+            
+            # Cache the answer Jira gave us; failures are kept for a shorter time
+            ttl = settings.JIRA_VALIDATION_CACHE_TTL if is_valid else settings.JIRA_VALIDATION_NEGATIVE_CACHE_TTL
+            self.validation_cache[credentials.id] = (fingerprint, is_valid, time.monotonic() + ttl)
             
-            return response.status_code == 200
+            return is_valid
             
         except Exception as e:
+            # Network errors are transient, so they are not cached
             logger.error(f"Jira connection validation failed: {e}")
             return False
 
@@ -158,14 +316,14 @@ class JiraService:
             }
             
             # Make API call using POST method
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    jira_url,
-                    json=body,
-                    headers=headers,
-                    auth=(credentials.email, decrypted_token),
-                    timeout=30
-                )
+            response = await jira_client_registry.request(
+                credentials.domain,
+                "POST",
+                jira_url,
+                json=body,
+                headers=headers,
+                auth=(credentials.email, decrypted_token)
+            )
             
             # Log response for debugging
             logger.info(f"Jira API call to {jira_url} with JQL: {jql}")
@@ -173,36 +331,17 @@ class JiraService:
             
             if response.status_code == 401:
                 logger.error("Jira API authentication failed - invalid credentials")
+                self.invalidate_validation_cache(credentials.id)
                 return []
             elif response.status_code == 400:
                 logger.error(f"Jira API bad request: {response.text}")
-                # Try with a simpler JQL as fallback
-                fallback_jqls = [
-                    "assignee = currentUser() ORDER BY updated DESC",
-                    "project in projectsWhereUserHasPermission() ORDER BY updated DESC",
-                    "assignee = currentUser() OR reporter = currentUser() ORDER BY updated DESC"
-                ]
-                for fallback_jql in fallback_jqls:
-                    if jql != fallback_jql:
-                        logger.info(f"Trying fallback JQL: {fallback_jql}")
-                        result = await self.fetch_issues_by_jql_new_endpoint(credentials, fallback_jql, max_results)
-                        if result:  # If we got results, return them
-                            return result
+                return []
+            elif response.status_code == 429 or response.status_code >= 500:
+                # Still throttled or unavailable after the client's retries - simpler JQL would only add load
+                logger.error(f"Jira API unavailable (status {response.status_code}), giving up on this request")
                 return []
             elif response.status_code != 200:
                 logger.error(f"Jira API call failed with status {response.status_code}: {response.text}")
-                # Try with a simpler JQL as fallback
-                fallback_jqls = [
-                    "assignee = currentUser() ORDER BY updated DESC",
-                    "project in projectsWhereUserHasPermission() ORDER BY updated DESC",
-                    "assignee = currentUser() OR reporter = currentUser() ORDER BY updated DESC"
-                ]
-                for fallback_jql in fallback_jqls:
-                    if jql != fallback_jql:
-                        logger.info(f"Trying fallback JQL: {fallback_jql}")
-                        result = await self.fetch_issues_by_jql_new_endpoint(credentials, fallback_jql, max_results)
-                        if result:  # If we got results, return them
-                            return result
                 return []
             
             # Parse response
@@ -248,14 +387,14 @@ class JiraService:
             }
             
             # Make API call using POST method
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    jira_url,
-                    json=body,
-                    headers=headers,
-                    auth=(credentials.email, decrypted_token),
-                    timeout=30
-                )
+            response = await jira_client_registry.request(
+                credentials.domain,
+                "POST",
+                jira_url,
+                json=body,
+                headers=headers,
+                auth=(credentials.email, decrypted_token)
+            )
             
             # Log response for debugging
             logger.info(f"Jira API call to {jira_url} with JQL: {jql}")
@@ -263,36 +402,17 @@ class JiraService:
             
             if response.status_code == 401:
                 logger.error("Jira API authentication failed - invalid credentials")
+                self.invalidate_validation_cache(credentials.id)
                 return []
             elif response.status_code == 400:
                 logger.error(f"Jira API bad request: {response.text}")
-                # Try with a simpler JQL as fallback
-                fallback_jqls = [
-                    "assignee = currentUser() ORDER BY updated DESC",
-                    "project in projectsWhereUserHasPermission() ORDER BY updated DESC",
-                    "assignee = currentUser() OR reporter = currentUser() ORDER BY updated DESC"
-                ]
-                for fallback_jql in fallback_jqls:
-                    if jql != fallback_jql:
-                        logger.info(f"Trying fallback JQL: {fallback_jql}")
-                        result = await self.fetch_issues_by_jql_old_endpoint(credentials, fallback_jql, max_results)
-                        if result:  # If we got results, return them
-                            return result
+                return []
+            elif response.status_code == 429 or response.status_code >= 500:
+                # Still throttled or unavailable after the client's retries - simpler JQL would only add load
+                logger.error(f"Jira API unavailable (status {response.status_code}), giving up on this request")
                 return []
             elif response.status_code != 200:
                 logger.error(f"Jira API call failed with status {response.status_code}: {response.text}")
-                # Try with a simpler JQL as fallback
-                fallback_jqls = [
-                    "assignee = currentUser() ORDER BY updated DESC",
-                    "project in projectsWhereUserHasPermission() ORDER BY updated DESC",
-                    "assignee = currentUser() OR reporter = currentUser() ORDER BY updated DESC"
-                ]
-                for fallback_jql in fallback_jqls:
-                    if jql != fallback_jql:
-                        logger.info(f"Trying fallback JQL: {fallback_jql}")
-                        result = await self.fetch_issues_by_jql_old_endpoint(credentials, fallback_jql, max_results)
-                        if result:  # If we got results, return them
-                            return result
                 return []
             
             # Parse response
@@ -318,6 +438,11 @@ class JiraService:
     async def fetch_issues_by_jql(self, credentials: JiraCredentialsInDB, jql: str, max_results: int = 100) -> List[Dict]:
         """Fetch issues from Jira API using the new JQL Search endpoint"""
         try:
+            # Skip straight to the old endpoint if this credential is known to need it
+            plan = await self.get_query_plan(credentials)
+            if plan and plan["endpoint"] == LEGACY_SEARCH_ENDPOINT:
+                return await self.fetch_issues_by_jql_old_endpoint(credentials, jql, max_results)
+            
             # Decrypt the API token
             decrypted_token = self.decrypt_token(credentials.api_token)
             
@@ -339,14 +464,14 @@ class JiraService:
             }
             
             # Make API call using POST method
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    jira_url,
-                    json=body,
-                    headers=headers,
-                    auth=(credentials.email, decrypted_token),
-                    timeout=30
-                )
+            response = await jira_client_registry.request(
+                credentials.domain,
+                "POST",
+                jira_url,
+                json=body,
+                headers=headers,
+                auth=(credentials.email, decrypted_token)
+            )
             
             # Log response for debugging
             logger.info(f"Jira API call to {jira_url} with JQL: {jql}")
@@ -354,40 +479,22 @@ class JiraService:
             
             if response.status_code == 401:
                 logger.error("Jira API authentication failed - invalid credentials")
+                self.invalidate_validation_cache(credentials.id)
                 return []
             elif response.status_code == 400:
                 logger.error(f"Jira API bad request: {response.text}")
-                # Try with a simpler JQL as fallback using the new endpoint
-                fallback_jqls = [
-                    "assignee = currentUser() ORDER BY updated DESC",
-                    "project in projectsWhereUserHasPermission() ORDER BY updated DESC",
-                    "assignee = currentUser() OR reporter = currentUser() ORDER BY updated DESC"
-                ]
-                for fallback_jql in fallback_jqls:
-                    if jql != fallback_jql:
-                        logger.info(f"Trying fallback JQL: {fallback_jql}")
-                        result = await self.fetch_issues_by_jql(credentials, fallback_jql, max_results)
-                        if result:  # If we got results, return them
-                            return result
                 return []
             elif response.status_code == 410:
                 logger.error(f"Jira API endpoint deprecated: {response.text}")
-                # The endpoint has been removed, try the old endpoint as fallback
+                # The endpoint has been removed, remember that and use the old endpoint as fallback
+                await self.save_query_plan(credentials, LEGACY_SEARCH_ENDPOINT, resolved=False)
                 return await self.fetch_issues_by_jql_old_endpoint(credentials, jql, max_results)
+            elif response.status_code == 429 or response.status_code >= 500:
+                # Still throttled or unavailable after the client's retries - simpler JQL would only add load
+                logger.error(f"Jira API unavailable (status {response.status_code}), giving up on this request")
+                return []
             elif response.status_code != 200:
                 logger.error(f"Jira API call failed with status {response.status_code}: {response.text}")
-                # Try with a simpler JQL as fallback using the new endpoint
-                fallback_jqls = [
-                    "assignee = currentUser() ORDER BY updated DESC",
-                    "project in projectsWhereUserHasPermission() ORDER BY updated DESC",
-                    "assignee = currentUser() OR reporter = currentUser() ORDER BY updated DESC"
-                ]
-                for fallback_jql in fallback_jqls:
-                    if jql != fallback_jql:
-                        logger.info(f"Trying fallback JQL: {fallback_jql}")
-                        result = await self.fetch_issues_by_jql(credentials, fallback_jql, max_results)
-                        if result:  # If we got results, return them
-                            return result
                 return []
             
             # Parse response
@@ -410,78 +517,305 @@ class JiraService:
             logger.error(f"Failed to fetch Jira issues: {e}")
             return []
 
-    async def fetch_jira_tasks(self, credentials: JiraCredentialsInDB, user_id: str) -> List[JiraTask]:
-        """Fetch tasks from Jira API using the new JQL Search endpoint"""
-        try:
-            # Try different JQL queries to get issues - prioritizing your project where you have admin access
-            jql_queries = [
-                "project = SCRUM ORDER BY updated DESC",  # Your specific project - you have admin access to all tasks
-                "project in projectsWhereUserHasPermission() ORDER BY updated DESC",  # Issues in projects user has access to
-                "assignee = currentUser() OR reporter = currentUser() ORDER BY updated DESC",  # Issues assigned to or reported by user
-                "ORDER BY updated DESC"  # All issues user can access (with fallback for bounded queries)
-            ]
-            
-            issues = []
-            for jql in jql_queries:
-                try:
-                    logger.info(f"Trying JQL query: {jql}")
-                    # Fetch issues using the new endpoint
-                    issues = await self.fetch_issues_by_jql_new_endpoint(credentials, jql, max_results=100)
-                    if issues:  # If we got issues, break and use this query
-                        logger.info(f"Successfully fetched {len(issues)} issues with JQL: {jql}")
-                        break
-                    else:
-                        logger.info(f"No issues returned with JQL: {jql}")
-                except Exception as jql_error:
-                    logger.warning(f"JQL query failed '{jql}': {jql_error}")
-                    continue  # Try next query
-            
-            if not issues:
-                logger.warning("No issues found with any JQL query")
-                return []
+    async def iter_issues_by_jql(self, credentials: JiraCredentialsInDB, jql: str, page_size: int = 100, fields: Optional[List[str]] = None, endpoint: str = SEARCH_JQL_ENDPOINT, expand: Optional[str] = None) -> AsyncIterator[List[Dict]]:
+        """Yield issues page by page from a JQL search endpoint.
+
+        The JQL Search endpoint (/rest/api/3/search/jql) is paged with nextPageToken, the legacy
+        /rest/api/3/search endpoint with startAt/total. Raises JiraAPIError if any page fails,
+        so callers can tell an empty result from a broken one.
+        """
+        # Decrypt the API token
+        decrypted_token = self.decrypt_token(credentials.api_token)
+        
+        # Construct Jira API URL for the chosen JQL search endpoint
+        jira_url = f"{credentials.domain}/rest/api/3/{endpoint}"
+        
+        # Headers for the request
+        headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+        
+        next_page_token = None
+        start_at = 0
+        page_number = 0
+        
+        while True:
+            # Prepare request body for this page
+            body = {
+                "jql": jql,
+                "maxResults": page_size,
+                "fields": fields if fields is not None else CORE_FIELDS
+            }
+            if endpoint == LEGACY_SEARCH_ENDPOINT:
+                body["startAt"] = start_at
+            elif next_page_token:
+                body["nextPageToken"] = next_page_token
+            if expand:
+                # The legacy endpoint takes a list, the JQL Search endpoint a comma separated string
+                body["expand"] = [expand] if endpoint == LEGACY_SEARCH_ENDPOINT else expand
             
-            tasks = []
+            try:
+                response = await jira_client_registry.request(
+                    credentials.domain,
+                    "POST",
+                    jira_url,
+                    json=body,
+                    headers=headers,
+                    auth=(credentials.email, decrypted_token)
+                )
+            except httpx.TimeoutException:
+                raise JiraAPIError(f"Jira API call timed out on page {page_number + 1} for JQL: {jql}")
+            except httpx.RequestError as request_error:
+                raise JiraAPIError(f"Jira API request failed on page {page_number + 1}: {request_error}")
             
-            # Process each issue
-            for issue in issues:
-                fields = issue.get("fields", {})
-                project = fields.get("project", {})
-                status = fields.get("status", {})
-                priority = fields.get("priority", {})
-                assignee = fields.get("assignee", {})
-                issuetype = fields.get("issuetype", {})
-                
-                # Extract assignee email
-                assignee_email = assignee.get("emailAddress", "") if assignee else ""
-                assignee_name = assignee.get("displayName", "Unassigned") if assignee else "Unassigned"
-                
-                task = JiraTask(
-                    id="",  # Will be set when storing in database
-                    user_id=user_id,
-                    jira_id=issue.get("id", ""),
-                    key=issue.get("key", ""),
-                    summary=fields.get("summary", ""),
-                    status=status.get("name", ""),
-                    priority=priority.get("name", "") if priority else "Unknown",
-                    assignee=assignee_name,
-                    assignee_email=assignee_email,
-                    created=parse_jira_datetime(fields.get("created")) if fields.get("created") else datetime.utcnow(),
-                    updated=parse_jira_datetime(fields.get("updated")) if fields.get("updated") else datetime.utcnow(),
-                    duedate=parse_jira_date(fields.get("duedate")) if fields.get("duedate") else None,
-                    project_key=project.get("key", ""),
-                    project_name=project.get("name", ""),
-                    issue_type=issuetype.get("name", "") if issuetype else "Task"
+            if response.status_code == 401:
+                self.invalidate_validation_cache(credentials.id)
+            if response.status_code != 200:
+                raise JiraAPIError(
+                    f"Jira API call failed with status {response.status_code} on page {page_number + 1}: {response.text}",
+                    status_code=response.status_code
                 )
-                tasks.append(task)
             
-            logger.info(f"Successfully processed {len(tasks)} tasks from {len(issues)} issues")
-            return tasks
+            # Parse response
+            try:
+                data = response.json()
+            except Exception as parse_error:
+                raise JiraAPIError(f"Failed to parse Jira response: {parse_error}")
             
-        except Exception as e:
-            logger.error(f"Failed to fetch Jira tasks: {e}")
-            import traceback
-            traceback.print_exc()
-            return []
+            issues = data.get("issues", [])
+            page_number += 1
+            logger.info(f"Fetched page {page_number} with {len(issues)} issues for JQL: {jql}")
+            
+            if issues:
+                yield issues
+            
+            if not issues:
+                return
+            if endpoint == LEGACY_SEARCH_ENDPOINT:
+                start_at += len(issues)
+                if start_at >= data.get("total", 0):
+                    return
+            else:
+                next_page_token = data.get("nextPageToken")
+                if not next_page_token or data.get("isLast", False):
+                    return
+
+    def build_task_document_from_issue(self, issue: Dict, user_id: str) -> Dict[str, Any]:
+        """Map a raw Jira issue straight to the MongoDB document stored in jira_tasks"""
+        fields = issue.get("fields") or {}
+        project = fields.get("project") or {}
+        status = fields.get("status") or {}
+        priority = fields.get("priority")
+        assignee = fields.get("assignee")
+        issuetype = fields.get("issuetype")
+        created = fields.get("created")
+        updated = fields.get("updated")
+        duedate = fields.get("duedate")
+        
+        return {
+            "user_id": user_id,
+            "jira_id": issue.get("id", ""),
+            "key": issue.get("key", ""),
+            "summary": fields.get("summary") or "",
+            "status": status.get("name", ""),
+            "priority": priority.get("name", "") if priority else "Unknown",
+            "assignee": assignee.get("displayName", "Unassigned") if assignee else "Unassigned",
+            "assignee_email": assignee.get("emailAddress", "") if assignee else "",
+            "created": parse_jira_datetime(created) if created else datetime.utcnow(),
+            "updated": parse_jira_datetime(updated) if updated else datetime.utcnow(),
+            "duedate": parse_jira_date(duedate) if duedate else None,
+            "project_key": project.get("key", ""),
+            "project_name": project.get("name", ""),
+            "issue_type": issuetype.get("name", "") if issuetype else "Task"
+        }
+
+    def build_issue_from_task_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild the Jira issue JSON shape from a stored jira_tasks document"""
+        def to_iso(value):
+            return value.isoformat() if isinstance(value, datetime) else value
+
+        assignee = None
+        if doc.get("assignee") and doc.get("assignee") != "Unassigned":
+            assignee = {"displayName": doc["assignee"], "emailAddress": doc.get("assignee_email", "")}
+        duedate = doc.get("duedate")
+
+        return {
+            "id": doc.get("jira_id", ""),
+            "key": doc.get("key", ""),
+            "fields": {
+                "summary": doc.get("summary", ""),
+                "status": {"name": doc.get("status", "")},
+                "priority": {"name": doc.get("priority", "")},
+                "assignee": assignee,
+                "issuetype": {"name": doc.get("issue_type", "")},
+                "project": {"key": doc.get("project_key", ""), "name": doc.get("project_name", "")},
+                "created": to_iso(doc.get("created")),
+                "updated": to_iso(doc.get("updated")),
+                "duedate": duedate.date().isoformat() if isinstance(duedate, datetime) else duedate
+            }
+        }
+
+    def validate_task_documents(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Check a batch of task documents against TASK_DOCUMENT_SCHEMA, dropping invalid ones"""
+        valid_docs = []
+        for doc in docs:
+            invalid_field = next(
+                (name for name, expected in TASK_DOCUMENT_SCHEMA.items() if not isinstance(doc.get(name), expected)),
+                None
+            )
+            if invalid_field is None and doc["jira_id"]:
+                valid_docs.append(doc)
+            else:
+                logger.warning(f"Skipping Jira issue {doc.get('key') or doc.get('jira_id') or '<unknown>'}: invalid field '{invalid_field or 'jira_id'}'")
+        return valid_docs
+
+    def build_task_documents(self, issues: List[Dict], user_id: str) -> List[Dict[str, Any]]:
+        """Map and validate a page of raw Jira issues in one pass"""
+        return self.validate_task_documents([self.build_task_document_from_issue(issue, user_id) for issue in issues])
+
+    def convert_issue_to_task(self, issue: Dict, user_id: str) -> JiraTask:
+        """Convert a raw Jira issue into a JiraTask"""
+        return JiraTask(
+            id="",  # Will be set when storing in database
+            **self.build_task_document_from_issue(issue, user_id)
+        )
+
+    async def get_query_plan(self, credentials: JiraCredentialsInDB) -> Optional[Dict[str, Any]]:
+        """Get the resolved query plan for a credential, or None if there is none or it has expired"""
+        db = get_database()
+        plan = await db[QUERY_PLAN_COLLECTION].find_one({"credentials_id": credentials.id})
+        if not plan or plan.get("domain") != credentials.domain:
+            return None
+        
+        plan_ttl = timedelta(hours=settings.JIRA_QUERY_PLAN_TTL_HOURS)
+        if datetime.utcnow() - plan["resolved_at"] >= plan_ttl:
+            logger.info(f"Query plan for credential {credentials.id} expired, re-probing")
+            return None
+        return plan
+
+    async def save_query_plan(self, credentials: JiraCredentialsInDB, endpoint: str, jql_filter: Optional[str] = None, resolved: bool = True) -> None:
+        """Record the endpoint (and optionally JQL filter) that just worked for a credential"""
+        now = datetime.utcnow()
+        updates = {
+            "credentials_id": credentials.id,
+            "user_id": credentials.user_id,
+            "domain": credentials.domain,
+            "endpoint": endpoint,
+            "last_success_at": now
+        }
+        if jql_filter is not None:
+            updates["jql_filter"] = jql_filter
+        if resolved:
+            updates["resolved_at"] = now
+        
+        update = {"$set": updates}
+        if not resolved:
+            # Keep the original resolution time, but a brand new plan still needs one
+            update["$setOnInsert"] = {"resolved_at": now}
+        
+        db = get_database()
+        await db[QUERY_PLAN_COLLECTION].update_one({"credentials_id": credentials.id}, update, upsert=True)
+
+    async def invalidate_query_plan(self, credentials_id: str) -> None:
+        """Forget the resolved query plan so the next fetch re-probes"""
+        db = get_database()
+        await db[QUERY_PLAN_COLLECTION].delete_one({"credentials_id": credentials_id})
+
+    async def iter_jira_issue_pages(self, credentials: JiraCredentialsInDB, jql_filters: Optional[List[str]] = None, updated_within_minutes: Optional[int] = None, page_size: int = 100, expand: Optional[str] = None) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """Yield (jql_filter, raw issues) page by page, using the first JQL filter that returns issues.
+
+        The credential's resolved query plan is tried first; the fallback cascade only runs when
+        it fails or has expired. A filter Jira rejects (bad JQL, no permission) before returning
+        anything falls through to the next one. Throttling, server and transport errors, and any
+        failure after pages were already yielded, are re-raised.
+        """
+        plan = await self.get_query_plan(credentials)
+        endpoint = plan["endpoint"] if plan else SEARCH_JQL_ENDPOINT
+        
+        probing = jql_filters is None
+        if probing:
+            jql_filters = list(TASK_JQL_FILTERS)
+            if plan and plan.get("jql_filter") in jql_filters:
+                # Start with the filter that worked last time
+                jql_filters.remove(plan["jql_filter"])
+                jql_filters.insert(0, plan["jql_filter"])
+        
+        for jql_filter in jql_filters:
+            jql = build_task_jql(jql_filter, updated_within_minutes)
+            logger.info(f"Trying JQL query: {jql}")
+            issue_count = 0
+            request_failed = False
+            while True:
+                try:
+                    async for issues in self.iter_issues_by_jql(credentials, jql, page_size=page_size, endpoint=endpoint, expand=expand):
+                        issue_count += len(issues)
+                        yield jql_filter, issues
+                except JiraAPIError as jql_error:
+                    if issue_count:
+                        raise
+                    if jql_error.status_code == 410 and endpoint != LEGACY_SEARCH_ENDPOINT:
+                        logger.warning("Jira JQL search endpoint gone (410), switching to legacy search endpoint")
+                        endpoint = LEGACY_SEARCH_ENDPOINT
+                        continue
+                    if not jql_error.is_query_error:
+                        # Trying the next filter would repeat the same throttled or failing request
+                        raise
+                    logger.warning(f"JQL query failed '{jql}': {jql_error}")
+                    request_failed = True
+                break
+            
+            if request_failed:
+                continue
+            
+            plan_changed = not plan or plan["endpoint"] != endpoint or (probing and issue_count and plan.get("jql_filter") != jql_filter)
+            if issue_count or not probing:
+                # Remember what worked so the next sync skips the probing
+                await self.save_query_plan(
+                    credentials,
+                    endpoint,
+                    jql_filter if probing else None,
+                    resolved=plan_changed
+                )
+                if issue_count:
+                    # Pages were already handed to the caller, so this query is the one in use
+                    logger.info(f"Successfully fetched {issue_count} issues with JQL: {jql}")
+                return
+            logger.info(f"No issues returned with JQL: {jql}")
+        
+        logger.warning("No issues found with any JQL query")
+        if probing and plan:
+            await self.invalidate_query_plan(credentials.id)
+
+    async def iter_planned_issues_by_jql(self, credentials: JiraCredentialsInDB, jql: str, page_size: int = 100, fields: Optional[List[str]] = None) -> AsyncIterator[List[Dict]]:
+        """Yield pages of one JQL search on the endpoint of the credential's query plan.
+
+        If the JQL Search endpoint answers 410 before any page, the search is repeated on the
+        legacy endpoint and the plan is updated so later searches go there directly.
+        """
+        plan = await self.get_query_plan(credentials)
+        endpoint = plan["endpoint"] if plan else SEARCH_JQL_ENDPOINT
+        yielded = False
+        try:
+            async for issues in self.iter_issues_by_jql(credentials, jql, page_size=page_size, fields=fields, endpoint=endpoint):
+                yielded = True
+                yield issues
+            return
+        except JiraAPIError as e:
+            if yielded or e.status_code != 410 or endpoint == LEGACY_SEARCH_ENDPOINT:
+                raise
+        
+        logger.warning("Jira JQL search endpoint gone (410), switching to legacy search endpoint")
+        await self.save_query_plan(credentials, LEGACY_SEARCH_ENDPOINT)
+        async for issues in self.iter_issues_by_jql(credentials, jql, page_size=page_size, fields=fields, endpoint=LEGACY_SEARCH_ENDPOINT):
+            yield issues
+
+    async def fetch_jira_issue_ids(self, credentials: JiraCredentialsInDB, jql_filter: str) -> Set[str]:
+        """Fetch only the ids of every issue matching a task JQL filter (used for reconciliation)"""
+        issue_ids = set()
+        async for issues in self.iter_planned_issues_by_jql(credentials, build_task_jql(jql_filter), page_size=1000, fields=["id"]):
+            issue_ids.update(issue.get("id", "") for issue in issues)
+        return issue_ids
 
     async def fetch_jira_projects(self, credentials: JiraCredentialsInDB, user_id: str) -> List[JiraProject]:
         """Fetch projects from Jira API"""
@@ -493,12 +827,16 @@ class JiraService:
             jira_url = f"{credentials.domain}/rest/api/3/project"
             
             # Make API call
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    jira_url,
-                    auth=(credentials.email, decrypted_token),
-                    timeout=30
-                )
+            response = await jira_client_registry.request(
+                credentials.domain,
+                "GET",
+                jira_url,
+                auth=(credentials.email, decrypted_token)
+            )
+            
+            if response.status_code == 401:
+                logger.error("Jira API authentication failed - invalid credentials")
+                self.invalidate_validation_cache(credentials.id)
             
             if response.status_code == 200:
                 data = response.json()
@@ -528,20 +866,20 @@ class JiraService:
             return []
 
     async def store_jira_projects(self, user_id: str, projects: List[JiraProject]) -> bool:
-        """Store Jira projects in database"""
+        """Store Jira projects in database as a new generation, replacing the active one atomically"""
+        generation = None
         try:
             db = get_database()
             projects_collection = db.jira_projects
+            generation = await snapshot_service.begin_generation(user_id)
             
-            # Clear existing projects for this user
-            await projects_collection.delete_many({"user_id": user_id})
-            
-            # Insert new projects
+            # Insert new projects; readers keep seeing the active generation meanwhile
             if projects:
                 project_docs = []
                 for project in projects:
                     project_doc = {
                         "user_id": project.user_id,
+                        "generation": generation,
                         "jira_id": project.jira_id,
                         "key": project.key,
                         "name": project.name,
@@ -554,10 +892,12 @@ class JiraService:
                 
                 await projects_collection.insert_many(project_docs)
             
-            return True
+            return await snapshot_service.activate_generation(user_id, "projects", generation)
             
         except Exception as e:
             logger.error(f"Failed to store Jira projects for user {user_id}: {e}")
+            if generation is not None:
+                snapshot_service.discard_generation(user_id, "projects", generation)
             return False
 
     async def get_user_projects(self, user_id: str) -> List[JiraProject]:
@@ -566,8 +906,8 @@ class JiraService:
             db = get_database()
             projects_collection = db.jira_projects
             
-            # Find projects for this user
-            cursor = projects_collection.find({"user_id": user_id})
+            # Find projects in the user's active generation
+            cursor = projects_collection.find(await snapshot_service.active_query(user_id, "projects"))
             projects = []
             
             async for project_doc in cursor:
@@ -590,120 +930,705 @@ class JiraService:
             logger.error(f"Failed to get Jira projects for user {user_id}: {e}")
             return []
 
+    def build_task_document(self, task: JiraTask) -> Dict[str, Any]:
+        """Build the MongoDB document stored for a Jira task"""
+        return {
+            "user_id": task.user_id,
+            "jira_id": task.jira_id,
+            "key": task.key,
+            "summary": task.summary,
+            "status": task.status,
+            "priority": task.priority,
+            "assignee": task.assignee,
+            "assignee_email": task.assignee_email,
+            "created": task.created,
+            "updated": task.updated,
+            "duedate": task.duedate,
+            "project_key": task.project_key,
+            "project_name": task.project_name,
+            "issue_type": task.issue_type
+        }
+
+    async def upsert_task_documents(self, user_id: str, task_docs: List[Dict[str, Any]], generation: Optional[int]) -> int:
+        """Upsert task documents keyed by (user_id, generation, jira_id), unique since schema version 5, with a single unordered bulk write"""
+        if not task_docs:
+            return 0
+        
+        db = get_database()
+        tasks_collection = db.jira_tasks
+        
+        operations = [
+            UpdateOne(
+                {"user_id": user_id, "generation": generation, "jira_id": task_doc["jira_id"]},
+                {"$set": {**task_doc, "generation": generation}},
+                upsert=True
+            )
+            for task_doc in task_docs
+        ]
+        result = await tasks_collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    async def upsert_jira_tasks(self, user_id: str, tasks: List[JiraTask], generation: Optional[int]) -> int:
+        """Upsert JiraTask models keyed by (user_id, generation, jira_id)"""
+        return await self.upsert_task_documents(user_id, [self.build_task_document(task) for task in tasks], generation)
+
+    async def delete_orphaned_transitions(self, user_id: str, jira_ids: Set[str]) -> int:
+        """Delete status transitions of tasks that are no longer in Jira"""
+        db = get_database()
+        transitions_collection = db[STATUS_TRANSITIONS_COLLECTION]
+        
+        tracked_ids = set(await transitions_collection.distinct("jira_id", {"user_id": user_id}))
+        orphaned_ids = list(tracked_ids - jira_ids)
+        if not orphaned_ids:
+            return 0
+        
+        result = await transitions_collection.delete_many({"user_id": user_id, "jira_id": {"$in": orphaned_ids}})
+        return result.deleted_count
+
+    async def delete_missing_jira_tasks(self, user_id: str, jira_ids: Set[str]) -> int:
+        """Delete tasks in the user's active generation whose jira_id is no longer returned by Jira"""
+        db = get_database()
+        tasks_collection = db.jira_tasks
+        active_query = await snapshot_service.active_query(user_id)
+        
+        stored_ids = set()
+        async for doc in tasks_collection.find(active_query, {"jira_id": 1}):
+            stored_ids.add(doc.get("jira_id"))
+        
+        missing_ids = list(stored_ids - jira_ids)
+        if not missing_ids:
+            return 0
+        
+        result = await tasks_collection.delete_many({**active_query, "jira_id": {"$in": missing_ids}})
+        await db[STATUS_TRANSITIONS_COLLECTION].delete_many({"user_id": user_id, "jira_id": {"$in": missing_ids}})
+        logger.info(f"Removed {result.deleted_count} tasks deleted in Jira for user {user_id}")
+        return result.deleted_count
+
     async def store_jira_tasks(self, user_id: str, tasks: List[JiraTask]) -> bool:
-        """Store Jira tasks in database"""
+        """Store Jira tasks in database as a new generation, replacing the user's existing set atomically"""
+        generation = None
         try:
-            db = get_database()
-            tasks_collection = db.jira_tasks
-            
-            # Clear existing tasks for this user
-            await tasks_collection.delete_many({"user_id": user_id})
-            
-            # Insert new tasks
-            if tasks:
-                task_docs = []
-                for task in tasks:
-                    task_doc = {
-                        "user_id": task.user_id,
-                        "jira_id": task.jira_id,
-                        "key": task.key,
-                        "summary": task.summary,
-                        "status": task.status,
-                        "priority": task.priority,
-                        "assignee": task.assignee,
-                        "assignee_email": task.assignee_email,
-                        "created": task.created,
-                        "updated": task.updated,
-                        "duedate": task.duedate,
-                        "project_key": task.project_key,
-                        "project_name": task.project_name,
-                        "issue_type": task.issue_type
-                    }
-                    task_docs.append(task_doc)
-                
-                await tasks_collection.insert_many(task_docs)
-            
+            generation = await snapshot_service.begin_generation(user_id)
+            await self.upsert_jira_tasks(user_id, tasks, generation)
+            if not await snapshot_service.activate_generation(user_id, "tasks", generation):
+                return False
+            await self.delete_orphaned_transitions(user_id, {task.jira_id for task in tasks})
             return True
             
         except Exception as e:
             logger.error(f"Failed to store Jira tasks for user {user_id}: {e}")
+            if generation is not None:
+                snapshot_service.discard_generation(user_id, "tasks", generation)
+            return False
+
+    def site_host(self, url: str) -> str:
+        """Host part of a Jira domain or issue URL, used to match webhooks to credentials"""
+        url = jira_client_registry.normalize_domain(url)
+        return urlparse(url).netloc if "://" in url else url.split("/")[0]
+
+    async def get_site_user_ids(self, issue: Dict) -> List[str]:
+        """Find users with active credentials on the Jira site an issue belongs to"""
+        host = self.site_host(issue.get("self", ""))
+        if not host:
+            return []
+
+        db = get_database()
+        user_ids = []
+        async for credentials_doc in db.jira_credentials.find({"is_active": True}, {"user_id": 1, "domain": 1}):
+            if self.site_host(credentials_doc.get("domain", "")) == host:
+                user_ids.append(credentials_doc["user_id"])
+        return user_ids
+
+    async def apply_issue_event(self, event: str, issue: Dict) -> Tuple[int, List[str]]:
+        """Apply a single Jira webhook issue event to jira_tasks.
+
+        Only users who already track the issue or its project get the update; everyone else
+        picks it up on their next reconciliation sync. Returns how many documents changed and
+        the users whose tasks changed.
+        """
+        jira_id = str(issue.get("id", ""))
+        if not jira_id:
+            return 0, []
+
+        user_ids = await self.get_site_user_ids(issue)
+        if not user_ids:
+            logger.info(f"Ignoring webhook for {issue.get('key', jira_id)}: no users on {issue.get('self', '')}")
+            return 0, []
+
+        db = get_database()
+        tasks_collection = db.jira_tasks
+
+        if event == "jira:issue_deleted":
+            affected_users = await tasks_collection.distinct("user_id", {"user_id": {"$in": user_ids}, "jira_id": jira_id})
+            result = await tasks_collection.delete_many({"user_id": {"$in": affected_users}, "jira_id": jira_id})
+            await db[STATUS_TRANSITIONS_COLLECTION].delete_many({"user_id": {"$in": affected_users}, "jira_id": jira_id})
+            return result.deleted_count, affected_users
+
+        project_key = ((issue.get("fields") or {}).get("project") or {}).get("key", "")
+        tracking_users = await tasks_collection.distinct("user_id", {
+            "user_id": {"$in": user_ids},
+            "$or": [{"jira_id": jira_id}, {"project_key": project_key}]
+        })
+
+        changed = 0
+        affected_users = []
+        for user_id in tracking_users:
+            task_docs = self.build_task_documents([issue], user_id)
+            generation = await snapshot_service.get_active_generation(user_id)
+            user_changed = await self.upsert_task_documents(user_id, task_docs, generation)
+            if user_changed:
+                changed += user_changed
+                affected_users.append(user_id)
+        return changed, affected_users
+
+    async def get_sync_state(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get the delta sync watermark for a user"""
+        db = get_database()
+        return await db[SYNC_STATE_COLLECTION].find_one({"user_id": user_id})
+
+    async def save_sync_state(self, user_id: str, updates: Dict[str, Any]) -> None:
+        """Persist delta sync watermark fields for a user"""
+        db = get_database()
+        await db[SYNC_STATE_COLLECTION].update_one(
+            {"user_id": user_id},
+            {"$set": {**updates, "user_id": user_id}},
+            upsert=True
+        )
+
+    async def clear_sync_state(self, user_id: str) -> None:
+        """Forget the delta sync watermark so the next sync is a full one"""
+        db = get_database()
+        await db[SYNC_STATE_COLLECTION].delete_one({"user_id": user_id})
+
+    def is_delta_sync_possible(self, state: Optional[Dict[str, Any]], now: datetime) -> bool:
+        """Check whether a stored watermark can be used for a delta sync"""
+        if not settings.JIRA_DELTA_SYNC_ENABLED or not state:
+            return False
+        if state.get("jql_filter") is None or not state.get("watermark"):
             return False
+        last_full_sync = state.get("last_full_sync_at")
+        full_sync_interval = timedelta(hours=settings.JIRA_FULL_SYNC_INTERVAL_HOURS)
+        return bool(last_full_sync) and now - last_full_sync < full_sync_interval
+
+    def task_page_expand(self) -> Optional[str]:
+        """expand for task search pages: their changelogs feed status transitions at no extra request"""
+        return "changelog" if settings.JIRA_CHANGELOG_SYNC_ENABLED else None
+
+    async def store_issue_pages(self, user_id: str, pages: AsyncIterator[Tuple[str, List[Dict]]], timings: SyncTimings, generation: Optional[int], credentials: Optional[JiraCredentialsInDB] = None, changelog_since: Optional[datetime] = None) -> Tuple[Set[str], Optional[str]]:
+        """Persist issue pages into a generation as they arrive, writing one page while the next is being fetched.
+
+        Status transitions are taken from changelogs embedded in the pages, if they were requested,
+        or fetched for issues updated since changelog_since. Returns the jira_ids written and the
+        JQL filter that produced them.
+        """
+        seen_ids = set()
+        jql_filter = None
+        pending_write = None
+        
+        async def write_page(task_docs: List[Dict[str, Any]], issues: List[Dict]) -> None:
+            with timings.measure("tasks_db"):
+                await self.upsert_task_documents(user_id, task_docs, generation)
+            if credentials is not None:
+                await self.store_page_transitions(credentials, user_id, issues, timings, changelog_since)
+        
+        page_iterator = pages.__aiter__()
+        try:
+            while True:
+                with timings.measure("tasks_http"):
+                    try:
+                        jql_filter, issues = await page_iterator.__anext__()
+                    except StopAsyncIteration:
+                        break
+                
+                with timings.measure("tasks_parse"):
+                    task_docs = self.build_task_documents(issues, user_id)
+                timings.count("pages")
+                timings.count("issues", len(issues))
+                seen_ids.update(task_doc["jira_id"] for task_doc in task_docs)
+                
+                # Keep at most one write in flight so memory stays bounded by page size
+                if pending_write is not None:
+                    await pending_write
+                pending_write = asyncio.create_task(write_page(task_docs, issues))
+        finally:
+            if pending_write is not None:
+                await pending_write
+        
+        return seen_ids, jql_filter
+
+    async def sync_jira_tasks_full(self, credentials: JiraCredentialsInDB, user_id: str, timings: SyncTimings, transitions_watermark: Optional[datetime] = None) -> Tuple[int, Optional[str]]:
+        """Write every task from Jira page by page into a new generation, then make it the active one.
+
+        Tasks Jira no longer returns simply aren't in the new generation. Changelogs are embedded in
+        the pages until transitions have been stored once; after that only issues updated since
+        transitions_watermark have theirs fetched. Returns the number of tasks seen and the JQL
+        filter that produced them.
+        """
+        if transitions_watermark is None:
+            expand, changelog_since = self.task_page_expand(), None
+        else:
+            expand = None
+            changelog_since = transitions_watermark - timedelta(minutes=settings.JIRA_DELTA_SYNC_OVERLAP_MINUTES)
+        
+        generation = await snapshot_service.begin_generation(user_id)
+        try:
+            pages = self.iter_jira_issue_pages(credentials, expand=expand)
+            seen_ids, jql_filter = await self.store_issue_pages(user_id, pages, timings, generation, credentials, changelog_since)
+        except BaseException:
+            # Including cancellation by the per-user sync timeout
+            snapshot_service.discard_generation(user_id, "tasks", generation)
+            raise
+        
+        if jql_filter is None:
+            snapshot_service.discard_generation(user_id, "tasks", generation)
+            return 0, None
+        
+        with timings.measure("tasks_db"):
+            if await snapshot_service.activate_generation(user_id, "tasks", generation):
+                await self.delete_orphaned_transitions(user_id, seen_ids)
+        
+        return len(seen_ids), jql_filter
+
+    async def sync_jira_tasks_delta(self, credentials: JiraCredentialsInDB, user_id: str, state: Dict[str, Any], now: datetime, timings: SyncTimings) -> int:
+        """Upsert only tasks updated since the stored watermark"""
+        elapsed_minutes = math.ceil((now - state["watermark"]).total_seconds() / 60)
+        updated_within_minutes = max(elapsed_minutes, 0) + settings.JIRA_DELTA_SYNC_OVERLAP_MINUTES
+        
+        pages = self.iter_jira_issue_pages(
+            credentials,
+            jql_filters=[state["jql_filter"]],
+            updated_within_minutes=updated_within_minutes,
+            expand=self.task_page_expand()
+        )
+        timings.details["jql"] = build_task_jql(state["jql_filter"], updated_within_minutes)
+        generation = await snapshot_service.get_active_generation(user_id)
+        changed_ids, _ = await self.store_issue_pages(user_id, pages, timings, generation, credentials)
+        return len(changed_ids)
+
+    async def reconcile_jira_tasks(self, credentials: JiraCredentialsInDB, user_id: str, jql_filter: str) -> int:
+        """Find tasks deleted in Jira by comparing issue ids only, and remove them locally"""
+        jira_ids = await self.fetch_jira_issue_ids(credentials, jql_filter)
+        return await self.delete_missing_jira_tasks(user_id, jira_ids)
+
+    async def sync_jira_tasks(self, credentials: JiraCredentialsInDB, user_id: str, timings: Optional[SyncTimings] = None) -> int:
+        """Sync tasks using a delta query when a watermark exists, otherwise a full sync.
+
+        Returns the number of tasks written. The watermark only advances when the run succeeds.
+        """
+        if timings is None:
+            timings = SyncTimings()
+        now = datetime.utcnow()
+        state = await self.get_sync_state(user_id)
+        transitions_watermark = state.get("transitions_watermark") if state and settings.JIRA_CHANGELOG_SYNC_ENABLED else None
+        
+        if self.is_delta_sync_possible(state, now):
+            timings.details["mode"] = "delta"
+            task_count = await self.sync_jira_tasks_delta(credentials, user_id, state, now, timings)
+            updates = {"watermark": now, "last_delta_count": task_count}
+            updates.update(self.transitions_watermark_update(timings, now))
+            
+            last_reconciled = state.get("last_reconciled_at") or state["last_full_sync_at"]
+            if now - last_reconciled >= timedelta(minutes=settings.JIRA_RECONCILE_INTERVAL_MINUTES):
+                with timings.measure("tasks_reconcile"):
+                    await self.reconcile_jira_tasks(credentials, user_id, state["jql_filter"])
+                updates["last_reconciled_at"] = now
+            
+            await self.save_sync_state(user_id, updates)
+            logger.info(f"Delta sync wrote {task_count} changed tasks for user {user_id}")
+            return task_count
+        
+        timings.details["mode"] = "full"
+        task_count, jql_filter = await self.sync_jira_tasks_full(credentials, user_id, timings, transitions_watermark)
+        if jql_filter is not None:
+            timings.details["jql"] = build_task_jql(jql_filter)
+            await self.save_sync_state(user_id, {
+                "jql_filter": jql_filter,
+                "watermark": now,
+                "last_full_sync_at": now,
+                "last_reconciled_at": now,
+                "last_delta_count": task_count,
+                "task_total": task_count,
+                **self.transitions_watermark_update(timings, now)
+            })
+        return task_count
+
+    def transitions_watermark_update(self, timings: SyncTimings, now: datetime) -> Dict[str, Any]:
+        """Advance the transitions watermark only when this run stored every changelog it needed"""
+        if not settings.JIRA_CHANGELOG_SYNC_ENABLED or "transitions_error" in timings.details:
+            return {}
+        return {"transitions_watermark": now}
+
+    def build_status_transitions(self, user_id: str, issue: Dict, histories: List[Dict]) -> List[Dict[str, Any]]:
+        """Keep only the status changes of an issue's changelog, one compact document each"""
+        transitions = []
+        for history in histories:
+            for item in history.get("items", []):
+                if item.get("field") != "status":
+                    continue
+                changed_at = history.get("created")
+                transitions.append({
+                    "user_id": user_id,
+                    "jira_id": issue.get("id", ""),
+                    "key": issue.get("key", ""),
+                    "history_id": str(history.get("id", "")),
+                    "from_status": item.get("fromString"),
+                    "to_status": item.get("toString"),
+                    "changed_at": parse_jira_datetime(changed_at) if changed_at else datetime.utcnow()
+                })
+        return transitions
+
+    async def fetch_issue_changelog(self, credentials: JiraCredentialsInDB, issue_id: str, start_at: int = 0) -> List[Dict]:
+        """Fetch changelog histories of one issue from /issue/{id}/changelog, starting at start_at"""
+        decrypted_token = self.decrypt_token(credentials.api_token)
+        jira_url = f"{credentials.domain}/rest/api/3/issue/{issue_id}/changelog"
+
+        histories = []
+        while True:
+            response = await jira_client_registry.request(
+                credentials.domain,
+                "GET",
+                jira_url,
+                params={"startAt": start_at, "maxResults": 100},
+                headers={"Accept": "application/json"},
+                auth=(credentials.email, decrypted_token)
+            )
+            if response.status_code != 200:
+                raise JiraAPIError(
+                    f"Jira changelog call failed with status {response.status_code} for issue {issue_id}: {response.text}",
+                    status_code=response.status_code
+                )
+
+            data = response.json()
+            values = data.get("values", [])
+            histories.extend(values)
+            start_at += len(values)
+            if not values or data.get("isLast", start_at >= data.get("total", 0)):
+                return histories
+
+    async def store_status_transitions(self, user_id: str, transitions: List[Dict[str, Any]]) -> int:
+        """Upsert status transitions keyed by (user_id, jira_id, history_id)"""
+        if not transitions:
+            return 0
+
+        db = get_database()
+        operations = [
+            UpdateOne(
+                {"user_id": user_id, "jira_id": transition["jira_id"], "history_id": transition["history_id"]},
+                {"$set": transition},
+                upsert=True
+            )
+            for transition in transitions
+        ]
+        result = await db[STATUS_TRANSITIONS_COLLECTION].bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    async def store_page_transitions(self, credentials: JiraCredentialsInDB, user_id: str, issues: List[Dict], timings: SyncTimings, changelog_since: Optional[datetime] = None) -> None:
+        """Store status transitions of one page of issues.
+
+        Changelogs embedded in the page are used as they are; histories beyond the embedded cap, and
+        changelogs of issues without one that were updated since changelog_since, are fetched per
+        issue, at most JIRA_CHANGELOG_FETCH_CONCURRENCY at a time. Transitions are optional for a
+        sync: any failure is logged and recorded in the run, never raised.
+        """
+        semaphore = asyncio.Semaphore(max(settings.JIRA_CHANGELOG_FETCH_CONCURRENCY, 1))
+        
+        async def issue_histories(issue: Dict) -> List[Dict]:
+            changelog = issue.get("changelog")
+            if changelog is None:
+                updated = issue.get("fields", {}).get("updated")
+                if changelog_since is None or (updated and parse_jira_datetime(updated) < changelog_since):
+                    return []
+                histories = []
+            else:
+                histories = changelog.get("histories", [])
+                # Search responses cap the embedded changelog, fetch the rest per issue
+                if changelog.get("total", len(histories)) <= len(histories):
+                    return histories
+            async with semaphore:
+                return histories + await self.fetch_issue_changelog(credentials, issue["id"], len(histories))
+        
+        try:
+            with timings.measure("changelog"):
+                page_histories = await asyncio.gather(*(issue_histories(issue) for issue in issues))
+                transitions = []
+                for issue, histories in zip(issues, page_histories):
+                    transitions.extend(self.build_status_transitions(user_id, issue, histories))
+                timings.count("transitions", await self.store_status_transitions(user_id, transitions))
+        except Exception as e:
+            logger.error(f"Failed to store status transitions for user {user_id}: {e}")
+            timings.details["transitions_error"] = str(e)
+
+    async def sync_jira_projects(self, credentials: JiraCredentialsInDB, user_id: str, timings: SyncTimings) -> int:
+        """Fetch and store projects for a user, returning how many were synced"""
+        with timings.measure("projects_http"):
+            projects = await self.fetch_jira_projects(credentials, user_id)
+        if projects:
+            with timings.measure("projects_db"):
+                await self.store_jira_projects(user_id, projects)
+        return len(projects)
 
     async def sync_jira_data(self, user_id: str) -> bool:
-        """Sync Jira data (tasks and projects) for a user"""
+        """Sync Jira data (tasks and projects) for a user.
+
+        Concurrent callers for the same user join the sync already in flight and get its result
+        instead of starting another one.
+        """
+        inflight = self.inflight_syncs.get(user_id)
+        if inflight is None:
+            inflight = asyncio.create_task(self.run_bounded_sync(user_id))
+            self.inflight_syncs[user_id] = inflight
+            
+            def forget(task: asyncio.Task) -> None:
+                if self.inflight_syncs.get(user_id) is task:
+                    del self.inflight_syncs[user_id]
+            inflight.add_done_callback(forget)
+        else:
+            logger.info(f"Joining sync already in flight for user {user_id}")
+        
+        # A caller that gives up must not cancel the sync for everyone else; the sync bounds itself
+        return await asyncio.shield(inflight)
+
+    def cancel_sync(self, user_id: str) -> bool:
+        """Cancel the sync in flight for a user in this process, e.g. when its queue lease was lost"""
+        inflight = self.inflight_syncs.get(user_id)
+        if inflight is None or inflight.done():
+            return False
+        inflight.cancel()
+        return True
+
+    async def run_bounded_sync(self, user_id: str) -> bool:
+        """Run the single-flight sync, cancelling it once it exceeds SCHEDULER_USER_SYNC_TIMEOUT"""
+        try:
+            return await asyncio.wait_for(self.run_single_flight_sync(user_id), timeout=settings.SCHEDULER_USER_SYNC_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"Sync for user {user_id} timed out after {settings.SCHEDULER_USER_SYNC_TIMEOUT}s and was cancelled")
+            return False
+
+    async def acquire_sync_lock(self, user_id: str) -> bool:
+        """Take the cross-process sync lock for a user; False if another process holds it"""
+        db = get_database()
+        now = datetime.utcnow()
+        try:
+            await db[SYNC_LOCK_COLLECTION].find_one_and_update(
+                {"_id": user_id, "$or": [{"owner": None}, {"expires_at": {"$lt": now}}, {"owner": self.instance_id}]},
+                {"$set": {
+                    "owner": self.instance_id,
+                    "acquired_at": now,
+                    "expires_at": now + timedelta(seconds=settings.SYNC_LOCK_TTL_SECONDS)
+                }},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def renew_sync_lock(self, user_id: str) -> None:
+        """Keep the sync lock alive while the sync runs"""
+        db = get_database()
+        while True:
+            await asyncio.sleep(settings.SYNC_LOCK_TTL_SECONDS / 3)
+            await db[SYNC_LOCK_COLLECTION].update_one(
+                {"_id": user_id, "owner": self.instance_id},
+                {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=settings.SYNC_LOCK_TTL_SECONDS)}}
+            )
+
+    async def release_sync_lock(self, user_id: str, success: bool) -> None:
+        """Release the sync lock, leaving the result for callers waiting in other processes"""
+        db = get_database()
+        now = datetime.utcnow()
+        await db[SYNC_LOCK_COLLECTION].update_one(
+            {"_id": user_id, "owner": self.instance_id},
+            {"$set": {"owner": None, "expires_at": now, "finished_at": now, "last_result": success}}
+        )
+
+    async def wait_for_sync_lock(self, user_id: str) -> bool:
+        """Wait for the sync running in another process and return its result"""
+        db = get_database()
+        logger.info(f"Joining sync for user {user_id} running in another process")
+        while True:
+            await asyncio.sleep(settings.SYNC_LOCK_POLL_INTERVAL)
+            lock = await db[SYNC_LOCK_COLLECTION].find_one({"_id": user_id})
+            if not lock:
+                return False
+            if lock.get("owner") is None:
+                return bool(lock.get("last_result"))
+            if lock.get("expires_at") and lock["expires_at"] < datetime.utcnow():
+                # The other process died mid-sync; run it here instead
+                return await self.run_single_flight_sync(user_id)
+
+    async def run_single_flight_sync(self, user_id: str) -> bool:
+        """Run the sync under the user's Mongo lock, or wait for the process that holds it"""
+        if not settings.SYNC_LOCK_ENABLED:
+            return await self.run_jira_sync(user_id)
+        
+        try:
+            acquired = await self.acquire_sync_lock(user_id)
+        except Exception as e:
+            # Don't let a lock problem block syncing altogether
+            logger.error(f"Failed to acquire sync lock for user {user_id}: {e}")
+            return await self.run_jira_sync(user_id)
+        if not acquired:
+            return await self.wait_for_sync_lock(user_id)
+        
+        renewal = asyncio.create_task(self.renew_sync_lock(user_id))
+        success = False
+        try:
+            success = await self.run_jira_sync(user_id)
+            return success
+        finally:
+            renewal.cancel()
+            try:
+                await self.release_sync_lock(user_id, success)
+            except Exception as e:
+                logger.error(f"Failed to release sync lock for user {user_id}: {e}")
+
+    async def run_jira_sync(self, user_id: str) -> bool:
+        """Fetch and store projects, tasks and status transitions for a user, recording the run in sync_runs"""
+        timings = SyncTimings()
+        started_at = datetime.utcnow()
+        counters_token = sync_request_counters.set(timings.counters)
+        run = {"user_id": user_id, "domain": None, "outcome": "error", "error": None}
         try:
             # Get user's Jira credentials
             credentials = await self.get_jira_credentials(user_id)
             if not credentials:
                 logger.warning(f"No Jira credentials found for user {user_id}")
+                run["outcome"] = "no_credentials"
                 return False
+            run["domain"] = jira_client_registry.normalize_domain(credentials.domain)
             
             # Validate connection
-            is_valid = await self.validate_jira_connection(credentials)
+            with timings.measure("validate"):
+                is_valid = await self.validate_jira_connection(credentials)
             if not is_valid:
                 logger.warning(f"Invalid Jira connection for user {user_id}")
+                run["outcome"] = "invalid_connection"
                 return False
             
-            # Fetch and store projects
-            projects = await self.fetch_jira_projects(credentials, user_id)
-            if projects:
-                await self.store_jira_projects(user_id, projects)
-                logger.info(f"Synced {len(projects)} projects for user {user_id}")
-            
-            # Fetch and store tasks
-            tasks = await self.fetch_jira_tasks(credentials, user_id)
-            if tasks:
-                await self.store_jira_tasks(user_id, tasks)
-                logger.info(f"Synced {len(tasks)} tasks for user {user_id}")
-            
+            # Projects and tasks are independent, so fetch and store them concurrently
+            project_count, task_count = await asyncio.gather(
+                self.sync_jira_projects(credentials, user_id, timings),
+                self.sync_jira_tasks(credentials, user_id, timings)
+            )
+            run.update({"projects": project_count, "tasks_written": task_count})
+            if project_count:
+                logger.info(f"Synced {project_count} projects for user {user_id}")
+            if task_count:
+                logger.info(f"Synced {task_count} tasks for user {user_id}")
+            
+            # Status transitions came with the task pages' changelogs
+            transition_count = timings.counters.get("transitions", 0)
+            run["transitions"] = transition_count
+            if transition_count:
+                logger.info(f"Synced {transition_count} status transitions for user {user_id}")
+            if timings.details.get("transitions_error"):
+                run["error"] = f"status transitions: {timings.details['transitions_error']}"
+            
+            logger.info(f"Sync timings for user {user_id}: {timings.summary()}")
+            run["outcome"] = "success"
             return True
             
         except Exception as e:
             logger.error(f"Failed to sync Jira data for user {user_id}: {e}")
+            run["error"] = str(e)
             return False
+        
+        finally:
+            sync_request_counters.reset(counters_token)
+            await sync_run_service.record_run({
+                **run,
+                **timings.details,
+                **timings.counters,
+                "phases": {phase: round(seconds, 4) for phase, seconds in timings.phases.items()},
+                "duration_seconds": round(timings.total(), 4),
+                "started_at": started_at,
+                "finished_at": datetime.utcnow()
+            })
 
-    # New methods for specific issue types (matching the updated API)
-    async def fetch_epics(self, credentials: JiraCredentialsInDB, project_key: str) -> List[Dict]:
-        """Fetch epics for a specific project"""
-        jql = f"project={project_key} AND issuetype=Epic"
-        return await self.fetch_issues_by_jql_new_endpoint(credentials, jql)
+    async def fetch_project_issues(self, credentials: JiraCredentialsInDB, project_key: str) -> List[Dict]:
+        """Fetch every issue of a project with one paginated search; raises JiraAPIError if it fails"""
+        issues = []
+        async for page in self.iter_planned_issues_by_jql(credentials, f"project={project_key} ORDER BY updated DESC"):
+            issues.extend(page)
+        logger.info(f"Fetched {len(issues)} issues for project {project_key}")
+        return issues
 
-    async def fetch_stories(self, credentials: JiraCredentialsInDB, project_key: str) -> List[Dict]:
-        """Fetch stories for a specific project"""
-        jql = f"project={project_key} AND issuetype=Story"
-        return await self.fetch_issues_by_jql_new_endpoint(credentials, jql)
+    async def fetch_project_issues_by_type(self, credentials: JiraCredentialsInDB, project_key: str) -> Optional[Dict[str, List[Dict]]]:
+        """Fetch epics, stories, tasks and bugs for a project with one paginated search.
 
-    async def fetch_tasks(self, credentials: JiraCredentialsInDB, project_key: str) -> List[Dict]:
-        """Fetch tasks for a specific project"""
-        jql = f"project={project_key} AND issuetype=Task"
-        return await self.fetch_issues_by_jql_new_endpoint(credentials, jql)
+        Returns issues partitioned by issue type name, or None if the search failed.
+        """
+        jql = f"project={project_key} AND issuetype in ({', '.join(PROJECT_ISSUE_TYPES)})"
+        partitions: Dict[str, List[Dict]] = {issue_type: [] for issue_type in PROJECT_ISSUE_TYPES}
+        try:
+            async for issues in self.iter_planned_issues_by_jql(credentials, jql):
+                for issue in issues:
+                    issue_type = ((issue.get("fields") or {}).get("issuetype") or {}).get("name")
+                    if issue_type in partitions:
+                        partitions[issue_type].append(issue)
+        except JiraAPIError as e:
+            logger.error(f"Failed to fetch issues by type for project {project_key}: {e}")
+            return None
 
-    async def fetch_bugs(self, credentials: JiraCredentialsInDB, project_key: str) -> List[Dict]:
-        """Fetch bugs for a specific project"""
-        jql = f"project={project_key} AND issuetype=Bug"
-        return await self.fetch_issues_by_jql_new_endpoint(credentials, jql)
+        logger.info(f"Fetched {sum(len(issues) for issues in partitions.values())} issues by type for project {project_key} in one search")
+        return partitions
 
 # Helper functions for date parsing
 
+# Fallback JIRA datetime formats, only used when the ISO fast path can't read a value
+JIRA_DATETIME_FORMATS = [
+    "%Y-%m-%dT%H:%M:%S.%f%z",  # 2023-01-01T10:00:00.000+0000
+    "%Y-%m-%dT%H:%M:%S%z",      # 2023-01-01T10:00:00+0000
+    "%Y-%m-%dT%H:%M:%S.%fZ",    # 2023-01-01T10:00:00.000Z
+    "%Y-%m-%dT%H:%M:%SZ",       # 2023-01-01T10:00:00Z
+    "%Y-%m-%dT%H:%M:%S",        # 2023-01-01T10:00:00
+]
+
+# Index of the fallback format that matched last, tried first next time
+_last_datetime_format = 0
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to naive UTC, matching datetime.utcnow() and MongoDB reads"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _normalize_iso_offset(date_str: str) -> str:
+    """Rewrite Jira's `Z` / `+0000` offsets into the `+00:00` form fromisoformat accepts"""
+    if date_str.endswith("Z"):
+        return date_str[:-1] + "+00:00"
+    if len(date_str) > 5 and date_str[-5] in "+-" and date_str[-4:].isdigit():
+        return date_str[:-2] + ":" + date_str[-2:]
+    return date_str
+
+
 def parse_jira_datetime(date_str):
-    """Parse JIRA datetime string in various formats"""
+    """Parse JIRA datetime string into a naive UTC datetime"""
+    global _last_datetime_format
+    
     if not date_str:
         return None
     
-    # Common JIRA datetime formats
-    formats = [
-        "%Y-%m-%dT%H:%M:%S.%f%z",  # 2023-01-01T10:00:00.000+0000
-        "%Y-%m-%dT%H:%M:%S%z",      # 2023-01-01T10:00:00+0000
-        "%Y-%m-%dT%H:%M:%S.%fZ",    # 2023-01-01T10:00:00.000Z
-        "%Y-%m-%dT%H:%M:%SZ",       # 2023-01-01T10:00:00Z
-        "%Y-%m-%dT%H:%M:%S",        # 2023-01-01T10:00:00
-    ]
+    # Fast path: Jira's fixed ISO-8601 shapes
+    if "T" in date_str:
+        try:
+            return _to_naive_utc(datetime.fromisoformat(_normalize_iso_offset(date_str)))
+        except ValueError:
+            pass
     
-    for fmt in formats:
+    # Slow path: known formats, starting with the one that matched last
+    format_count = len(JIRA_DATETIME_FORMATS)
+    for offset in range(format_count):
+        index = (_last_datetime_format + offset) % format_count
         try:
-            return datetime.strptime(date_str, fmt)
+            parsed = datetime.strptime(date_str, JIRA_DATETIME_FORMATS[index])
         except ValueError:
             continue
+        _last_datetime_format = index
+        return _to_naive_utc(parsed)
     
     # If all formats fail, log and return current time
     logger.warning(f"Unable to parse datetime: {date_str}")
@@ -715,21 +1640,13 @@ def parse_jira_date(date_str):
     if not date_str:
         return None
     
-    # Common JIRA date formats
-    formats = [
-        "%Y-%m-%d",  # 2023-01-01
-    ]
-    
-    for fmt in formats:
-        try:
-            # Parse as date and convert to datetime at start of day
-            parsed_date = datetime.strptime(date_str, fmt).date()
-            # Convert date to datetime at start of day (00:00:00) for MongoDB
-            return datetime.combine(parsed_date, datetime.min.time())
-        except ValueError:
-            continue
+    try:
+        # Jira dates are always 2023-01-01; convert to datetime at start of day (00:00:00) for MongoDB
+        return datetime.combine(date.fromisoformat(date_str), datetime.min.time())
+    except ValueError:
+        pass
     
-    # If all formats fail, log and return current date as datetime
+    # If the date can't be parsed, log and return current date as datetime
     logger.warning(f"Unable to parse date: {date_str}")
     return datetime.combine(datetime.utcnow().date(), datetime.min.time())
 
@@ -2,6 +2,8 @@ import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from db import get_database
+from services.snapshot_service import snapshot_service
+from utils.pagination import find_page, total_count_cache
 from models.reports import (
     ReportMetadata, 
     ReportDataPoint, 
@@ -10,15 +12,18 @@ from models.reports import (
     ReportFilter,
     ReportGenerationRequest
 )
-from models.jira import JiraTask, JiraProject
+from models.jira import JiraProject
 from models.auth import UserResponse
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Task fields the report generators aggregate over; nothing else is fetched
+REPORT_TASK_PROJECTION = {"_id": 0, "status": 1, "priority": 1, "assignee": 1, "duedate": 1}
+
 class ReportsService:
-    async def get_available_reports(self, user_id: str, page: int = 1, size: int = 50) -> ReportListResponse:
-        """Get list of available reports for the user"""
+    async def get_available_reports(self, user_id: str, page: int = 1, size: int = 50, cursor: Optional[str] = None, exact_total: bool = False) -> ReportListResponse:
+        """Get list of available reports for the user, keyset-paginated on (created_at, _id)"""
         try:
             db = get_database()
             reports_collection = db.reports
@@ -31,16 +36,13 @@ class ReportsService:
                 ]
             }
             
-            # Calculate pagination
-            skip = (page - 1) * size
-            
-            # Get total count
-            total = await reports_collection.count_documents(query)
+            # Get total count, from the recent-count cache unless an exact one is asked for
+            total, total_is_exact = await total_count_cache.count(reports_collection, query, exact_total)
             
-            # Get reports with pagination
-            cursor = reports_collection.find(query).skip(skip).limit(size).sort("created_at", -1)
+            # Get the page after the cursor
+            docs, next_cursor = await find_page(reports_collection, query, "created_at", size, cursor, page)
             reports = []
-            async for doc in cursor:
+            for doc in docs:
                 report = ReportMetadata(
                     id=str(doc["_id"]),
                     name=doc["name"],
@@ -56,8 +58,10 @@ class ReportsService:
             return ReportListResponse(
                 reports=reports,
                 total=total,
+                total_is_estimate=not total_is_exact,
                 page=page,
-                size=size
+                size=size,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -224,7 +228,7 @@ class ReportsService:
             tasks_collection = db.jira_tasks
             
             # Build query based on filters
-            query = {"user_id": user_id}
+            query = await snapshot_service.active_query(user_id)
             
             if request.project_key:
                 query["project_key"] = request.project_key
@@ -238,39 +242,23 @@ class ReportsService:
                 query["created"] = date_query
             
             # Get tasks
-            cursor = tasks_collection.find(query)
+            cursor = tasks_collection.find(query, REPORT_TASK_PROJECTION)
             tasks = []
             status_counts = {}
             priority_counts = {}
             assignee_counts = {}
             
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
+            async for task in cursor:
                 tasks.append(task)
                 
                 # Count by status
-                status_counts[task.status] = status_counts.get(task.status, 0) + 1
+                status_counts[task["status"]] = status_counts.get(task["status"], 0) + 1
                 
                 # Count by priority
-                priority_counts[task.priority] = priority_counts.get(task.priority, 0) + 1
+                priority_counts[task["priority"]] = priority_counts.get(task["priority"], 0) + 1
                 
                 # Count by assignee
-                assignee = task.assignee or "Unassigned"
+                assignee = task.get("assignee") or "Unassigned"
                 assignee_counts[assignee] = assignee_counts.get(assignee, 0) + 1
             
             # Create data points
@@ -302,9 +290,9 @@ class ReportsService:
             
             # Summary statistics
             total_tasks = len(tasks)
-            completed_tasks = len([t for t in tasks if t.status in ["Done", "Closed", "Resolved"]])
-            in_progress_tasks = len([t for t in tasks if t.status in ["In Progress", "In Review"]])
-            overdue_tasks = len([t for t in tasks if t.duedate and t.duedate < datetime.utcnow() and t.status not in ["Done", "Closed", "Resolved"]])
+            completed_tasks = len([t for t in tasks if t["status"] in ["Done", "Closed", "Resolved"]])
+            in_progress_tasks = len([t for t in tasks if t["status"] in ["In Progress", "In Review"]])
+            overdue_tasks = len([t for t in tasks if t.get("duedate") and t["duedate"] < datetime.utcnow() and t["status"] not in ["Done", "Closed", "Resolved"]])
             
             summary = {
                 "total_tasks": total_tasks,
@@ -327,7 +315,7 @@ class ReportsService:
             tasks_collection = db.jira_tasks
             
             # For user performance, we might want to look at tasks assigned to users
-            query = {"user_id": user_id}
+            query = await snapshot_service.active_query(user_id)
             
             if request.user_id:
                 query["assignee_id"] = request.user_id
@@ -335,31 +323,15 @@ class ReportsService:
                 query["project_key"] = request.project_key
             
             # Get tasks
-            cursor = tasks_collection.find(query)
+            cursor = tasks_collection.find(query, REPORT_TASK_PROJECTION)
             tasks = []
             user_task_counts = {}
             
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
+            async for task in cursor:
                 tasks.append(task)
                 
                 # Count tasks per user
-                assignee = task.assignee or "Unassigned"
+                assignee = task.get("assignee") or "Unassigned"
                 user_task_counts[assignee] = user_task_counts.get(assignee, 0) + 1
             
             # Create data points
@@ -375,7 +347,7 @@ class ReportsService:
             
             # Summary statistics
             total_tasks = len(tasks)
-            completed_tasks = len([t for t in tasks if t.status in ["Done", "Closed", "Resolved"]])
+            completed_tasks = len([t for t in tasks if t["status"] in ["Done", "Closed", "Resolved"]])
             
             summary = {
                 "total_tasks": total_tasks,
@@ -397,7 +369,7 @@ class ReportsService:
             tasks_collection = db.jira_tasks
             
             # Build query
-            query = {"user_id": user_id}
+            query = await snapshot_service.active_query(user_id)
             
             if request.project_key:
                 query["project_key"] = request.project_key
@@ -522,37 +494,21 @@ class ReportsService:
             tasks_collection = db.jira_tasks
             
             # Build query
-            query = {"user_id": user_id}
+            query = await snapshot_service.active_query(user_id)
             
             if request.project_key:
                 query["project_key"] = request.project_key
             
             # Get tasks and analyze resource distribution
-            cursor = tasks_collection.find(query)
+            cursor = tasks_collection.find(query, REPORT_TASK_PROJECTION)
             tasks = []
             assignee_workload = {}
             
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
+            async for task in cursor:
                 tasks.append(task)
                 
                 # Track workload by assignee
-                assignee = task.assignee or "Unassigned"
+                assignee = task.get("assignee") or "Unassigned"
                 assignee_workload[assignee] = assignee_workload.get(assignee, 0) + 1
             
             # Create data points
@@ -1,9 +1,74 @@
 from datetime import datetime, date
+from typing import List
 from db import get_database
+from services.snapshot_service import snapshot_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+def get_task_due_date(task):
+    """Return (due date, datetime used for querying) for a task, or None if it can't be checked"""
+    due_date = task.get("duedate")
+
+    # Convert due_date to date if it's a datetime
+    if isinstance(due_date, datetime):
+        return due_date.date(), due_date  # Use datetime for query
+    if isinstance(due_date, date):
+        # Convert date to datetime for MongoDB query
+        return due_date, datetime.combine(due_date, datetime.min.time())
+    return None
+
+
+async def find_task_risk(task, leaves):
+    """Build the risk alert for a task whose due date falls inside its assignee's leave, if any"""
+    task_key = task.get("key", "UNKNOWN")
+    due_dates = get_task_due_date(task)
+    due_date_obj, due_date_query = due_dates
+
+    # Normalize email to lowercase for comparison
+    assignee_email_lower = task["assignee_email"].lower().strip()
+
+    logger.debug(f"🔎 Checking {task_key} - Assignee: {assignee_email_lower}, Due: {due_date_obj}")
+
+    # Find overlapping leave - IMPROVED QUERY
+    # Check if the due date falls within the leave period
+    # Ensure consistent datetime comparison
+
+    # The due_date_query is already a datetime object
+    # Ensure we compare dates properly
+    leave = await leaves.find_one({
+        "employee_email": assignee_email_lower,
+        "leave_start": {"$lte": due_date_query},
+        "leave_end": {"$gte": due_date_query}
+    })
+
+    if not leave:
+        # Try alternate query for debugging
+        all_leaves_for_user = await leaves.count_documents({
+            "employee_email": assignee_email_lower
+        })
+        logger.debug(f"   No overlap found. User has {all_leaves_for_user} leave records total")
+        return None
+
+    logger.info(f"⚠️ OVERLAP FOUND for {task_key}!")
+    logger.info(f"   Task due: {due_date_obj}")
+    logger.info(f"   Leave: {leave['leave_start']} to {leave['leave_end']}")
+
+    # Create new risk alert
+    return {
+        "user_id": task.get("user_id"),
+        "task_key": task_key,
+        "task_title": task.get("summary", "No title"),
+        "assignee": assignee_email_lower,
+        "due_date": datetime.combine(due_date_obj, datetime.min.time()) if isinstance(due_date_obj, date) and not isinstance(due_date_obj, datetime) else due_date_obj,  # Convert date to datetime for MongoDB
+        "leave_start": leave["leave_start"],
+        "leave_end": leave["leave_end"],
+        "risk_level": "HIGH",
+        "status": "OPEN",
+        "created_at": datetime.utcnow()
+    }
+
+
 async def run_risk_analysis():
     """Analyze tasks for leave-related risks"""
     db = get_database()
@@ -25,7 +90,12 @@ async def run_risk_analysis():
 
     logger.info("🔍 Starting risk analysis...")
     
+    # Superseded snapshot generations are still on disk until garbage-collected
+    active_generations = await snapshot_service.get_active_generations()
+    
     async for task in tasks.find():
+        if not snapshot_service.is_active(task, active_generations):
+            continue
         task_count += 1
         assignee_email = task.get("assignee_email")
         due_date = task.get("duedate")
@@ -44,68 +114,48 @@ async def run_risk_analysis():
             skipped_count += 1
             continue
 
-        # Convert due_date to date if it's a datetime
-        if isinstance(due_date, datetime):
-            due_date_obj = due_date.date()
-            due_date_query = due_date  # Use datetime for query
-        elif isinstance(due_date, date):
-            due_date_obj = due_date
-            # Convert date to datetime for MongoDB query
-            due_date_query = datetime.combine(due_date, datetime.min.time())
-        else:
+        if get_task_due_date(task) is None:
             logger.debug(f"❌ Skipping {task_key}: Invalid date type {type(due_date)}")
             skipped_count += 1
             continue
         
         checked_count += 1
         
-        # Normalize email to lowercase for comparison
-        assignee_email_lower = assignee_email.lower().strip()
-        
-        logger.debug(f"🔎 Checking {task_key} - Assignee: {assignee_email_lower}, Due: {due_date_obj}")
-
-        # Find overlapping leave - IMPROVED QUERY
-        # Check if the due date falls within the leave period
-        # Ensure consistent datetime comparison
-        
-        # The due_date_query is already a datetime object
-        # Ensure we compare dates properly
-        leave = await leaves.find_one({
-            "employee_email": assignee_email_lower,
-            "leave_start": {"$lte": due_date_query},
-            "leave_end": {"$gte": due_date_query}
-        })
-        
-        if not leave:
-            # Try alternate query for debugging
-            all_leaves_for_user = await leaves.count_documents({
-                "employee_email": assignee_email_lower
-            })
-            logger.debug(f"   No overlap found. User has {all_leaves_for_user} leave records total")
+        risk = await find_task_risk(task, leaves)
+        if not risk:
             continue
 
-        logger.info(f"⚠️ OVERLAP FOUND for {task_key}!")
-        logger.info(f"   Task due: {due_date_obj}")
-        logger.info(f"   Leave: {leave['leave_start']} to {leave['leave_end']}")
-        
-        # Create new risk alert
-        risk = {
-            "task_key": task_key,
-            "task_title": task.get("summary", "No title"),
-            "assignee": assignee_email_lower,
-            "due_date": datetime.combine(due_date_obj, datetime.min.time()) if isinstance(due_date_obj, date) and not isinstance(due_date_obj, datetime) else due_date_obj,  # Convert date to datetime for MongoDB
-            "leave_start": leave["leave_start"],
-            "leave_end": leave["leave_end"],
-            "risk_level": "HIGH",
-            "status": "OPEN",
-            "created_at": datetime.utcnow()
-        }
-
         await risks.insert_one(risk)
         created.append(risk)
-        logger.info(f"✅ Created risk alert for {task_key} - {assignee_email_lower} on leave")
+        logger.info(f"✅ Created risk alert for {task_key} - {risk['assignee']} on leave")
     
     logger.info(f"📊 Analysis complete: {task_count} total tasks, {checked_count} checked, {skipped_count} skipped")
     logger.info(f"🚨 {len(created)} new risk alerts created")
 
     return created
+
+
+async def run_task_risk_analysis(task_key: str, user_ids: List[str]):
+    """Re-analyze leave risk of a single task key for the given users, leaving every other risk alert untouched"""
+    db = get_database()
+
+    tasks = db.jira_tasks
+    leaves = db.leaves
+    risks = db.risk_alerts
+
+    # Alerts created before they carried a user_id can't be attributed, so they are replaced too
+    await risks.delete_many({"task_key": task_key, "user_id": {"$in": user_ids + [None]}})
+
+    created = []
+    for user_id in user_ids:
+        task = await tasks.find_one({**await snapshot_service.active_query(user_id), "key": task_key})
+        if not task or not task.get("assignee_email") or get_task_due_date(task) is None:
+            continue
+
+        risk = await find_task_risk(task, leaves)
+        if risk:
+            await risks.insert_one(risk)
+            created.append(risk)
+
+    logger.info(f"🔁 Re-analyzed risk for {task_key} ({len(user_ids)} user(s)): {len(created)} risk alerts")
+    return created
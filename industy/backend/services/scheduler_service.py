@@ -1,28 +1,47 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Dict, Optional
+from config import settings
 from db import get_database
 from services.jira_service import jira_service
+from services.jira_http import jira_client_registry
+from services.sync_queue_service import sync_queue_service
+from services.sync_policy_service import sync_policy_service
 
 logger = logging.getLogger(__name__)
 
 class SchedulerService:
     def __init__(self):
         self.is_running = False
-        self.sync_interval = 300  # 5 minutes in seconds
+        # How often to look for users whose next sync is due; each user's own interval comes from sync_policy_service
+        self.tick_interval = settings.SCHEDULER_TICK_SECONDS
+        self.max_concurrent_syncs = settings.SCHEDULER_MAX_CONCURRENT_SYNCS
+        self.max_concurrent_syncs_per_domain = settings.SCHEDULER_MAX_CONCURRENT_SYNCS_PER_DOMAIN
+        self.user_sync_timeout = settings.SCHEDULER_USER_SYNC_TIMEOUT
 
-    async def start_scheduler(self):
-        """Start the scheduler service"""
+    async def start_scheduler(self, migrations: Optional[asyncio.Task] = None):
+        """Start the scheduler service, once the startup schema migrations (if any) have finished"""
         if self.is_running:
             return
             
         self.is_running = True
+        if migrations is not None:
+            try:
+                # Shielded so stopping the scheduler never cancels an index build
+                await asyncio.shield(migrations)
+            except asyncio.CancelledError:
+                self.is_running = False
+                raise
+            except Exception as e:
+                # Syncs still work without the newest indexes, only slower
+                logger.error(f"Starting scheduler without the latest schema migrations: {e}")
         logger.info("Starting scheduler service")
         
         while self.is_running:
             try:
                 await self.sync_all_users_data()
-                await asyncio.sleep(self.sync_interval)
+                await asyncio.sleep(self.tick_interval)
             except Exception as e:
                 logger.error(f"Scheduler error: {e}")
                 await asyncio.sleep(60)  # Wait 1 minute before retrying
@@ -32,32 +51,80 @@ class SchedulerService:
         self.is_running = False
         logger.info("Stopping scheduler service")
 
-    async def sync_all_users_data(self):
-        """Sync Jira data for all users with active connections"""
-        try:
-            logger.info("Starting periodic sync for all users")
-            db = get_database()
-            credentials_collection = db.jira_credentials
-            
-            # Find all active credentials
-            cursor = credentials_collection.find({"is_active": True})
-            async for credentials_doc in cursor:
+    async def sync_user_data(self, user_id: str, domain: str, global_limit: asyncio.Semaphore, domain_limits: Dict[str, asyncio.Semaphore]) -> bool:
+        """Sync one user's data within the concurrency limits, then schedule their next sync"""
+        success = await self.run_user_sync(user_id, domain, global_limit, domain_limits)
+        next_sync_at = await sync_policy_service.record_sync_result(user_id, success)
+        if next_sync_at:
+            logger.info(f"Next sync for user {user_id} at {next_sync_at.isoformat()}")
+        return success
+
+    async def run_user_sync(self, user_id: str, domain: str, global_limit: asyncio.Semaphore, domain_limits: Dict[str, asyncio.Semaphore]) -> bool:
+        """Sync one user's data within the global and per-domain concurrency limits"""
+        domain_key = jira_client_registry.normalize_domain(domain or "")
+        domain_limit = domain_limits.setdefault(domain_key, asyncio.Semaphore(self.max_concurrent_syncs_per_domain))
+        
+        # Take the per-domain slot first so a busy site doesn't hold global slots while waiting
+        async with domain_limit:
+            async with global_limit:
                 try:
-                    user_id = credentials_doc["user_id"]
                     logger.info(f"Syncing data for user {user_id}")
-                    
-                    # Sync user data
+                    # The sync cancels itself after user_sync_timeout, so the slots are held exactly as long as it runs
                     success = await jira_service.sync_jira_data(user_id)
                     if success:
                         logger.info(f"Successfully synced data for user {user_id}")
                     else:
                         logger.warning(f"Failed to sync data for user {user_id}")
-                        
-                except Exception as e:
-                    logger.error(f"Failed to sync data for user {credentials_doc['user_id']}: {e}")
-                    continue
+                    return success
                     
-            logger.info("Completed periodic sync for all users")
+                except Exception as e:
+                    logger.error(f"Failed to sync data for user {user_id}: {e}")
+                    return False
+
+    async def sync_all_users_data(self):
+        """Sync Jira data for users with active connections whose next sync is due, several users at a time"""
+        try:
+            started_at = datetime.utcnow()
+            db = get_database()
+            credentials_collection = db.jira_credentials
+            not_due = await sync_policy_service.get_not_due_user_ids(started_at)
+            
+            # Find all active credentials and start a bounded sync for each due user
+            due_credentials = []
+            async for credentials_doc in credentials_collection.find({"is_active": True}, {"user_id": 1, "domain": 1}):
+                if credentials_doc["user_id"] not in not_due:
+                    due_credentials.append(credentials_doc)
+            if not due_credentials:
+                return
+            
+            # With the job queue enabled API processes only enqueue, sync_worker.py does the work
+            if settings.SYNC_QUEUE_ENABLED:
+                queued = 0
+                for credentials_doc in due_credentials:
+                    if await sync_queue_service.enqueue(credentials_doc["user_id"], credentials_doc.get("domain", "")):
+                        # The worker schedules the real next sync once the job has run
+                        await sync_policy_service.defer_next_sync(credentials_doc["user_id"], settings.SYNC_JOB_LEASE_SECONDS)
+                        queued += 1
+                logger.info(f"Queued periodic sync for {queued} due users")
+                return
+            
+            logger.info(f"Starting periodic sync for {len(due_credentials)} due users")
+            global_limit = asyncio.Semaphore(self.max_concurrent_syncs)
+            domain_limits: Dict[str, asyncio.Semaphore] = {}
+            sync_tasks = []
+            for credentials_doc in due_credentials:
+                sync_tasks.append(asyncio.create_task(self.sync_user_data(
+                    credentials_doc["user_id"],
+                    credentials_doc.get("domain", ""),
+                    global_limit,
+                    domain_limits
+                )))
+            
+            results = await asyncio.gather(*sync_tasks)
+            succeeded = sum(1 for result in results if result)
+            elapsed = (datetime.utcnow() - started_at).total_seconds()
+            
+            logger.info(f"Completed periodic sync for due users: {succeeded}/{len(results)} succeeded in {elapsed:.1f}s")
             
         except Exception as e:
             logger.error(f"Failed to sync all users data: {e}")
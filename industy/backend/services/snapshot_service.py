@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, Set
+from pymongo import ReturnDocument
+from config import settings
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+# Per-user pointer documents: {_id: user_id, next_generation, tasks_generation, projects_generation}
+SNAPSHOT_COLLECTION = "jira_snapshots"
+
+# Snapshot kinds and the collection holding their generations
+SNAPSHOT_COLLECTIONS = {
+    "tasks": "jira_tasks",
+    "projects": "jira_projects"
+}
+
+
+class SnapshotService:
+    """Versioned snapshots of synced Jira data.
+
+    A full sync writes every document under a new generation number, then flips the user's
+    active generation pointer in one atomic update, so readers see either the old set or the
+    new one and never a half-written or empty set. Older generations are removed in the
+    background once readers that resolved the old pointer have had time to finish.
+    Documents written before snapshots existed have no generation and stay active until the
+    user's first flip.
+    """
+
+    def __init__(self):
+        # Pending garbage collections, kept referenced until they finish
+        self.gc_tasks: Set[asyncio.Task] = set()
+
+    async def get_active_generation(self, user_id: str, kind: str = "tasks") -> Optional[int]:
+        """Active generation of a user's tasks or projects, None until the first flip"""
+        db = get_database()
+        pointer = await db[SNAPSHOT_COLLECTION].find_one({"_id": user_id}, {f"{kind}_generation": 1})
+        return pointer.get(f"{kind}_generation") if pointer else None
+
+    async def get_active_generations(self, kind: str = "tasks") -> Dict[str, int]:
+        """Active generation of every user that has flipped at least once"""
+        db = get_database()
+        generations = {}
+        async for pointer in db[SNAPSHOT_COLLECTION].find({f"{kind}_generation": {"$ne": None}}, {f"{kind}_generation": 1}):
+            generations[pointer["_id"]] = pointer[f"{kind}_generation"]
+        return generations
+
+    async def active_query(self, user_id: str, kind: str = "tasks") -> Dict[str, Any]:
+        """Base query matching only the active generation of a user's tasks or projects"""
+        return {"user_id": user_id, "generation": await self.get_active_generation(user_id, kind)}
+
+    def is_active(self, doc: Dict[str, Any], active_generations: Dict[str, int]) -> bool:
+        """Check a document against the map returned by get_active_generations"""
+        return doc.get("generation") == active_generations.get(doc.get("user_id"))
+
+    async def begin_generation(self, user_id: str) -> int:
+        """Reserve a new generation number for a user; nothing reads it until it is activated"""
+        db = get_database()
+        pointer = await db[SNAPSHOT_COLLECTION].find_one_and_update(
+            {"_id": user_id},
+            {"$inc": {"next_generation": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return pointer["next_generation"]
+
+    async def activate_generation(self, user_id: str, kind: str, generation: int) -> bool:
+        """Atomically point readers at a fully written generation and schedule cleanup of older ones.
+
+        Returns False, discarding the generation, if a newer one was activated in the meantime.
+        """
+        db = get_database()
+        field = f"{kind}_generation"
+        previous = await db[SNAPSHOT_COLLECTION].find_one_and_update(
+            {"_id": user_id, field: {"$not": {"$gte": generation}}},
+            {"$set": {field: generation, f"{kind}_activated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            logger.warning(f"Discarding {kind} generation {generation} for user {user_id}: a newer one is active")
+            self.schedule_cleanup(user_id, kind, {"generation": generation})
+            return False
+
+        self.schedule_cleanup(user_id, kind, {"$or": [{"generation": {"$lt": generation}}, {"generation": None}]})
+        return True
+
+    def discard_generation(self, user_id: str, kind: str, generation: int) -> None:
+        """Drop a generation that was never activated, e.g. after a failed sync"""
+        self.schedule_cleanup(user_id, kind, {"generation": generation}, delay=0)
+
+    def schedule_cleanup(self, user_id: str, kind: str, generation_filter: Dict[str, Any], delay: Optional[float] = None) -> None:
+        """Delete superseded generations in the background after the grace period"""
+        if delay is None:
+            delay = settings.JIRA_SNAPSHOT_GC_DELAY_SECONDS
+        task = asyncio.create_task(self.collect_garbage(user_id, kind, generation_filter, delay))
+        self.gc_tasks.add(task)
+        task.add_done_callback(self.gc_tasks.discard)
+
+    async def collect_garbage(self, user_id: str, kind: str, generation_filter: Dict[str, Any], delay: float = 0) -> int:
+        """Delete the documents of superseded generations"""
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            db = get_database()
+            result = await db[SNAPSHOT_COLLECTIONS[kind]].delete_many({"user_id": user_id, **generation_filter})
+            if result.deleted_count:
+                logger.info(f"Removed {result.deleted_count} superseded {kind} documents for user {user_id}")
+            return result.deleted_count
+
+        except Exception as e:
+            # Anything left behind is older than the active generation and goes with the next flip
+            logger.error(f"Failed to remove superseded {kind} for user {user_id}: {e}")
+            return 0
+
+
+# Create global snapshot service instance
+snapshot_service = SnapshotService()
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Set
+from config import settings
+from db import get_database
+from services.jira_service import jira_service
+
+logger = logging.getLogger(__name__)
+
+# Per-user scheduling documents: {_id: user_id, last_active_at, next_sync_at, sync_interval, ...}
+SYNC_SCHEDULE_COLLECTION = "sync_schedules"
+
+# Consecutive quiet delta syncs and failures stop stretching the interval after this many doublings
+MAX_QUIET_DOUBLINGS = 3
+MAX_FAILURE_DOUBLINGS = 5
+
+# Write a user's activity timestamp at most this often (seconds)
+ACTIVITY_WRITE_INTERVAL = 60
+
+
+class SyncPolicyService:
+    """Derives each user's next sync time from API activity, change rate and error history.
+
+    Users who used the app in the last few minutes are synced every SYNC_MIN_INTERVAL seconds,
+    users who have been away back off towards SYNC_MAX_INTERVAL, quiet projects and failing
+    syncs stretch the interval further and busy projects shorten it.
+    """
+
+    def __init__(self):
+        # user id -> monotonic time the last activity write was made from this process
+        self.activity_written: Dict[str, float] = {}
+        # Pending activity writes, kept referenced until they finish
+        self.activity_tasks: Set[asyncio.Task] = set()
+
+    def record_activity(self, user_id: str) -> None:
+        """Note that a user is using the API and pull their next sync forward, without making the request wait"""
+        now_monotonic = time.monotonic()
+        if now_monotonic - self.activity_written.get(user_id, float("-inf")) < ACTIVITY_WRITE_INTERVAL:
+            return
+        self.activity_written[user_id] = now_monotonic
+
+        task = asyncio.create_task(self.write_activity(user_id))
+        self.activity_tasks.add(task)
+        task.add_done_callback(self.activity_tasks.discard)
+
+    async def write_activity(self, user_id: str) -> None:
+        """Store a user's activity timestamp; failures are only logged"""
+        try:
+            db = get_database()
+            now = datetime.utcnow()
+            await db[SYNC_SCHEDULE_COLLECTION].update_one(
+                {"_id": user_id},
+                {
+                    "$set": {"last_active_at": now},
+                    "$min": {"next_sync_at": now + timedelta(seconds=settings.SYNC_MIN_INTERVAL)}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to record activity for user {user_id}: {e}")
+
+    def activity_interval(self, last_active_at: Optional[datetime], now: datetime) -> float:
+        """Base interval from how recently the user used the API"""
+        if last_active_at is None:
+            return settings.SYNC_MAX_INTERVAL
+        idle = now - last_active_at
+        if idle <= timedelta(minutes=settings.SYNC_ACTIVE_WINDOW_MINUTES):
+            return settings.SYNC_MIN_INTERVAL
+        if idle <= timedelta(days=1):
+            return settings.SCHEDULER_SYNC_INTERVAL
+        if idle <= timedelta(days=settings.SYNC_IDLE_AFTER_DAYS):
+            return settings.SCHEDULER_SYNC_INTERVAL * 12
+        return settings.SYNC_MAX_INTERVAL
+
+    def change_fraction(self, state: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Fraction of the user's tasks the last delta sync wrote, None after a full sync"""
+        if not state or not state.get("task_total") or state.get("watermark") == state.get("last_full_sync_at"):
+            return None
+        return state.get("last_delta_count", 0) / state["task_total"]
+
+    def compute_interval(self, schedule: Dict[str, Any], state: Optional[Dict[str, Any]], now: datetime) -> float:
+        """Seconds until the user's next sync"""
+        interval = self.activity_interval(schedule.get("last_active_at"), now)
+
+        fraction = self.change_fraction(state)
+        if fraction is not None and fraction >= settings.SYNC_BUSY_CHANGE_FRACTION:
+            interval /= 2
+        else:
+            interval *= 2 ** min(schedule.get("quiet_syncs", 0), MAX_QUIET_DOUBLINGS)
+
+        interval *= 2 ** min(schedule.get("consecutive_failures", 0), MAX_FAILURE_DOUBLINGS)
+
+        # Webhooks keep tasks fresh, so polling only needs to be a slow reconciliation pass
+        if settings.JIRA_WEBHOOK_SECRET:
+            interval = max(interval, settings.SCHEDULER_WEBHOOK_SYNC_INTERVAL)
+
+        return min(max(interval, settings.SYNC_MIN_INTERVAL), settings.SYNC_MAX_INTERVAL)
+
+    async def record_sync_result(self, user_id: str, success: bool) -> Optional[datetime]:
+        """Update a user's change and error history after a sync and schedule the next one"""
+        try:
+            db = get_database()
+            schedules_collection = db[SYNC_SCHEDULE_COLLECTION]
+            now = datetime.utcnow()
+            schedule = await schedules_collection.find_one({"_id": user_id}) or {}
+            state = await jira_service.get_sync_state(user_id)
+
+            if success:
+                schedule["consecutive_failures"] = 0
+                fraction = self.change_fraction(state)
+                schedule["quiet_syncs"] = schedule.get("quiet_syncs", 0) + 1 if fraction == 0 else 0
+            else:
+                schedule["consecutive_failures"] = schedule.get("consecutive_failures", 0) + 1
+
+            interval = self.compute_interval(schedule, state, now)
+            next_sync_at = now + timedelta(seconds=interval)
+            await schedules_collection.update_one(
+                {"_id": user_id},
+                {"$set": {
+                    "consecutive_failures": schedule["consecutive_failures"],
+                    "quiet_syncs": schedule.get("quiet_syncs", 0),
+                    "sync_interval": interval,
+                    "last_sync_at": now,
+                    "next_sync_at": next_sync_at
+                }},
+                upsert=True
+            )
+            return next_sync_at
+
+        except Exception as e:
+            logger.error(f"Failed to schedule next sync for user {user_id}: {e}")
+            return None
+
+    async def defer_next_sync(self, user_id: str, seconds: float) -> None:
+        """Push a user's next sync back, e.g. while a queued job for them is pending"""
+        db = get_database()
+        await db[SYNC_SCHEDULE_COLLECTION].update_one(
+            {"_id": user_id},
+            {"$set": {"next_sync_at": datetime.utcnow() + timedelta(seconds=seconds)}},
+            upsert=True
+        )
+
+    async def get_not_due_user_ids(self, now: datetime) -> Set[str]:
+        """Users whose next sync is still in the future; everyone else is due"""
+        db = get_database()
+        return set(await db[SYNC_SCHEDULE_COLLECTION].distinct("_id", {"next_sync_at": {"$gt": now}}))
+
+
+# Create global sync policy service instance
+sync_policy_service = SyncPolicyService()
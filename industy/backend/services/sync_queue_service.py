@@ -0,0 +1,149 @@
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from config import settings
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+# Collection holding queued, running, finished and dead-lettered sync jobs
+SYNC_JOBS_COLLECTION = "sync_jobs"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_DEAD = "dead"
+
+
+class SyncQueueService:
+    """Mongo-backed queue of per-user Jira sync jobs, consumed by sync_worker.py under leases"""
+
+    async def enqueue(self, user_id: str, domain: str = "", delay_seconds: float = 0) -> bool:
+        """Queue a sync for a user; a user has at most one queued job, so repeated calls coalesce"""
+        try:
+            db = get_database()
+            now = datetime.utcnow()
+            await db[SYNC_JOBS_COLLECTION].update_one(
+                {"user_id": user_id, "status": JOB_QUEUED},
+                {
+                    "$setOnInsert": {
+                        "user_id": user_id,
+                        "domain": domain,
+                        "status": JOB_QUEUED,
+                        "attempts": 0,
+                        "run_at": now + timedelta(seconds=delay_seconds),
+                        "created_at": now
+                    },
+                    "$set": {"updated_at": now}
+                },
+                upsert=True
+            )
+            return True
+
+        except DuplicateKeyError:
+            # Another process queued the same user at the same moment
+            return True
+        except Exception as e:
+            logger.error(f"Failed to enqueue sync for user {user_id}: {e}")
+            return False
+
+    async def acquire(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Atomically lease the next due job, or a running job whose lease expired"""
+        db = get_database()
+        now = datetime.utcnow()
+        return await db[SYNC_JOBS_COLLECTION].find_one_and_update(
+            {"$or": [
+                {"status": JOB_QUEUED, "run_at": {"$lte": now}},
+                {"status": JOB_RUNNING, "lease_expires_at": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": JOB_RUNNING,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=settings.SYNC_JOB_LEASE_SECONDS),
+                    "heartbeat_at": now,
+                    "started_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, job_id: ObjectId, worker_id: str) -> bool:
+        """Extend a job's lease; False means the lease was lost to another worker"""
+        db = get_database()
+        now = datetime.utcnow()
+        result = await db[SYNC_JOBS_COLLECTION].update_one(
+            {"_id": job_id, "status": JOB_RUNNING, "lease_owner": worker_id},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=settings.SYNC_JOB_LEASE_SECONDS),
+                "heartbeat_at": now
+            }}
+        )
+        return result.matched_count > 0
+
+    async def complete(self, job: Dict[str, Any], worker_id: str) -> None:
+        """Mark a leased job as done"""
+        db = get_database()
+        now = datetime.utcnow()
+        await db[SYNC_JOBS_COLLECTION].update_one(
+            {"_id": job["_id"], "lease_owner": worker_id},
+            {"$set": {"status": JOB_DONE, "finished_at": now, "updated_at": now}, "$unset": {"lease_expires_at": ""}}
+        )
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given attempt number"""
+        backoff = min(settings.SYNC_JOB_RETRY_BACKOFF_MAX, settings.SYNC_JOB_RETRY_BACKOFF_BASE * (2 ** (attempts - 1)))
+        return random.uniform(backoff / 2, backoff)
+
+    async def fail(self, job: Dict[str, Any], worker_id: str, error: str) -> None:
+        """Requeue a failed job with backoff, or dead-letter it once it is out of attempts"""
+        db = get_database()
+        jobs_collection = db[SYNC_JOBS_COLLECTION]
+        now = datetime.utcnow()
+        attempts = job.get("attempts", 1)
+
+        if attempts >= settings.SYNC_JOB_MAX_ATTEMPTS:
+            await jobs_collection.update_one(
+                {"_id": job["_id"], "lease_owner": worker_id},
+                {"$set": {"status": JOB_DEAD, "last_error": error, "dead_at": now, "updated_at": now}, "$unset": {"lease_expires_at": ""}}
+            )
+            logger.error(f"Sync job for user {job['user_id']} dead-lettered after {attempts} attempts: {error}")
+            return
+
+        delay = self.retry_delay(attempts)
+        try:
+            await jobs_collection.update_one(
+                {"_id": job["_id"], "lease_owner": worker_id},
+                {"$set": {
+                    "status": JOB_QUEUED,
+                    "run_at": now + timedelta(seconds=delay),
+                    "last_error": error,
+                    "updated_at": now
+                }, "$unset": {"lease_expires_at": "", "lease_owner": ""}}
+            )
+            logger.warning(f"Sync job for user {job['user_id']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+        except DuplicateKeyError:
+            # A newer job is already queued for this user and will do the retry
+            await jobs_collection.update_one(
+                {"_id": job["_id"], "lease_owner": worker_id},
+                {"$set": {"status": JOB_DONE, "last_error": error, "finished_at": now, "updated_at": now}, "$unset": {"lease_expires_at": ""}}
+            )
+
+    async def get_queue_stats(self) -> Dict[str, int]:
+        """Count jobs per status"""
+        db = get_database()
+        stats = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_DEAD: 0}
+        async for doc in db[SYNC_JOBS_COLLECTION].aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            stats[doc["_id"]] = doc["count"]
+        return stats
+
+
+# Create global sync queue service instance
+sync_queue_service = SyncQueueService()
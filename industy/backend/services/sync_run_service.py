@@ -0,0 +1,82 @@
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+from config import settings
+from db import get_database
+
+logger = logging.getLogger(__name__)
+
+# One document per sync run, expired after SYNC_RUN_RETENTION_DAYS
+SYNC_RUNS_COLLECTION = "sync_runs"
+
+# Per-run counters summarised alongside the phase timings
+SUMMARY_COUNTERS = ["pages", "issues", "requests", "retries", "bytes"]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers: the smallest value with at least `fraction` of them at or below it"""
+    ordered = sorted(values)
+    # Rounded first so float noise (0.07 * 100 = 7.000000000000001) doesn't push the rank up
+    rank = math.ceil(round(fraction * len(ordered), 9))
+    return ordered[max(0, min(len(ordered) - 1, rank - 1))]
+
+
+def distribution(values: List[float]) -> Dict[str, Any]:
+    """Count, p50 and p95 of a list of numbers"""
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 0.5), 3),
+        "p95": round(percentile(values, 0.95), 3)
+    }
+
+
+class SyncRunService:
+    async def record_run(self, run: Dict[str, Any]) -> None:
+        """Persist the record of one sync run; failures are logged and never fail the sync"""
+        try:
+            db = get_database()
+            await db[SYNC_RUNS_COLLECTION].insert_one(run)
+        except Exception as e:
+            logger.error(f"Failed to record sync run for user {run.get('user_id')}: {e}")
+
+    async def get_recent_runs(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Latest sync runs of one user, newest first"""
+        db = get_database()
+        runs = []
+        async for run in db[SYNC_RUNS_COLLECTION].find({"user_id": user_id}, {"_id": 0}).sort("finished_at", -1).limit(limit):
+            runs.append(run)
+        return runs
+
+    async def get_summary(self, hours: int = 24, mode: Optional[str] = None) -> Dict[str, Any]:
+        """p50/p95 of each phase and counter across every user's runs in the last `hours`"""
+        db = get_database()
+        query: Dict[str, Any] = {"finished_at": {"$gte": datetime.utcnow() - timedelta(hours=hours)}}
+        if mode:
+            query["mode"] = mode
+
+        outcomes: Dict[str, int] = {}
+        phases: Dict[str, List[float]] = {"total": []}
+        counters: Dict[str, List[float]] = {name: [] for name in SUMMARY_COUNTERS}
+        projection = {"outcome": 1, "duration_seconds": 1, "phases": 1, **{name: 1 for name in SUMMARY_COUNTERS}}
+        cursor = db[SYNC_RUNS_COLLECTION].find(query, projection).sort("finished_at", -1).limit(settings.SYNC_RUN_SUMMARY_MAX_RUNS)
+        async for run in cursor:
+            outcomes[run.get("outcome", "unknown")] = outcomes.get(run.get("outcome", "unknown"), 0) + 1
+            phases["total"].append(run.get("duration_seconds", 0.0))
+            for phase, seconds in (run.get("phases") or {}).items():
+                phases.setdefault(phase, []).append(seconds)
+            for name in SUMMARY_COUNTERS:
+                counters[name].append(run.get(name, 0))
+
+        return {
+            "window_hours": hours,
+            "mode": mode,
+            "runs": sum(outcomes.values()),
+            "outcomes": outcomes,
+            "phases": {phase: distribution(values) for phase, values in phases.items() if values},
+            "counters": {name: distribution(values) for name, values in counters.items() if values}
+        }
+
+
+# Create global sync run service instance
+sync_run_service = SyncRunService()
@@ -1,27 +1,48 @@
 import logging
-from typing import List, Optional
+import re
+from typing import List, Optional, Tuple
 from datetime import datetime
+from pymongo import ASCENDING, DESCENDING
 from db import get_database
+from services.snapshot_service import snapshot_service
 from models.jira import JiraTask
 from models.tasks import TaskFilter
+from utils.pagination import find_page, find_ranked_page, total_count_cache
+from utils.serialization import projection_for, construct_from_doc
 
 logger = logging.getLogger(__name__)
 
+# Searches shaped like an issue key ("PROJ-12", "proj-") match keys by prefix, anything else is text
+ISSUE_KEY_SEARCH = re.compile(r"^[A-Za-z][A-Za-z0-9_]*-\d*$")
+
 class TasksService:
-    async def get_tasks(self, user_id: str, filter_params: TaskFilter, page: int = 1, size: int = 50) -> dict:
-        """Get tasks for a user with filtering and pagination"""
+    def build_search(self, search: str) -> Tuple[Optional[str], dict]:
+        """Search mode ("key", "text" or None) and query fragment for a user's search string"""
+        term = search.strip()
+        if ISSUE_KEY_SEARCH.match(term):
+            # Anchored and case-sensitive, so it is a range scan on the key index
+            return "key", {"key": {"$regex": "^" + re.escape(term.upper())}}
+        
+        # Quotes and leading dashes are phrase / negation operators in $search; keep plain words only
+        words = [word.lstrip("-") for word in re.sub(r'["\\]', " ", term).split()]
+        words = [word for word in words if word]
+        if not words:
+            return None, {}
+        return "text", {"$text": {"$search": " ".join(words)}}
+
+    async def get_tasks(self, user_id: str, filter_params: TaskFilter, page: int = 1, size: int = 50, cursor: Optional[str] = None, exact_total: bool = False) -> dict:
+        """Get tasks for a user with filtering and keyset pagination on (updated, _id)"""
         try:
             db = get_database()
             tasks_collection = db.jira_tasks
             
-            # Build query based on filters
-            query = {"user_id": user_id}
+            # Build query based on filters, reading only the active snapshot generation
+            query = await snapshot_service.active_query(user_id)
             
+            search_mode = None
             if filter_params.search:
-                query["$or"] = [
-                    {"summary": {"$regex": filter_params.search, "$options": "i"}},
-                    {"key": {"$regex": filter_params.search, "$options": "i"}}
-                ]
+                search_mode, search_query = self.build_search(filter_params.search)
+                query.update(search_query)
             
             if filter_params.status:
                 query["status"] = filter_params.status
@@ -35,40 +56,29 @@ class TasksService:
             if filter_params.assignee:
                 query["assignee"] = filter_params.assignee
             
-            # Calculate pagination
-            skip = (page - 1) * size
-            
-            # Get total count
-            total = await tasks_collection.count_documents(query)
+            # Get total count, from the recent-count cache unless an exact one is asked for
+            total, total_is_exact = await total_count_cache.count(tasks_collection, query, exact_total)
             
-            # Get tasks with pagination
-            cursor = tasks_collection.find(query).skip(skip).limit(size).sort("updated", -1)
-            tasks = []
-            async for doc in cursor:
-                task = JiraTask(
-                    id=str(doc["_id"]),
-                    user_id=doc["user_id"],
-                    jira_id=doc["jira_id"],
-                    key=doc["key"],
-                    summary=doc["summary"],
-                    status=doc["status"],
-                    priority=doc["priority"],
-                    assignee=doc["assignee"],
-                    assignee_email=doc.get("assignee_email"),
-                    created=doc["created"],
-                    updated=doc["updated"],
-                    duedate=doc["duedate"],
-                    project_key=doc["project_key"],
-                    project_name=doc["project_name"],
-                    issue_type=doc["issue_type"]
-                )
-                tasks.append(task)
+            # Get the page after the cursor, fetching only the fields a JiraTask needs
+            projection = projection_for(JiraTask)
+            if search_mode == "text":
+                # Best matches first, ties by recency
+                sort = [("score", {"$meta": "textScore"}), ("updated", DESCENDING), ("_id", DESCENDING)]
+                docs, next_cursor = await find_ranked_page(tasks_collection, query, sort, size, cursor, page, {**projection, "score": {"$meta": "textScore"}})
+            elif search_mode == "key":
+                # Ascending key order puts an exact match ahead of the keys it prefixes
+                docs, next_cursor = await find_page(tasks_collection, query, "key", size, cursor, page, projection, direction=ASCENDING)
+            else:
+                docs, next_cursor = await find_page(tasks_collection, query, "updated", size, cursor, page, projection)
+            tasks = [construct_from_doc(JiraTask, doc) for doc in docs]
             
             return {
                 "tasks": tasks,
                 "total": total,
+                "total_is_estimate": not total_is_exact,
                 "page": page,
-                "size": size
+                "size": size,
+                "next_cursor": next_cursor
             }
             
         except Exception as e:
@@ -86,8 +96,8 @@ class TasksService:
             db = get_database()
             tasks_collection = db.jira_tasks
             
-            # Find task that belongs to the user
-            doc = await tasks_collection.find_one({"_id": task_id, "user_id": user_id})
+            # Find task that belongs to the user's active generation
+            doc = await tasks_collection.find_one({"_id": task_id, **await snapshot_service.active_query(user_id)})
             if doc:
                 return JiraTask(
                     id=str(doc["_id"]),
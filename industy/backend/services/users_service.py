@@ -4,12 +4,13 @@ from datetime import datetime
 from db import get_database
 from models.auth import UserInDB, UserResponse
 from models.users import UserFilter
+from utils.pagination import find_page, total_count_cache
 
 logger = logging.getLogger(__name__)
 
 class UsersService:
-    async def get_users(self, filter_params: UserFilter, page: int = 1, size: int = 50) -> dict:
-        """Get users with filtering and pagination"""
+    async def get_users(self, filter_params: UserFilter, page: int = 1, size: int = 50, cursor: Optional[str] = None, exact_total: bool = False) -> dict:
+        """Get users with filtering and keyset pagination on (created_at, _id)"""
         try:
             db = get_database()
             users_collection = db.users
@@ -32,16 +33,13 @@ class UsersService:
                 is_verified = filter_params.status.lower() == "active"
                 query["is_verified"] = is_verified
             
-            # Calculate pagination
-            skip = (page - 1) * size
+            # Get total count, from the recent-count cache unless an exact one is asked for
+            total, total_is_exact = await total_count_cache.count(users_collection, query, exact_total)
             
-            # Get total count
-            total = await users_collection.count_documents(query)
-            
-            # Get users with pagination
-            cursor = users_collection.find(query).skip(skip).limit(size).sort("created_at", -1)
+            # Get the page after the cursor
+            docs, next_cursor = await find_page(users_collection, query, "created_at", size, cursor, page)
             users = []
-            async for doc in cursor:
+            for doc in docs:
                 user = UserResponse(
                     id=str(doc["_id"]),
                     email=doc["email"],
@@ -57,8 +55,10 @@ class UsersService:
             return {
                 "users": users,
                 "total": total,
+                "total_is_estimate": not total_is_exact,
                 "page": page,
-                "size": size
+                "size": size,
+                "next_cursor": next_cursor
             }
             
         except Exception as e:
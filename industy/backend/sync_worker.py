@@ -0,0 +1,144 @@
+"""
+Standalone Jira sync worker.
+
+Consumes the sync_jobs queue that API processes fill when SYNC_QUEUE_ENABLED=true. Each job is
+leased atomically and kept alive with heartbeats, so any number of workers can run side by side
+and a job whose worker died is picked up again once its lease expires. Failed jobs are retried
+with backoff and dead-lettered after SYNC_JOB_MAX_ATTEMPTS.
+
+Run one or more of:
+    python sync_worker.py
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from typing import Dict, Set
+from config import settings
+from db import connect_to_mongo, close_mongo_connection
+from db.init_db import init_database
+from services.jira_http import jira_client_registry
+from services.jira_service import jira_service
+from services.scheduler_service import scheduler_service
+from services.sync_queue_service import sync_queue_service
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("sync_worker")
+
+
+class SyncWorker:
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.is_running = False
+        self.active_jobs: Set[asyncio.Task] = set()
+        # Same limits the in-process scheduler uses, per worker process
+        self.global_limit = asyncio.Semaphore(scheduler_service.max_concurrent_syncs)
+        self.domain_limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def keep_lease(self, job, sync_task: asyncio.Task) -> None:
+        """Heartbeat a job's lease until cancelled; once another worker holds it, cancel this worker's sync"""
+        while True:
+            await asyncio.sleep(settings.SYNC_JOB_LEASE_SECONDS / 3)
+            try:
+                lease_held = await sync_queue_service.heartbeat(job["_id"], self.worker_id)
+            except Exception as e:
+                # Try again on the next beat; the lease outlives a couple of missed ones
+                logger.error(f"Failed to heartbeat sync job for user {job['user_id']}: {e}")
+                continue
+            if not lease_held:
+                logger.warning(f"Lost lease on sync job for user {job['user_id']}, cancelling its sync")
+                jira_service.cancel_sync(job["user_id"])
+                sync_task.cancel()
+                return
+
+    async def run_job(self, job) -> None:
+        """Run one leased job and record its outcome"""
+        sync_task = asyncio.create_task(scheduler_service.sync_user_data(
+            job["user_id"],
+            job.get("domain", ""),
+            self.global_limit,
+            self.domain_limits
+        ))
+        heartbeat = asyncio.create_task(self.keep_lease(job, sync_task))
+        try:
+            success = await sync_task
+        except asyncio.CancelledError:
+            if not heartbeat.done():
+                # This worker is shutting down, not a lost lease
+                raise
+            # The worker that took over the lease runs the job and records its outcome
+            return
+        finally:
+            heartbeat.cancel()
+
+        try:
+            if success:
+                await sync_queue_service.complete(job, self.worker_id)
+            else:
+                await sync_queue_service.fail(job, self.worker_id, "sync_jira_data failed")
+        except Exception as e:
+            logger.error(f"Failed to record outcome of sync job for user {job['user_id']}: {e}")
+
+    async def run(self) -> None:
+        """Lease and run jobs until stopped, keeping at most max_concurrent_syncs in flight"""
+        self.is_running = True
+        logger.info(f"Sync worker {self.worker_id} started")
+
+        while self.is_running:
+            try:
+                if len(self.active_jobs) >= scheduler_service.max_concurrent_syncs:
+                    await asyncio.wait(self.active_jobs, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                job = await sync_queue_service.acquire(self.worker_id)
+                if job is None:
+                    await asyncio.sleep(settings.SYNC_WORKER_POLL_INTERVAL)
+                    continue
+
+                logger.info(f"Leased sync job for user {job['user_id']} (attempt {job.get('attempts', 1)})")
+                task = asyncio.create_task(self.run_job(job))
+                self.active_jobs.add(task)
+                task.add_done_callback(self.active_jobs.discard)
+
+            except Exception as e:
+                logger.error(f"Sync worker error: {e}")
+                await asyncio.sleep(settings.SYNC_WORKER_POLL_INTERVAL)
+
+        # Let in-flight jobs finish; unfinished leases expire and are retried elsewhere
+        if self.active_jobs:
+            await asyncio.wait(self.active_jobs, timeout=scheduler_service.user_sync_timeout)
+        logger.info(f"Sync worker {self.worker_id} stopped")
+
+    def stop(self) -> None:
+        """Stop leasing new jobs"""
+        self.is_running = False
+
+
+async def main():
+    await connect_to_mongo()
+    await init_database()
+    await jira_client_registry.start()
+
+    worker = SyncWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Signal handlers are not available on Windows event loops
+            pass
+
+    try:
+        await worker.run()
+    finally:
+        await jira_client_registry.close()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,30 @@
 """
-Test script to verify date parsing for MongoDB compatibility
+Test script to verify date parsing for MongoDB compatibility: the fromisoformat fast path and
+the strptime fallback must agree and always return naive UTC datetimes
 """
 import asyncio
-from datetime import datetime
-from services.jira_service import parse_jira_date, parse_jira_datetime
+import sys
+from datetime import datetime, timezone
+from services.jira_service import parse_jira_date, parse_jira_datetime, JIRA_DATETIME_FORMATS
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+def strptime_naive_utc(date_str):
+    """What the strptime fallback makes of a datetime string, as naive UTC"""
+    for date_format in JIRA_DATETIME_FORMATS:
+        try:
+            parsed = datetime.strptime(date_str, date_format)
+        except ValueError:
+            continue
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    return None
 
 def test_date_parsing():
     print("🔍 Testing date parsing functions...")
@@ -42,6 +63,33 @@ def test_date_parsing():
         except Exception as e:
             print(f"  Input: {dt_str} -> Error: {e}")
     
+    print("\n⚡ Checking the fast path against the fallback formats:")
+    expected = {
+        "2025-01-15T10:30:00.000+0000": datetime(2025, 1, 15, 10, 30),
+        "2025-01-15T10:30:00+0000": datetime(2025, 1, 15, 10, 30),
+        "2025-01-15T10:30:00.000Z": datetime(2025, 1, 15, 10, 30),
+        "2025-01-15T10:30:00Z": datetime(2025, 1, 15, 10, 30),
+        "2025-01-15T10:30:00": datetime(2025, 1, 15, 10, 30),
+        "2025-01-15T10:30:00.000+0200": datetime(2025, 1, 15, 8, 30),
+        "2025-01-15T22:30:00.123-0500": datetime(2025, 1, 16, 3, 30, 0, 123000),
+        "2025-01-15T10:30:00.000+05:30": datetime(2025, 1, 15, 5, 0)
+    }
+    for dt_str, value in expected.items():
+        result = parse_jira_datetime(dt_str)
+        check(f"{dt_str} -> {value}", result == value and result.tzinfo is None)
+        fallback = strptime_naive_utc(dt_str)
+        if fallback is not None:
+            check(f"{dt_str} matches the fallback format", result == fallback)
+
+    check("None stays None", parse_jira_datetime(None) is None and parse_jira_date(None) is None)
+    check("empty string stays None", parse_jira_datetime("") is None and parse_jira_date("") is None)
+    unparsed = parse_jira_datetime("invalid-datetime")
+    check("unparseable datetime falls back to naive now", unparsed.tzinfo is None and abs((datetime.utcnow() - unparsed).total_seconds()) < 5)
+    check("dates become naive midnight datetimes", parse_jira_date("2025-01-15") == datetime(2025, 1, 15))
+
+    if failures:
+        print(f"\n❌ {len(failures)} date parsing check(s) failed")
+        sys.exit(1)
     print("\n✅ Date parsing test completed!")
 
 if __name__ == "__main__":
@@ -0,0 +1,111 @@
+"""
+Test script for delta sync and its watermark.
+
+Runs syncs against jira_stub_server.py: a full sync stores the watermark and JQL filter, the
+next sync fetches only issues updated since the watermark (plus the overlap), a failed delta
+sync leaves the watermark where it was, and an expired full sync interval forces a full sync
+again. Needs the MongoDB configured in .env; everything the test user writes is removed afterwards.
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from config import settings
+from db import connect_to_mongo, get_database, close_mongo_connection
+from models.jira import JiraCredentialsCreate
+from services.jira_service import jira_service
+from services.jira_http import jira_client_registry
+from jira_stub_server import JiraStub, start_jira_stub_server
+
+TEST_USER_ID = "test_delta_sync_user"
+ISSUE_COUNT = 300
+STALE_SUMMARY = "stale local copy"
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+async def remove_test_user(db):
+    """Remove everything the test user's syncs wrote"""
+    for collection in ("jira_tasks", "jira_projects", "jira_sync_state", "jira_query_plans", "jira_status_transitions", "jira_credentials", "sync_runs"):
+        await db[collection].delete_many({"user_id": TEST_USER_ID})
+    for collection in ("jira_snapshots", "sync_locks", "sync_schedules"):
+        await db[collection].delete_many({"_id": TEST_USER_ID})
+
+async def latest_run(db):
+    return await db.sync_runs.find_one({"user_id": TEST_USER_ID}, sort=[("started_at", -1)])
+
+async def test_delta_sync():
+    print("🔍 Testing delta sync and the watermark...")
+    port = int(os.getenv("TEST_JIRA_STUB_PORT", "8084"))
+    max_retries = settings.JIRA_MAX_RETRIES
+    await connect_to_mongo()
+    db = get_database()
+    app, server, thread = start_jira_stub_server(JiraStub(issues=ISSUE_COUNT), port)
+
+    try:
+        await remove_test_user(db)
+        await jira_service.store_jira_credentials(
+            TEST_USER_ID,
+            JiraCredentialsCreate(domain=f"http://127.0.0.1:{port}", email="test@example.com", api_token="stub-token")
+        )
+
+        print("\n📥 First sync is a full sync:")
+        check("full sync succeeds", await jira_service.sync_jira_data(TEST_USER_ID))
+        check("run recorded as full", (await latest_run(db))["mode"] == "full")
+        check("every issue stored", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID}) == ISSUE_COUNT)
+        state = await jira_service.get_sync_state(TEST_USER_ID)
+        check("watermark and JQL filter saved", state["watermark"] and state["jql_filter"] is not None and state["task_total"] == ISSUE_COUNT)
+
+        print("\n🔺 Next sync is a delta sync:")
+        # Only the delta can restore these, and only for the issues it fetches
+        await db.jira_tasks.update_many({"user_id": TEST_USER_ID}, {"$set": {"summary": STALE_SUMMARY}})
+        app.state.stub = JiraStub(issues=ISSUE_COUNT)
+        check("delta sync succeeds", await jira_service.sync_jira_data(TEST_USER_ID))
+        run = await latest_run(db)
+        check("run recorded as delta", run["mode"] == "delta")
+        check("JQL limited to recently updated issues", 'updated >= "-' in run["jql"])
+        delta_state = await jira_service.get_sync_state(TEST_USER_ID)
+        changed = delta_state["last_delta_count"]
+        # Issue i was updated i minutes ago, so the window holds about the overlap's worth of issues
+        check("only the issues in the window fetched", 0 < changed <= settings.JIRA_DELTA_SYNC_OVERLAP_MINUTES + 2)
+        check("one search page requested", app.state.stub.request_count <= 3)
+        check("watermark advanced", delta_state["watermark"] > state["watermark"])
+        check("fetched issues rewritten", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID, "summary": {"$ne": STALE_SUMMARY}}) == changed)
+        check("older issues left alone", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID, "summary": STALE_SUMMARY}) == ISSUE_COUNT - changed)
+
+        print("\n💥 Failed delta sync:")
+        settings.JIRA_MAX_RETRIES = 0
+        app.state.stub = JiraStub(issues=ISSUE_COUNT, rate_429=1, retry_after=0)
+        check("sync reports failure", not await jira_service.sync_jira_data(TEST_USER_ID))
+        check("watermark not advanced", (await jira_service.get_sync_state(TEST_USER_ID))["watermark"] == delta_state["watermark"])
+        settings.JIRA_MAX_RETRIES = max_retries
+
+        print("\n📥 Expired full sync interval:")
+        app.state.stub = JiraStub(issues=ISSUE_COUNT)
+        expired = datetime.utcnow() - timedelta(hours=settings.JIRA_FULL_SYNC_INTERVAL_HOURS, minutes=1)
+        await jira_service.save_sync_state(TEST_USER_ID, {"last_full_sync_at": expired})
+        check("sync succeeds", await jira_service.sync_jira_data(TEST_USER_ID))
+        check("run recorded as full", (await latest_run(db))["mode"] == "full")
+        check("last full sync advanced", (await jira_service.get_sync_state(TEST_USER_ID))["last_full_sync_at"] > expired)
+        active = {"user_id": TEST_USER_ID, "generation": (await db.jira_snapshots.find_one({"_id": TEST_USER_ID}))["tasks_generation"]}
+        check("every issue rewritten", await db.jira_tasks.count_documents({**active, "summary": {"$ne": STALE_SUMMARY}}) == ISSUE_COUNT)
+
+    finally:
+        settings.JIRA_MAX_RETRIES = max_retries
+        await remove_test_user(db)
+        await jira_client_registry.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        await close_mongo_connection()
+
+    if failures:
+        print(f"\n❌ {len(failures)} delta sync check(s) failed")
+        sys.exit(1)
+    print("\n✅ Delta sync test completed!")
+
+if __name__ == "__main__":
+    asyncio.run(test_delta_sync())
@@ -2,7 +2,7 @@
 Test script to simulate the full JIRA sync process with a mock response
 """
 import asyncio
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 from datetime import datetime
 from db.mongodb import connect_to_mongo, get_database
 from services.jira_service import jira_service, JiraCredentialsInDB
@@ -79,52 +79,14 @@ async def test_full_sync():
         }
     ]
     
-    # Mock the JIRA service methods
+    # Mock the JIRA service methods; the sync reads raw issues page by page
+    async def mock_issue_pages(*args, **kwargs):
+        yield "", mock_issues_response
+    
     with patch.object(jira_service, 'get_jira_credentials', return_value=mock_credentials), \
          patch.object(jira_service, 'validate_jira_connection', return_value=True), \
          patch.object(jira_service, 'fetch_jira_projects', return_value=[]), \
-         patch.object(jira_service, 'fetch_jira_tasks', return_value=AsyncMock()) as mock_fetch_tasks:
-        
-        # Mock the fetch_jira_tasks method to return our test tasks
-        from services.jira_service import JiraTask
-        mock_tasks = [
-            JiraTask(
-                id="",
-                user_id=test_user_id,
-                jira_id="10001",
-                key="PROJ-1",
-                summary="Test task from JIRA",
-                status="To Do",
-                priority="High",
-                assignee="Test User",
-                assignee_email="test@example.com",
-                created=datetime(2025, 1, 1, 10, 0, 0),
-                updated=datetime(2025, 1, 5, 15, 30, 0),
-                duedate=datetime(2025, 1, 15),  # This is now a datetime object
-                project_key="PROJ",
-                project_name="Test Project",
-                issue_type="Task"
-            ),
-            JiraTask(
-                id="",
-                user_id=test_user_id,
-                jira_id="10002",
-                key="PROJ-2",
-                summary="Another test task",
-                status="In Progress",
-                priority="Medium",
-                assignee="Another User",
-                assignee_email="another@example.com",
-                created=datetime(2025, 1, 2, 9, 0, 0),
-                updated=datetime(2025, 1, 6, 14, 20, 0),
-                duedate=datetime(2025, 1, 20),  # This is now a datetime object
-                project_key="PROJ",
-                project_name="Test Project",
-                issue_type="Story"
-            )
-        ]
-        
-        mock_fetch_tasks.return_value = mock_tasks
+         patch.object(jira_service, 'iter_jira_issue_pages', mock_issue_pages):
         
         print(f"\n🔄 Running sync for user: {test_user_id}")
         sync_result = await jira_service.sync_jira_data(test_user_id)
@@ -0,0 +1,126 @@
+"""
+Test script for the Jira rate limiter and request retries: token refill and burst, Retry-After
+given as seconds or as an HTTP date, the retry limit for 429/503 responses, and retries of
+transport errors. Requests go to an httpx.MockTransport, so no Jira site or MongoDB is needed.
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import httpx
+from config import settings
+from services.jira_http import JiraClientRegistry, JiraRateLimiter, parse_retry_after, sync_request_counters
+
+DOMAIN = "https://limiter-test.atlassian.net"
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+def registry_with(handler):
+    """A client registry whose site client answers every request with handler"""
+    registry = JiraClientRegistry()
+    registry.clients[registry.normalize_domain(DOMAIN)] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return registry
+
+async def send(registry):
+    """Send one search request, returning the response and the run's request counters"""
+    counters = {}
+    token = sync_request_counters.set(counters)
+    try:
+        response = await registry.request(DOMAIN, "POST", f"{DOMAIN}/rest/api/3/search/jql", json={"jql": "order by updated"})
+    finally:
+        sync_request_counters.reset(token)
+    return response, counters
+
+async def test_jira_rate_limiter():
+    print("🔍 Testing the Jira rate limiter and retries...")
+    settings.JIRA_MAX_RETRIES = 2
+    settings.JIRA_RETRY_BACKOFF_BASE = 0.01
+    settings.JIRA_RETRY_BACKOFF_MAX = 0.05
+
+    print("\n🪣 Token bucket:")
+    limiter = JiraRateLimiter(rate=10, burst=5, min_rate=1)
+    started = time.monotonic()
+    for _ in range(5):
+        await limiter.acquire()
+    check("a full burst is served without waiting", time.monotonic() - started < 0.05)
+    await limiter.acquire()
+    check("the request after the burst waits for a token", time.monotonic() - started >= 0.08)
+
+    limiter.tokens, limiter.updated_at = 0.0, 100.0
+    limiter.refill(100.3)
+    check("tokens refill at the configured rate", abs(limiter.tokens - 3) < 1e-9)
+    limiter.refill(200.0)
+    check("refill stops at the burst capacity", limiter.tokens == 5)
+
+    limiter.update_from_response(httpx.Response(429, headers={"Retry-After": "2"}))
+    check("a 429 halves the rate", limiter.rate == 5)
+    check("Retry-After pauses the site", 1.9 < limiter.blocked_until - time.monotonic() <= 2)
+
+    print("\n⏳ Retry-After:")
+    check("seconds", parse_retry_after("7") == 7)
+    check("negative seconds clamp to zero", parse_retry_after("-3") == 0)
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    check("HTTP date in the future", 28 <= parse_retry_after(retry_at) <= 30)
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(minutes=5), usegmt=True)
+    check("HTTP date in the past is zero", parse_retry_after(past) == 0)
+    check("missing header", parse_retry_after(None) is None)
+    check("unparseable header", parse_retry_after("soon") is None)
+
+    print("\n🔁 Throttled responses:")
+    for status in (429, 503):
+        calls = []
+        registry = registry_with(lambda request: calls.append(request) or httpx.Response(status, headers={"Retry-After": "0"}))
+        response, counters = await send(registry)
+        check(f"{status} is retried JIRA_MAX_RETRIES times, then returned", response.status_code == status and len(calls) == settings.JIRA_MAX_RETRIES + 1)
+        check(f"{status} retries are counted", counters.get("retries") == settings.JIRA_MAX_RETRIES and counters.get("requests") == len(calls))
+        await registry.close()
+
+    calls = []
+    registry = registry_with(lambda request: calls.append(request) or httpx.Response(200 if len(calls) > 1 else 429, json={"issues": []}))
+    response, _ = await send(registry)
+    check("a retried request returns the first success", response.status_code == 200 and len(calls) == 2)
+    await registry.close()
+
+    calls = []
+    registry = registry_with(lambda request: calls.append(request) or httpx.Response(400, json={"errorMessages": ["bad JQL"]}))
+    response, _ = await send(registry)
+    check("other errors are not retried", response.status_code == 400 and len(calls) == 1)
+    await registry.close()
+
+    print("\n🔌 Transport errors:")
+    def flaky(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"issues": []})
+    calls = []
+    registry = registry_with(flaky)
+    response, counters = await send(registry)
+    check("a dropped connection is retried", response.status_code == 200 and len(calls) == 2 and counters.get("retries") == 1)
+    await registry.close()
+
+    def timing_out(request):
+        calls.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+    calls = []
+    registry = registry_with(timing_out)
+    try:
+        await send(registry)
+        check("the last transport error is raised after the retries", False)
+    except httpx.ReadTimeout:
+        check("the last transport error is raised after the retries", len(calls) == settings.JIRA_MAX_RETRIES + 1)
+    await registry.close()
+
+    if failures:
+        print(f"\n❌ {len(failures)} rate limiter check(s) failed")
+        sys.exit(1)
+    print("\n✅ Rate limiter test completed!")
+
+if __name__ == "__main__":
+    asyncio.run(test_jira_rate_limiter())
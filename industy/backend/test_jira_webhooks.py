@@ -0,0 +1,148 @@
+"""
+Test script for Jira webhooks: the X-Hub-Signature HMAC check, applying issue updates and
+deletions to the stored tasks of the users on the issue's site, and re-analyzing leave risk
+only for the users whose tasks changed.
+
+Two test users on the jira_stub_server.py site and one on another site sync the same synthetic
+issues first. Needs the MongoDB configured in .env; everything the test writes is removed afterwards.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+from datetime import datetime
+import httpx
+from fastapi import FastAPI
+from config import settings
+from db import connect_to_mongo, get_database, close_mongo_connection
+from models.jira import JiraCredentialsCreate
+from routers.webhooks import router as webhooks_router
+from services.jira_service import jira_service
+from services.jira_http import jira_client_registry
+from services.snapshot_service import snapshot_service
+from jira_stub_server import JiraStub, start_jira_stub_server
+
+SITE_USER_IDS = ["test_webhook_user_a", "test_webhook_user_b"]
+OTHER_SITE_USER_ID = "test_webhook_user_c"
+ISSUE_COUNT = 20
+WEBHOOK_SECRET = "test-webhook-secret"
+LEAVE_FILE_ID = "test_webhook_leave"
+LEGACY_ALERT_TITLE = "test webhook legacy alert"
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+def sign(body: bytes) -> str:
+    return "sha256=" + hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+async def post_webhook(client, payload, signature=None):
+    body = json.dumps(payload).encode()
+    headers = {"Content-Type": "application/json", "X-Hub-Signature": sign(body) if signature is None else signature}
+    return await client.post("/api/jira/webhooks", content=body, headers=headers)
+
+async def remove_test_data(db):
+    """Remove everything the test users' syncs and webhooks wrote"""
+    user_ids = SITE_USER_IDS + [OTHER_SITE_USER_ID]
+    for collection in ("jira_tasks", "jira_projects", "jira_sync_state", "jira_query_plans", "jira_status_transitions", "jira_credentials", "sync_runs", "risk_alerts"):
+        await db[collection].delete_many({"user_id": {"$in": user_ids}})
+    for collection in ("jira_snapshots", "sync_locks", "sync_schedules"):
+        await db[collection].delete_many({"_id": {"$in": user_ids}})
+    await db.risk_alerts.delete_many({"task_title": LEGACY_ALERT_TITLE})
+    await db.leaves.delete_many({"file_id": LEAVE_FILE_ID})
+
+async def active_task(user_id, key):
+    return await get_database().jira_tasks.find_one({**await snapshot_service.active_query(user_id), "key": key})
+
+async def test_jira_webhooks():
+    print("🔍 Testing Jira webhooks...")
+    port = int(os.getenv("TEST_JIRA_STUB_PORT", "8083"))
+    settings.JIRA_WEBHOOK_SECRET = WEBHOOK_SECRET
+    await connect_to_mongo()
+    db = get_database()
+    stub = JiraStub(issues=ISSUE_COUNT)
+    app, server, thread = start_jira_stub_server(stub, port)
+    webhook_app = FastAPI()
+    webhook_app.include_router(webhooks_router)
+    client = httpx.AsyncClient(app=webhook_app, base_url="http://test")
+
+    try:
+        await remove_test_data(db)
+        domains = {user_id: f"http://127.0.0.1:{port}" for user_id in SITE_USER_IDS}
+        domains[OTHER_SITE_USER_ID] = f"http://localhost:{port}"
+        for user_id, domain in domains.items():
+            await jira_service.store_jira_credentials(user_id, JiraCredentialsCreate(domain=domain, email="test@example.com", api_token="stub-token"))
+            check(f"initial sync for {user_id}", await jira_service.sync_jira_data(user_id))
+
+        issue = stub.build_issue(0)
+        issue["self"] = f"http://127.0.0.1:{port}/rest/api/3/issue/{issue['id']}"
+        key = issue["key"]
+
+        print("\n🔐 Signature check:")
+        payload = {"webhookEvent": "jira:issue_updated", "issue": issue}
+        check("wrong signature rejected", (await post_webhook(client, payload, signature="sha256=" + "0" * 64)).status_code == 401)
+        check("missing signature rejected", (await post_webhook(client, payload, signature="")).status_code == 401)
+        body = b"not json"
+        response = await client.post("/api/jira/webhooks", content=body, headers={"X-Hub-Signature": sign(body)})
+        check("signed invalid JSON rejected", response.status_code == 400)
+        response = await post_webhook(client, {"webhookEvent": "project_created", "issue": issue})
+        check("other events ignored", response.status_code == 200 and response.json()["message"] == "Event ignored")
+
+        print("\n✏️ Issue update:")
+        # The assignee is on leave over the new due date
+        assignee_email = issue["fields"]["assignee"]["emailAddress"]
+        await db.leaves.insert_one({
+            "employee_email": assignee_email,
+            "leave_start": datetime(2030, 6, 1),
+            "leave_end": datetime(2030, 6, 30),
+            "file_id": LEAVE_FILE_ID
+        })
+        other_site_alert = {"user_id": OTHER_SITE_USER_ID, "task_key": key, "task_title": "other site", "assignee": assignee_email, "status": "OPEN", "created_at": datetime.utcnow()}
+        await db.risk_alerts.insert_one(other_site_alert)
+        await db.risk_alerts.insert_one({"task_key": key, "task_title": LEGACY_ALERT_TITLE, "status": "OPEN", "created_at": datetime.utcnow()})
+
+        issue["fields"]["summary"] = "Updated by webhook"
+        issue["fields"]["duedate"] = "2030-06-15"
+        response = await post_webhook(client, {"webhookEvent": "jira:issue_updated", "issue": issue})
+        check("update applied", response.status_code == 200 and response.json()["tasks_changed"] == len(SITE_USER_IDS))
+        for user_id in SITE_USER_IDS:
+            task = await active_task(user_id, key)
+            check(f"{user_id} task updated", task is not None and task["summary"] == "Updated by webhook")
+        task = await active_task(OTHER_SITE_USER_ID, key)
+        check("other site's task untouched", task is not None and task["summary"] != "Updated by webhook")
+        alert_users = sorted([alert.get("user_id") async for alert in db.risk_alerts.find({"task_key": key})])
+        check("risk re-analyzed for the changed users only", alert_users == sorted(SITE_USER_IDS + [OTHER_SITE_USER_ID]))
+        check("unattributed alert replaced", await db.risk_alerts.count_documents({"task_title": LEGACY_ALERT_TITLE}) == 0)
+
+        response = await post_webhook(client, {"webhookEvent": "jira:issue_updated", "issue": issue})
+        check("redelivered update changes nothing", response.status_code == 200 and response.json()["tasks_changed"] == 0)
+
+        print("\n🗑️ Issue deletion:")
+        response = await post_webhook(client, {"webhookEvent": "jira:issue_deleted", "issue": issue})
+        check("deletion applied", response.status_code == 200 and response.json()["tasks_changed"] == len(SITE_USER_IDS))
+        for user_id in SITE_USER_IDS:
+            check(f"{user_id} task removed", await active_task(user_id, key) is None)
+        check("other site's task kept", await active_task(OTHER_SITE_USER_ID, key) is not None)
+        alert_users = [alert.get("user_id") async for alert in db.risk_alerts.find({"task_key": key})]
+        check("only the other site's alert remains", alert_users == [OTHER_SITE_USER_ID])
+
+    finally:
+        await client.aclose()
+        await remove_test_data(db)
+        await jira_client_registry.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        await close_mongo_connection()
+
+    if failures:
+        print(f"\n❌ {len(failures)} webhook check(s) failed")
+        sys.exit(1)
+    print("\n✅ Jira webhook test completed!")
+
+if __name__ == "__main__":
+    asyncio.run(test_jira_webhooks())
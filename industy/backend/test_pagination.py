@@ -0,0 +1,99 @@
+"""
+Test script for cursor pagination: keyset pages with and without a cursor, ties on the
+sort value, the ranked offset cursor, and cursors that try to inject query operators
+"""
+import asyncio
+import base64
+import sys
+from datetime import datetime, timedelta
+from bson import ObjectId, json_util
+from pymongo import ASCENDING, DESCENDING
+from db.mongodb import connect_to_mongo, get_database, close_mongo_connection
+from utils.pagination import decode_cursor, encode_offset_cursor, find_page, find_ranked_page
+
+COLLECTION = "pagination_check"
+PAGE_SIZE = 4
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode().rstrip("=")
+
+async def walk(collection, sort_field, direction):
+    """Follow next_cursor from the first page to the last, returning the _ids in order"""
+    ids, cursor = [], None
+    while True:
+        docs, cursor = await find_page(collection, {}, sort_field, PAGE_SIZE, cursor, direction=direction)
+        ids.extend(doc["_id"] for doc in docs)
+        if not cursor:
+            return ids
+
+async def test_pagination():
+    print("🔍 Testing cursor pagination...")
+    await connect_to_mongo()
+    collection = get_database()[COLLECTION]
+    await collection.drop()
+
+    # Every third document shares its timestamp with the next two, so ties need the _id tie-breaker
+    base = datetime(2025, 1, 1)
+    docs = [{"_id": ObjectId(), "updated": base + timedelta(hours=i // 3), "score": i % 5} for i in range(17)]
+    await collection.insert_many(docs)
+
+    try:
+        print("\n📄 Keyset pages:")
+        expected = [doc["_id"] for doc in sorted(docs, key=lambda doc: (doc["updated"], doc["_id"]), reverse=True)]
+        first_page, next_cursor = await find_page(collection, {}, "updated", PAGE_SIZE)
+        check("first page without a cursor", [doc["_id"] for doc in first_page] == expected[:PAGE_SIZE] and next_cursor is not None)
+        second_page, _ = await find_page(collection, {}, "updated", PAGE_SIZE, page=2)
+        check("page=2 without a cursor falls back to skip", [doc["_id"] for doc in second_page] == expected[PAGE_SIZE:2 * PAGE_SIZE])
+        check("descending walk across tied values", await walk(collection, "updated", DESCENDING) == expected)
+        ascending = [doc["_id"] for doc in sorted(docs, key=lambda doc: (doc["updated"], doc["_id"]))]
+        check("ascending walk across tied values", await walk(collection, "updated", ASCENDING) == ascending)
+
+        print("\n🏅 Ranked offset cursor:")
+        sort = [("score", DESCENDING), ("_id", ASCENDING)]
+        ranked = [doc["_id"] for doc in sorted(docs, key=lambda doc: (-doc["score"], doc["_id"]))]
+        ranked_page, ranked_cursor = await find_ranked_page(collection, {}, sort, PAGE_SIZE)
+        check("first ranked page", [doc["_id"] for doc in ranked_page] == ranked[:PAGE_SIZE])
+        check("ranked cursor carries the next offset", decode_cursor(ranked_cursor) == {"offset": PAGE_SIZE})
+        ranked_page, _ = await find_ranked_page(collection, {}, sort, PAGE_SIZE, ranked_cursor)
+        check("second ranked page", [doc["_id"] for doc in ranked_page] == ranked[PAGE_SIZE:2 * PAGE_SIZE])
+        _, last_cursor = await find_ranked_page(collection, {}, sort, PAGE_SIZE, encode_offset_cursor(16))
+        check("no cursor after the last ranked page", last_cursor is None)
+
+        print("\n🛡️ Rejected cursors:")
+        rejected = {
+            "operator value": raw_cursor({"v": {"$ne": None}, "id": {"$exists": True}}),
+            "array value": raw_cursor({"v": [1, 2], "id": str(ObjectId())}),
+            "regex value": raw_cursor({"v": {"$regex": ".*"}, "id": str(ObjectId())}),
+            "negative offset": raw_cursor({"offset": -4}),
+            "not base64 JSON": "not-a-cursor"
+        }
+        for name, cursor in rejected.items():
+            try:
+                decode_cursor(cursor)
+                check(name, False)
+            except ValueError:
+                check(name, True)
+        try:
+            await find_page(collection, {}, "updated", PAGE_SIZE, encode_offset_cursor(4))
+            check("offset cursor on a keyset listing", False)
+        except ValueError:
+            check("offset cursor on a keyset listing", True)
+
+    finally:
+        await collection.drop()
+        await close_mongo_connection()
+
+    if failures:
+        print(f"\n❌ {len(failures)} pagination check(s) failed")
+        sys.exit(1)
+    print("\n✅ Pagination test completed!")
+
+if __name__ == "__main__":
+    asyncio.run(test_pagination())
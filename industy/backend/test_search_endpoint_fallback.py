@@ -0,0 +1,86 @@
+"""
+Test script for the 410 fallback from /search/jql to the legacy /search endpoint.
+
+Runs syncs against jira_stub_server.py with the JQL Search endpoint answering 410: the full
+sync, a delta sync that is due for reconciliation, and the project issue fetch must all switch
+to the legacy endpoint (and remember it) instead of failing. Needs the MongoDB configured in
+.env; everything the test user writes is removed afterwards.
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from db import connect_to_mongo, get_database, close_mongo_connection
+from models.jira import JiraCredentialsCreate
+from services.jira_service import jira_service, LEGACY_SEARCH_ENDPOINT
+from services.jira_http import jira_client_registry
+from jira_stub_server import JiraStub, start_jira_stub_server
+
+TEST_USER_ID = "test_endpoint_fallback_user"
+ISSUE_COUNT = 250
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+async def remove_test_user(db):
+    """Remove everything the test user's syncs wrote"""
+    for collection in ("jira_tasks", "jira_projects", "jira_sync_state", "jira_query_plans", "jira_status_transitions", "jira_credentials", "sync_runs"):
+        await db[collection].delete_many({"user_id": TEST_USER_ID})
+    for collection in ("jira_snapshots", "sync_locks", "sync_schedules"):
+        await db[collection].delete_many({"_id": TEST_USER_ID})
+
+async def test_search_endpoint_fallback():
+    print("🔍 Testing the 410 fallback to the legacy search endpoint...")
+    port = int(os.getenv("TEST_JIRA_STUB_PORT", "8082"))
+    await connect_to_mongo()
+    db = get_database()
+    app, server, thread = start_jira_stub_server(JiraStub(issues=ISSUE_COUNT, gone_search_jql=True), port)
+
+    try:
+        await remove_test_user(db)
+        credentials = await jira_service.store_jira_credentials(
+            TEST_USER_ID,
+            JiraCredentialsCreate(domain=f"http://127.0.0.1:{port}", email="test@example.com", api_token="stub-token")
+        )
+
+        print("\n📥 Full sync:")
+        check("full sync succeeds", await jira_service.sync_jira_data(TEST_USER_ID))
+        check("every issue stored", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID}) == ISSUE_COUNT)
+        plan = await jira_service.get_query_plan(credentials)
+        check("query plan remembers the legacy endpoint", plan is not None and plan["endpoint"] == LEGACY_SEARCH_ENDPOINT)
+
+        print("\n🧹 Delta sync due for reconciliation:")
+        # 10 issues were deleted in Jira since the full sync
+        app.state.stub = JiraStub(issues=ISSUE_COUNT - 10, gone_search_jql=True)
+        await jira_service.save_sync_state(TEST_USER_ID, {"last_reconciled_at": datetime.utcnow() - timedelta(days=1)})
+        check("delta sync succeeds", await jira_service.sync_jira_data(TEST_USER_ID))
+        state = await jira_service.get_sync_state(TEST_USER_ID)
+        check("reconciliation ran and advanced", datetime.utcnow() - state["last_reconciled_at"] < timedelta(minutes=1))
+        active_query = {"user_id": TEST_USER_ID, "generation": (await db.jira_snapshots.find_one({"_id": TEST_USER_ID}))["tasks_generation"]}
+        check("deleted issues removed", await db.jira_tasks.count_documents(active_query) == ISSUE_COUNT - 10)
+
+        print("\n🗂️ Project issues without a query plan:")
+        await jira_service.invalidate_query_plan(credentials.id)
+        partitions = await jira_service.fetch_project_issues_by_type(credentials, "SCRUM")
+        check("issues fetched by type", partitions is not None and sum(len(issues) for issues in partitions.values()) == ISSUE_COUNT - 10)
+        plan = await jira_service.get_query_plan(credentials)
+        check("fallback saved to the query plan", plan is not None and plan["endpoint"] == LEGACY_SEARCH_ENDPOINT)
+
+    finally:
+        await remove_test_user(db)
+        await jira_client_registry.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        await close_mongo_connection()
+
+    if failures:
+        print(f"\n❌ {len(failures)} fallback check(s) failed")
+        sys.exit(1)
+    print("\n✅ Search endpoint fallback test completed!")
+
+if __name__ == "__main__":
+    asyncio.run(test_search_endpoint_fallback())
@@ -0,0 +1,129 @@
+"""
+Test script for snapshot generations of synced tasks.
+
+Runs full syncs against jira_stub_server.py and checks that each one writes a new generation
+and flips the active pointer in one step (readers never see a partial or empty set), that
+superseded generations and pre-snapshot documents are garbage-collected after the grace
+period, and that failed or outdated generations are discarded. Needs the MongoDB configured
+in .env; everything the test user writes is removed afterwards.
+"""
+import asyncio
+import os
+import sys
+from config import settings
+from db import connect_to_mongo, get_database, close_mongo_connection
+from models.jira import JiraCredentialsCreate
+from services.jira_service import jira_service
+from services.jira_http import jira_client_registry
+from services.snapshot_service import snapshot_service
+from jira_stub_server import JiraStub, start_jira_stub_server
+
+TEST_USER_ID = "test_snapshot_user"
+ISSUE_COUNT = 450
+GC_DELAY_SECONDS = 0.5
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+async def remove_test_user(db):
+    """Remove everything the test user's syncs wrote"""
+    for collection in ("jira_tasks", "jira_projects", "jira_sync_state", "jira_query_plans", "jira_status_transitions", "jira_credentials", "sync_runs"):
+        await db[collection].delete_many({"user_id": TEST_USER_ID})
+    for collection in ("jira_snapshots", "sync_locks", "sync_schedules"):
+        await db[collection].delete_many({"_id": TEST_USER_ID})
+
+async def active_count(db):
+    return await db.jira_tasks.count_documents(await snapshot_service.active_query(TEST_USER_ID))
+
+async def full_sync():
+    """Force a full sync, which writes a new generation"""
+    await jira_service.clear_sync_state(TEST_USER_ID)
+    return await jira_service.sync_jira_data(TEST_USER_ID)
+
+async def wait_for_gc():
+    await asyncio.gather(*snapshot_service.gc_tasks)
+
+async def test_snapshot_generations():
+    print("🔍 Testing snapshot generations...")
+    port = int(os.getenv("TEST_JIRA_STUB_PORT", "8085"))
+    gc_delay = settings.JIRA_SNAPSHOT_GC_DELAY_SECONDS
+    settings.JIRA_SNAPSHOT_GC_DELAY_SECONDS = GC_DELAY_SECONDS
+    await connect_to_mongo()
+    db = get_database()
+    app, server, thread = start_jira_stub_server(JiraStub(issues=ISSUE_COUNT), port)
+
+    try:
+        await remove_test_user(db)
+        await jira_service.store_jira_credentials(
+            TEST_USER_ID,
+            JiraCredentialsCreate(domain=f"http://127.0.0.1:{port}", email="test@example.com", api_token="stub-token")
+        )
+        # Tasks stored before snapshots existed carry no generation
+        await db.jira_tasks.insert_many([{"user_id": TEST_USER_ID, "jira_id": f"legacy-{n}", "key": f"OLD-{n}"} for n in range(3)])
+
+        print("\n🕰️ Before the first flip:")
+        check("no active generation", await snapshot_service.get_active_generation(TEST_USER_ID) is None)
+        check("pre-snapshot tasks are active", await active_count(db) == 3)
+
+        print("\n📥 First full sync:")
+        check("sync succeeds", await full_sync())
+        first = await snapshot_service.get_active_generation(TEST_USER_ID)
+        check("a generation is active", first is not None)
+        check("the new generation holds every issue", await active_count(db) == ISSUE_COUNT)
+        check("pre-snapshot tasks kept during the grace period", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID, "generation": None}) == 3)
+        await wait_for_gc()
+        check("pre-snapshot tasks collected afterwards", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID, "generation": None}) == 0)
+
+        print("\n🔄 Flip while readers poll:")
+        # 50 issues were deleted in Jira; slow pages give readers time to look mid-sync
+        app.state.stub = JiraStub(issues=ISSUE_COUNT - 50, latency_ms=30)
+        sync = asyncio.create_task(full_sync())
+        observed = set()
+        while not sync.done():
+            observed.add(await active_count(db))
+            await asyncio.sleep(0.005)
+        check("sync succeeds", sync.result())
+        check("readers saw only the old or the new set", observed <= {ISSUE_COUNT, ISSUE_COUNT - 50} and ISSUE_COUNT in observed)
+        second = await snapshot_service.get_active_generation(TEST_USER_ID)
+        check("the pointer moved to a newer generation", second > first)
+        check("the new generation holds the remaining issues", await active_count(db) == ISSUE_COUNT - 50)
+        check("the old generation is readable during the grace period", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID, "generation": first}) == ISSUE_COUNT)
+        await wait_for_gc()
+        check("only the active generation is left", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID}) == ISSUE_COUNT - 50)
+
+        print("\n🗑️ Discarded generations:")
+        abandoned = await snapshot_service.begin_generation(TEST_USER_ID)
+        await jira_service.upsert_task_documents(TEST_USER_ID, [{"user_id": TEST_USER_ID, "jira_id": "abandoned", "key": "ABN-1"}], abandoned)
+        snapshot_service.discard_generation(TEST_USER_ID, "tasks", abandoned)
+        await wait_for_gc()
+        check("a failed sync's generation is removed", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID, "generation": abandoned}) == 0)
+
+        outdated = await snapshot_service.begin_generation(TEST_USER_ID)
+        newer = await snapshot_service.begin_generation(TEST_USER_ID)
+        await jira_service.upsert_task_documents(TEST_USER_ID, [{"user_id": TEST_USER_ID, "jira_id": "outdated", "key": "OUT-1"}], outdated)
+        check("a newer generation activates", await snapshot_service.activate_generation(TEST_USER_ID, "tasks", newer))
+        check("an older generation is refused afterwards", not await snapshot_service.activate_generation(TEST_USER_ID, "tasks", outdated))
+        check("the pointer keeps the newer generation", await snapshot_service.get_active_generation(TEST_USER_ID) == newer)
+        await wait_for_gc()
+        check("the refused generation is removed", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID, "generation": outdated}) == 0)
+
+    finally:
+        settings.JIRA_SNAPSHOT_GC_DELAY_SECONDS = gc_delay
+        await wait_for_gc()
+        await remove_test_user(db)
+        await jira_client_registry.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        await close_mongo_connection()
+
+    if failures:
+        print(f"\n❌ {len(failures)} snapshot check(s) failed")
+        sys.exit(1)
+    print("\n✅ Snapshot generation test completed!")
+
+if __name__ == "__main__":
+    asyncio.run(test_snapshot_generations())
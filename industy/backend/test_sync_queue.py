@@ -0,0 +1,151 @@
+"""
+Test script for the sync job queue and sync_worker.py: coalesced enqueues, leases and their
+expiry, retries with backoff, dead-lettering, and a worker cancelling its sync once another
+worker takes over the lease. Jobs sync a test user against jira_stub_server.py.
+
+Needs the MongoDB configured in .env and no sync worker running against it, since workers
+lease any due job; everything the test writes is removed afterwards.
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime
+from config import settings
+from db import connect_to_mongo, get_database, close_mongo_connection
+from models.jira import JiraCredentialsCreate
+from services.jira_service import jira_service
+from services.jira_http import jira_client_registry
+from services.sync_queue_service import sync_queue_service, SYNC_JOBS_COLLECTION, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_DEAD
+from jira_stub_server import JiraStub, start_jira_stub_server
+from sync_worker import SyncWorker
+
+TEST_USER_ID = "test_sync_queue_user"
+ISSUE_COUNT = 200
+TEST_SETTINGS = {
+    "SYNC_JOB_LEASE_SECONDS": 0.6,
+    "SYNC_JOB_MAX_ATTEMPTS": 3,
+    "SYNC_JOB_RETRY_BACKOFF_BASE": 0.2,
+    "SYNC_JOB_RETRY_BACKOFF_MAX": 0.4
+}
+
+failures = []
+
+def check(name, condition):
+    print(f"  {'✅' if condition else '❌'} {name}")
+    if not condition:
+        failures.append(name)
+
+async def remove_test_user(db):
+    """Remove everything the test user's jobs and syncs wrote"""
+    for collection in (SYNC_JOBS_COLLECTION, "jira_tasks", "jira_projects", "jira_sync_state", "jira_query_plans", "jira_status_transitions", "jira_credentials", "sync_runs"):
+        await db[collection].delete_many({"user_id": TEST_USER_ID})
+    for collection in ("jira_snapshots", "sync_locks", "sync_schedules"):
+        await db[collection].delete_many({"_id": TEST_USER_ID})
+
+async def enqueue_test_job(db):
+    """Queue a job for the test user that is due before anything else in the queue"""
+    await sync_queue_service.enqueue(TEST_USER_ID)
+    await db[SYNC_JOBS_COLLECTION].update_one({"user_id": TEST_USER_ID, "status": JOB_QUEUED}, {"$set": {"run_at": datetime(2000, 1, 1)}})
+
+async def job_status(db):
+    return await db[SYNC_JOBS_COLLECTION].find_one({"user_id": TEST_USER_ID}, sort=[("created_at", -1)])
+
+async def test_sync_queue():
+    print("🔍 Testing the sync job queue and worker leases...")
+    port = int(os.getenv("TEST_JIRA_STUB_PORT", "8086"))
+    previous_settings = {name: getattr(settings, name) for name in list(TEST_SETTINGS) + ["JIRA_MAX_RETRIES"]}
+    for name, value in TEST_SETTINGS.items():
+        setattr(settings, name, value)
+    await connect_to_mongo()
+    db = get_database()
+    app, server, thread = start_jira_stub_server(JiraStub(issues=ISSUE_COUNT), port)
+    worker = SyncWorker()
+
+    try:
+        await remove_test_user(db)
+        await jira_service.store_jira_credentials(
+            TEST_USER_ID,
+            JiraCredentialsCreate(domain=f"http://127.0.0.1:{port}", email="test@example.com", api_token="stub-token")
+        )
+
+        print("\n📬 Enqueue and lease:")
+        await enqueue_test_job(db)
+        await sync_queue_service.enqueue(TEST_USER_ID)
+        check("repeated enqueues coalesce", await db[SYNC_JOBS_COLLECTION].count_documents({"user_id": TEST_USER_ID}) == 1)
+        job = await sync_queue_service.acquire("worker-a")
+        check("job leased", job is not None and job["user_id"] == TEST_USER_ID and job["status"] == JOB_RUNNING and job["attempts"] == 1)
+        check("a held lease is not handed out twice", await sync_queue_service.acquire("worker-b") is None)
+        check("the owner's heartbeat extends the lease", await sync_queue_service.heartbeat(job["_id"], "worker-a"))
+
+        await asyncio.sleep(settings.SYNC_JOB_LEASE_SECONDS + 0.1)
+        taken_over = await sync_queue_service.acquire("worker-b")
+        check("an expired lease is taken over", taken_over is not None and taken_over["_id"] == job["_id"] and taken_over["attempts"] == 2)
+        check("the old owner's heartbeat reports the lost lease", not await sync_queue_service.heartbeat(job["_id"], "worker-a"))
+        await sync_queue_service.complete(job, "worker-a")
+        check("the old owner can't complete the job", (await job_status(db))["status"] == JOB_RUNNING)
+
+        print("\n🔁 Retry and dead-letter:")
+        await sync_queue_service.fail(taken_over, "worker-b", "first failure")
+        status = await job_status(db)
+        check("a failed job is requeued with its error", status["status"] == JOB_QUEUED and status["last_error"] == "first failure" and "lease_owner" not in status)
+        check("the retry waits for its backoff", status["run_at"] > datetime.utcnow() and await sync_queue_service.acquire("worker-b") is None)
+        await asyncio.sleep(settings.SYNC_JOB_RETRY_BACKOFF_MAX + 0.1)
+        retried = await sync_queue_service.acquire("worker-b")
+        check("the retry is leased after the backoff", retried is not None and retried["attempts"] == 3)
+        await sync_queue_service.fail(retried, "worker-b", "last failure")
+        status = await job_status(db)
+        check("dead-lettered after SYNC_JOB_MAX_ATTEMPTS", status["status"] == JOB_DEAD and status["last_error"] == "last failure")
+        check("dead jobs counted in the queue stats", (await sync_queue_service.get_queue_stats())[JOB_DEAD] >= 1)
+        await db[SYNC_JOBS_COLLECTION].delete_many({"user_id": TEST_USER_ID})
+
+        print("\n👷 Worker runs a job:")
+        await enqueue_test_job(db)
+        await worker.run_job(await sync_queue_service.acquire(worker.worker_id))
+        check("successful sync completes the job", (await job_status(db))["status"] == JOB_DONE)
+        check("the job's sync stored the issues", await db.jira_tasks.count_documents({"user_id": TEST_USER_ID}) == ISSUE_COUNT)
+        await db[SYNC_JOBS_COLLECTION].delete_many({"user_id": TEST_USER_ID})
+
+        settings.JIRA_MAX_RETRIES = 0
+        app.state.stub = JiraStub(issues=ISSUE_COUNT, rate_429=1, retry_after=0)
+        await jira_service.clear_sync_state(TEST_USER_ID)
+        await enqueue_test_job(db)
+        await worker.run_job(await sync_queue_service.acquire(worker.worker_id))
+        status = await job_status(db)
+        check("failed sync requeues the job", status["status"] == JOB_QUEUED and status["last_error"] == "sync_jira_data failed")
+        await db[SYNC_JOBS_COLLECTION].delete_many({"user_id": TEST_USER_ID})
+        settings.JIRA_MAX_RETRIES = previous_settings["JIRA_MAX_RETRIES"]
+
+        print("\n✂️ Lost lease:")
+        # Slow pages keep the sync running long enough for the lease to be taken over
+        app.state.stub = JiraStub(issues=ISSUE_COUNT, latency_ms=300)
+        await enqueue_test_job(db)
+        job = await sync_queue_service.acquire(worker.worker_id)
+        started = asyncio.get_running_loop().time()
+        run = asyncio.create_task(worker.run_job(job))
+        await asyncio.sleep(0.3)
+        inflight = jira_service.inflight_syncs.get(TEST_USER_ID)
+        await db[SYNC_JOBS_COLLECTION].update_one({"_id": job["_id"]}, {"$set": {"lease_owner": "worker-b"}})
+        await asyncio.wait_for(run, timeout=10)
+        check("the worker gives up soon after losing the lease", asyncio.get_running_loop().time() - started < 2)
+        if inflight is not None:
+            await asyncio.wait({inflight}, timeout=5)
+        check("its sync was cancelled", inflight is not None and inflight.cancelled())
+        status = await job_status(db)
+        check("the outcome is left to the new lease owner", status["status"] == JOB_RUNNING and status["lease_owner"] == "worker-b")
+
+    finally:
+        for name, value in previous_settings.items():
+            setattr(settings, name, value)
+        await remove_test_user(db)
+        await jira_client_registry.close()
+        server.should_exit = True
+        thread.join(timeout=5)
+        await close_mongo_connection()
+
+    if failures:
+        print(f"\n❌ {len(failures)} sync queue check(s) failed")
+        sys.exit(1)
+    print("\n✅ Sync queue test completed!")
+
+if __name__ == "__main__":
+    asyncio.run(test_sync_queue())
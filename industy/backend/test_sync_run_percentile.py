@@ -0,0 +1,40 @@
+"""
+Test script for the nearest-rank percentile used by the sync run summary and the sync benchmark
+"""
+import sys
+from services.sync_run_service import percentile, distribution
+
+failures = []
+
+def check(name, actual, expected):
+    ok = actual == expected
+    print(f"  {'✅' if ok else '❌'} {name}: {actual} (expected {expected})")
+    if not ok:
+        failures.append(name)
+
+def test_percentile():
+    print("🔍 Testing nearest-rank percentile...")
+
+    six = [6, 1, 5, 2, 4, 3]
+    check("p50 of 6 values is the 3rd", percentile(six, 0.5), 3)
+    check("p95 of 6 values is the 6th", percentile(six, 0.95), 6)
+    check("p0 is the minimum", percentile(six, 0), 1)
+    check("p100 is the maximum", percentile(six, 1), 6)
+
+    five = [10, 20, 30, 40, 50]
+    check("p50 of 5 values is the 3rd", percentile(five, 0.5), 30)
+    check("p20 of 5 values is the 1st", percentile(five, 0.2), 10)
+
+    hundred = list(range(1, 101))
+    check("p95 of 1..100", percentile(hundred, 0.95), 95)
+    check("p7 of 1..100 despite float noise", percentile(hundred, 0.07), 7)
+    check("single value", percentile([4.2], 0.95), 4.2)
+    check("distribution", distribution([1, 2, 3, 4]), {"count": 4, "p50": 2, "p95": 4})
+
+    if failures:
+        print(f"\n❌ {len(failures)} percentile check(s) failed")
+        sys.exit(1)
+    print("\n✅ Percentile test completed!")
+
+if __name__ == "__main__":
+    test_percentile()
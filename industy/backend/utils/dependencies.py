@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from services.auth_service import auth_service
+from services.sync_policy_service import sync_policy_service
 from models.auth import UserInDB
 from typing import Optional
 import logging
@@ -39,6 +40,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         raise credentials_exception
     
     logger.info(f"✅ User authenticated: {user.email} (verified: {user.is_verified})")
+    # Recently active users get their Jira data synced more often; written in the background
+    sync_policy_service.record_activity(user.id)
     return user
 
 async def get_current_verified_user(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
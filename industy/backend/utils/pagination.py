@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from bson import ObjectId, json_util
+from fastapi import HTTPException, Query, status
+from pymongo import DESCENDING
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Values a keyset cursor may carry; they are spliced into the query, so operators ({"$ne": ...}), arrays and regexes are refused
+CURSOR_VALUE_TYPES = (datetime, str, int, float, ObjectId, type(None))
+
+
+def _encode_payload(payload: Dict[str, Any]) -> str:
+    """URL-safe base64 of a BSON-aware JSON payload, padding stripped"""
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode().rstrip("=")
+
+
+def encode_cursor(doc: Dict[str, Any], sort_field: str) -> str:
+    """Opaque token for the position right after `doc` in a (sort_field, _id) listing"""
+    return _encode_payload({"v": doc.get(sort_field), "id": doc["_id"]})
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Opaque token for a position in a ranked listing, which has no indexable sort key"""
+    return _encode_payload({"offset": offset})
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Payload of a cursor token, either {v, id} or {offset}; raises ValueError for a malformed one"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor: unknown payload")
+    if {"v", "id"} <= payload.keys():
+        if not all(isinstance(payload[field], CURSOR_VALUE_TYPES) for field in ("v", "id")):
+            raise ValueError("Invalid cursor: unsupported value type")
+        return {"v": payload["v"], "id": payload["id"]}
+    offset = payload.get("offset")
+    if isinstance(offset, int) and not isinstance(offset, bool) and offset >= 0:
+        return {"offset": offset}
+    raise ValueError("Invalid cursor: unknown payload")
+
+
+def get_cursor(cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor of the previous page")) -> Optional[str]:
+    """Query parameter dependency that rejects malformed cursors with 400"""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return cursor
+
+
+async def find_page(collection, query: Dict[str, Any], sort_field: str, size: int, cursor: Optional[str] = None, page: int = 1, projection: Optional[Dict[str, Any]] = None, direction: int = DESCENDING) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page sorted by (sort_field, _id) in `direction` and the cursor of the next page.
+
+    With a cursor the page starts right after it through the index (keyset pagination), so deep
+    pages cost the same as the first. Without one, `page` falls back to skip for old clients.
+    """
+    if cursor:
+        payload = decode_cursor(cursor)
+        if "v" not in payload:
+            raise ValueError("Cursor does not belong to a keyset listing")
+        after = "$lt" if direction == DESCENDING else "$gt"
+        query = {"$and": [query, {"$or": [
+            {sort_field: {after: payload["v"]}},
+            {sort_field: payload["v"], "_id": {after: payload["id"]}}
+        ]}]}
+
+    find_cursor = collection.find(query, projection).sort([(sort_field, direction), ("_id", direction)])
+    if not cursor and page > 1:
+        find_cursor = find_cursor.skip((page - 1) * size)
+
+    # One extra document tells whether there is a next page without counting
+    docs = await find_cursor.limit(size + 1).to_list(size + 1)
+    next_cursor = encode_cursor(docs[size - 1], sort_field) if len(docs) > size else None
+    return docs[:size], next_cursor
+
+
+async def find_ranked_page(collection, query: Dict[str, Any], sort: List[Tuple[str, Any]], size: int, cursor: Optional[str] = None, page: int = 1, projection: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Fetch one page of a listing ordered by relevance (e.g. text score) and the cursor of the next page.
+
+    Relevance can't be used as a range bound, so these cursors carry an offset; ranked queries
+    are expected to be selective enough that skipping within their matches is cheap.
+    """
+    offset = (page - 1) * size
+    if cursor:
+        payload = decode_cursor(cursor)
+        if "offset" not in payload:
+            raise ValueError("Cursor does not belong to a ranked listing")
+        offset = payload["offset"]
+
+    docs = await collection.find(query, projection).sort(sort).skip(offset).limit(size + 1).to_list(size + 1)
+    next_cursor = encode_offset_cursor(offset + size) if len(docs) > size else None
+    return docs[:size], next_cursor
+
+
+class TotalCountCache:
+    """Recently computed count_documents results, so paging through a list doesn't recount it"""
+
+    def __init__(self):
+        # (collection name, query fingerprint) -> (count, expires_at monotonic seconds)
+        self.entries: Dict[Tuple[str, str], Tuple[int, float]] = {}
+
+    def key(self, collection, query: Dict[str, Any]) -> Tuple[str, str]:
+        """Cache key for a collection and query"""
+        fingerprint = hashlib.sha1(json_util.dumps(query, sort_keys=True).encode()).hexdigest()
+        return collection.name, fingerprint
+
+    async def count(self, collection, query: Dict[str, Any], exact: bool = False) -> Tuple[int, bool]:
+        """Total for a query and whether it is an exact count made just now"""
+        key = self.key(collection, query)
+        now = time.monotonic()
+        cached = self.entries.get(key)
+        if not exact and cached and cached[1] > now:
+            return cached[0], False
+
+        total = await collection.count_documents(query)
+        if len(self.entries) >= settings.PAGINATION_TOTAL_CACHE_MAX_ENTRIES:
+            self.entries = {cache_key: entry for cache_key, entry in self.entries.items() if entry[1] > now}
+            if len(self.entries) >= settings.PAGINATION_TOTAL_CACHE_MAX_ENTRIES:
+                self.entries.clear()
+        self.entries[key] = (total, now + settings.PAGINATION_TOTAL_CACHE_TTL)
+        return total, True
+
+
+# Create global total count cache instance
+total_count_cache = TotalCountCache()
@@ -0,0 +1,56 @@
+import functools
+import logging
+from typing import Any, Dict, Type, TypeVar
+import orjson
+from bson import ObjectId
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@functools.lru_cache(maxsize=None)
+def _projection_fields(model: Type[BaseModel]) -> tuple:
+    return tuple(field for field in model.model_fields if field != "id")
+
+
+@functools.lru_cache(maxsize=None)
+def _required_fields(model: Type[BaseModel]) -> frozenset:
+    return frozenset(field for field in _projection_fields(model) if model.model_fields[field].is_required())
+
+
+def projection_for(model: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection of the stored fields a response model is built from (its id comes from _id)"""
+    return {field: 1 for field in _projection_fields(model)}
+
+
+def construct_from_doc(model: Type[ModelT], doc: Dict[str, Any]) -> ModelT:
+    """Build a response model from a document this backend stored, without validating it again.
+
+    Fields missing from the document get the model's default; a missing required field is None.
+    """
+    required = _required_fields(model)
+    values = {field: doc.get(field) for field in _projection_fields(model) if field in doc or field in required}
+    return model.model_construct(id=str(doc["_id"]), **values)
+
+
+def _orjson_default(value: Any) -> Any:
+    """Types orjson doesn't serialise natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ModelResponse(ORJSONResponse):
+    """ORJSON response rendered straight from the models a service built.
+
+    Returning it from a route skips FastAPI's response_model round trip (dump, validate again,
+    re-encode); response_model stays on the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)